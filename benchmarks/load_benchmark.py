@@ -0,0 +1,465 @@
+"""
+端到端压测：用本地模拟接口驱动 /api/convert 和 /api/convert-project，输出可对比的性能数字
+
+默认在本进程内启动模拟接口和转换服务；项目转换使用 examples/input 中的示例文件复制扩充成数千个文件，
+每个副本带有不同的注释行，避免被缓存和去重合并。报告内容包括：
+  - 延迟百分位：单文件转换为每个请求的耗时，项目转换为从提交到每个文件转换完成的耗时
+  - 每秒转换文件数
+  - 进程内存峰值（RSS，仅在本进程内启动服务时有效）
+  - 每个文件的模拟接口调用次数
+
+用法：
+    python benchmarks/load_benchmark.py --files 2000 --convert-requests 200 --output result.json
+    python benchmarks/load_benchmark.py --baseline result.json   # 与上次结果对比
+
+未指定 --server-url 时转换服务的API地址、多后端、持久化缓存和相似文件复用配置会被覆盖，.env 中的这些配置不会生效。
+副本之间只有注释不同，相似文件复用会把它们合并为差异请求，因此压测时关闭；压测 --server-url 指定的服务时，
+该服务需以 SIMILARITY_ENABLED=False 启动，否则结果不能与基线对比。
+模拟接口原样返回源代码，通不过目标语言的语法检查，因此默认关闭验证（--validate 打开，修复请求会计入接口调用）。
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mock_llm_server import MockLLMServer, percentile
+
+EXAMPLES_DIR = os.path.join(ROOT, 'examples', 'input')
+# 各语言示例文件与副本的注释前缀
+SAMPLES = {
+    'c': ('c_sample.c', '//'),
+    'python': ('python_sample.py', '#'),
+    'java': ('java_sample.java', '//'),
+    'js': ('js_sample.js', '//'),
+}
+# 每个目录下的文件数，模拟真实项目的目录结构
+_FILES_PER_DIR = 100
+# 项目任务状态轮询间隔（秒）
+_POLL_INTERVAL = 0.1
+# 对比基线时的回退阈值
+_REGRESSION_THRESHOLD = 0.1
+
+
+class MemorySampler:
+    """在后台线程中定期采样本进程的常驻内存，记录峰值"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> 'MemorySampler':
+        self.peak = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+def current_rss() -> int:
+    """
+    当前进程的常驻内存（字节），无法读取 /proc 时返回迄今为止的峰值
+
+    Returns:
+        内存字节数
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以KB为单位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def load_sample(lang: str) -> Tuple[str, str, str]:
+    """
+    读取示例文件
+
+    Returns:
+        (文件名, 内容, 注释前缀)
+    """
+    file_name, comment = SAMPLES[lang]
+    with open(os.path.join(EXAMPLES_DIR, file_name), encoding='utf-8') as f:
+        return file_name, f.read(), comment
+
+
+def sample_variant(code: str, comment: str, scenario: str, index: int) -> str:
+    """生成示例文件在某个场景中的第 index 个副本，不同场景、不同编号的副本内容互不相同"""
+    return f'{comment} benchmark {scenario} copy {index}\n{code}'
+
+
+def build_project_zip(lang: str, files: int) -> bytes:
+    """
+    把示例文件复制成包含 files 个文件的项目ZIP
+
+    Args:
+        lang: 源代码语言
+        files: 文件数
+
+    Returns:
+        ZIP内容
+    """
+    file_name, code, comment = load_sample(lang)
+    stem, ext = os.path.splitext(file_name)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for index in range(files):
+            zf.writestr(f'project/pkg{index // _FILES_PER_DIR}/{stem}_{index}{ext}',
+                        sample_variant(code, comment, 'project', index))
+    return buffer.getvalue()
+
+
+def latency_summary(values: List[float]) -> Dict:
+    return {
+        'p50': _round(percentile(values, 50)),
+        'p95': _round(percentile(values, 95)),
+        'p99': _round(percentile(values, 99)),
+        'max': _round(max(values) if values else None)
+    }
+
+
+def _round(value: Optional[float], digits: int = 4) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class Benchmark:
+    """压测驱动"""
+
+    def __init__(self, server_url: str, mock_stats_url: str, concurrency: int, timeout: float,
+                 measure_memory: bool):
+        """
+        初始化压测
+
+        Args:
+            server_url: 转换服务地址
+            mock_stats_url: 模拟接口统计地址
+            concurrency: 单文件转换的并发请求数
+            timeout: 单个请求或任务的超时（秒）
+            measure_memory: 是否记录内存峰值（服务在本进程内运行时才有意义）
+        """
+        self.server_url = server_url.rstrip('/')
+        self.mock_stats_url = mock_stats_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.measure_memory = measure_memory
+        self.session = httpx.Client(timeout=timeout, limits=httpx.Limits(max_connections=concurrency + 4))
+
+    def _api_calls(self) -> int:
+        return self.session.get(self.mock_stats_url, timeout=10).json()['requests']
+
+    def run_convert(self, source_lang: str, target_lang: str, count: int) -> Dict:
+        """
+        并发请求 /api/convert
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            count: 请求数
+
+        Returns:
+            场景结果
+        """
+        _, code, comment = load_sample(source_lang)
+
+        def convert(index: int) -> Tuple[float, bool]:
+            started = time.perf_counter()
+            try:
+                response = self.session.post(f'{self.server_url}/api/convert', json={
+                    'source_lang': source_lang,
+                    'target_lang': target_lang,
+                    'code': sample_variant(code, comment, 'convert', index)
+                })
+                ok = response.status_code == 200 and response.json().get('success', False)
+            except httpx.HTTPError:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        calls_before = self._api_calls()
+        started = time.perf_counter()
+        with MemorySampler() as memory, ThreadPoolExecutor(self.concurrency) as executor:
+            outcomes = list(executor.map(convert, range(count)))
+        elapsed = time.perf_counter() - started
+        api_calls = self._api_calls() - calls_before
+
+        latencies = [latency for latency, _ in outcomes]
+        failures = sum(1 for _, ok in outcomes if not ok)
+        return {
+            'scenario': f'convert {source_lang}->{target_lang}',
+            'files': count,
+            'failures': failures,
+            'seconds': _round(elapsed, 3),
+            'files_per_second': _round(count / elapsed if elapsed else None, 2),
+            'latency': latency_summary(latencies),
+            'api_calls_per_file': _round(api_calls / count if count else None, 3),
+            'peak_rss_mb': _round(memory.peak / 1024 / 1024, 1) if self.measure_memory else None
+        }
+
+    def run_project(self, source_lang: str, target_lang: str, files: int) -> Dict:
+        """
+        上传扩充后的项目到 /api/convert-project，轮询任务进度直到完成并下载结果
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            files: 项目文件数
+
+        Returns:
+            场景结果
+        """
+        data = build_project_zip(source_lang, files)
+        calls_before = self._api_calls()
+        completions: List[float] = []
+        error = None
+        result_files = 0
+
+        with MemorySampler() as memory:
+            started = time.perf_counter()
+            response = self.session.post(f'{self.server_url}/api/convert-project', data={
+                'source_lang': source_lang,
+                'target_lang': target_lang,
+                'type': 'zip'
+            }, files={'folder_files': ('project.zip', data, 'application/zip')})
+            payload = response.json()
+            if not payload.get('success'):
+                raise RuntimeError(f'提交项目转换失败: {payload.get("error")}')
+            job_id = payload['job_id']
+            submitted = time.perf_counter() - started
+
+            # 按进度中已完成文件数的变化记录每个文件的完成时间
+            done = 0
+            deadline = time.perf_counter() + self.timeout
+            while True:
+                status = self.session.get(f'{self.server_url}/api/jobs/{job_id}', timeout=10).json()
+                now = time.perf_counter() - started
+                progress = status.get('progress') or {}
+                current = progress.get('current', done)
+                completions.extend([now] * max(0, current - done))
+                done = max(done, current)
+                if status.get('status') in ('completed', 'failed', 'cancelled'):
+                    break
+                if time.perf_counter() > deadline:
+                    self.session.post(f'{self.server_url}/api/jobs/{job_id}/cancel', timeout=10)
+                    error = '任务超时'
+                    break
+                time.sleep(_POLL_INTERVAL)
+            converted_at = time.perf_counter() - started
+
+            if status.get('status') == 'completed':
+                download = self.session.get(f'{self.server_url}/api/jobs/{job_id}/download')
+                with zipfile.ZipFile(io.BytesIO(download.content)) as zf:
+                    result_files = len(zf.namelist())
+            elif error is None:
+                error = status.get('error') or status.get('status')
+        elapsed = time.perf_counter() - started
+        api_calls = self._api_calls() - calls_before
+
+        # 去重复用的文件不计入进度，补齐为任务完成时间
+        completions.extend([converted_at] * max(0, files - len(completions)))
+        return {
+            'scenario': f'project {source_lang}->{target_lang}',
+            'files': files,
+            'failures': files - result_files,
+            'error': error,
+            'upload_seconds': _round(submitted, 3),
+            'seconds': _round(converted_at, 3),
+            'download_seconds': _round(elapsed - converted_at, 3),
+            'files_per_second': _round(files / converted_at if converted_at else None, 2),
+            'latency': latency_summary(completions),
+            'api_calls_per_file': _round(api_calls / files if files else None, 3),
+            'peak_rss_mb': _round(memory.peak / 1024 / 1024, 1) if self.measure_memory else None
+        }
+
+
+def start_local_services(mock: MockLLMServer, validate: bool) -> str:
+    """
+    在本进程内启动转换服务，API 指向模拟接口
+
+    Returns:
+        转换服务地址
+    """
+    # 服务在导入时按配置创建客户端和转换器，导入前直接修改配置类（此时 .env 已经加载）
+    from config.api_config import APIConfig
+    from config.app_config import AppConfig
+    APIConfig.DEEPSEEK_API_BASE = mock.url
+    APIConfig.DEEPSEEK_API_KEY = 'benchmark'
+    APIConfig.DEEPSEEK_MODEL = mock.model
+    APIConfig.BACKENDS = ''
+    AppConfig.CACHE_DB_PATH = ''
+    AppConfig.SIMILARITY_ENABLED = False
+    AppConfig.SIMILARITY_DB_PATH = ''
+    AppConfig.VALIDATION_ENABLED = validate
+    import logging
+    from werkzeug.serving import make_server
+    from src.web.server import app
+
+    # 压测时的逐文件日志会显著拖慢服务
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    httpd = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{httpd.server_port}'
+
+
+def compare(results: List[Dict], baseline: List[Dict]) -> List[str]:
+    """
+    与基线结果对比，返回变差超过阈值的指标说明
+
+    Args:
+        results: 本次结果
+        baseline: 基线结果
+
+    Returns:
+        回退说明列表
+    """
+    regressions = []
+    previous = {item['scenario']: item for item in baseline}
+    # (指标名, 取值函数, 数值越大越好)
+    metrics = [
+        ('files_per_second', lambda r: r.get('files_per_second'), True),
+        ('p50', lambda r: r['latency']['p50'], False),
+        ('p95', lambda r: r['latency']['p95'], False),
+        ('p99', lambda r: r['latency']['p99'], False),
+        ('api_calls_per_file', lambda r: r.get('api_calls_per_file'), False),
+        ('peak_rss_mb', lambda r: r.get('peak_rss_mb'), False),
+    ]
+    for result in results:
+        base = previous.get(result['scenario'])
+        if base is None:
+            continue
+        for name, value_of, higher_is_better in metrics:
+            current, before = value_of(result), value_of(base)
+            if not current or not before:
+                continue
+            change = (current - before) / before
+            print(f'  {result["scenario"]:<28} {name:<20} {before:>10} -> {current:<10} ({change:+.1%})')
+            if (-change if higher_is_better else change) > _REGRESSION_THRESHOLD:
+                regressions.append(f'{result["scenario"]} {name}: {before} -> {current} ({change:+.1%})')
+    return regressions
+
+
+def print_results(results: List[Dict]):
+    header = f'{"scenario":<28} {"files":>6} {"fail":>5} {"files/s":>9} {"p50":>8} {"p95":>8} {"p99":>8} ' \
+             f'{"calls/file":>10} {"peak MB":>8}'
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        latency = r['latency']
+        print(f'{r["scenario"]:<28} {r["files"]:>6} {r["failures"]:>5} {_fmt(r["files_per_second"]):>9} '
+              f'{_fmt(latency["p50"]):>8} {_fmt(latency["p95"]):>8} {_fmt(latency["p99"]):>8} '
+              f'{_fmt(r["api_calls_per_file"]):>10} {_fmt(r["peak_rss_mb"]):>8}')
+
+
+def _fmt(value) -> str:
+    return '-' if value is None else f'{value:g}'
+
+
+def _parse_pairs(value: str) -> List[Tuple[str, str]]:
+    pairs = []
+    for item in value.split(','):
+        source_lang, _, target_lang = item.strip().partition(':')
+        if source_lang not in SAMPLES or not target_lang:
+            raise argparse.ArgumentTypeError(f'无效的语言对: {item}（格式为 源语言:目标语言，源语言可选 {", ".join(SAMPLES)}）')
+        pairs.append((source_lang, target_lang))
+    return pairs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='转换服务端到端压测')
+    parser.add_argument('--pairs', type=_parse_pairs, default=_parse_pairs('c:python,python:js,java:python,js:python'),
+                        help='逗号分隔的 源语言:目标语言 列表')
+    parser.add_argument('--files', type=int, default=2000, help='每个项目转换场景的文件数，为0时跳过')
+    parser.add_argument('--convert-requests', type=int, default=200, help='每个单文件转换场景的请求数，为0时跳过')
+    parser.add_argument('--concurrency', type=int, default=16, help='单文件转换的并发请求数')
+    parser.add_argument('--timeout', type=float, default=1800, help='单个请求或项目任务的超时（秒）')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟接口首个token前的延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='模拟接口附加随机延迟上限（秒）')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='模拟接口输出速率，为0时不限速')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='模拟接口 HTTP 500 的概率')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='模拟接口 HTTP 429 的概率')
+    parser.add_argument('--retry-after', type=float, default=0.2, help='模拟接口 429 响应的 Retry-After 秒数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--validate', action='store_true', help='打开转换结果验证（仅本进程内启动服务时有效）')
+    parser.add_argument('--server-url', help='压测已运行的转换服务，不在本进程内启动')
+    parser.add_argument('--mock-url', help='已运行的模拟接口地址（与 --server-url 搭配，用于统计接口调用次数）')
+    parser.add_argument('--output', help='结果JSON的保存路径')
+    parser.add_argument('--baseline', help='基线结果JSON，指标变差超过10%%时以非零状态退出')
+    args = parser.parse_args()
+
+    mock = None
+    if args.server_url:
+        if not args.mock_url:
+            parser.error('使用 --server-url 时需要同时指定 --mock-url')
+        server_url = args.server_url
+        mock_stats_url = args.mock_url.rstrip('/').rsplit('/v1', 1)[0] + '/stats'
+    else:
+        mock = MockLLMServer(latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+                             error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                             retry_after=args.retry_after, seed=args.seed).start()
+        server_url = start_local_services(mock, args.validate)
+        mock_stats_url = mock.url.rsplit('/v1', 1)[0] + '/stats'
+
+    benchmark = Benchmark(server_url, mock_stats_url, args.concurrency, args.timeout,
+                          measure_memory=mock is not None)
+    results = []
+    try:
+        for source_lang, target_lang in args.pairs:
+            if args.convert_requests > 0:
+                results.append(benchmark.run_convert(source_lang, target_lang, args.convert_requests))
+            if args.files > 0:
+                results.append(benchmark.run_project(source_lang, target_lang, args.files))
+            print(f'完成 {source_lang}->{target_lang}', file=sys.stderr)
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    print_results(results)
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('pairs', 'baseline', 'output')},
+        'pairs': [f'{s}:{t}' for s, t in args.pairs],
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    exit_code = 1 if any(r['failures'] for r in results) else 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n与基线对比:')
+        regressions = compare(results, baseline.get('results', []))
+        if regressions:
+            print('\n性能回退:')
+            for line in regressions:
+                print(f'  {line}')
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
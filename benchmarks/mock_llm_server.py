@@ -0,0 +1,338 @@
+"""
+本地模拟的 OpenAI 兼容接口服务，用于在不消耗真实 API 额度的情况下测量转换服务的吞吐量
+
+响应内容是提示中的源代码（包裹在Markdown代码块中），支持注入延迟、输出速率、服务端错误和429限流。
+每个请求是否出错只由随机种子、提示内容和该提示的重试次数决定，与请求到达的先后顺序无关，
+同样的参数多次运行得到相同的错误序列。
+
+用法：
+    python benchmarks/mock_llm_server.py --port 8001 --latency 0.2 --tokens-per-second 400 --error-rate 0.02
+
+然后将 DEEPSEEK_API_BASE 设置为 http://127.0.0.1:8001/v1 启动转换服务。
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# 将项目根目录添加到 Python 路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api_client.custom_client import extract_prompt_code
+from src.utils.token_estimator import estimate_tokens
+
+# 流式响应每个片段的字符数
+_STREAM_CHUNK_CHARS = 64
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    计算百分位数（线性插值）
+
+    Args:
+        values: 观测值
+        pct: 百分位，0-100
+
+    Returns:
+        百分位数，没有观测值时返回None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class MockLLMServer:
+    """模拟的 OpenAI 兼容 chat/completions 接口"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.05, jitter: float = 0.0,
+                 tokens_per_second: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0, model: str = 'mock-llm'):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，为0时随机选择空闲端口
+            latency: 每个请求的固定延迟（秒，首个token前）
+            jitter: 在固定延迟之上附加的随机延迟上限（秒）
+            tokens_per_second: 输出速率（token/秒），为0时不限速
+            error_rate: 请求以 HTTP 500 失败的概率
+            rate_limit_rate: 请求以 HTTP 429 失败的概率
+            retry_after: 429 响应中 Retry-After 头的秒数
+            seed: 随机种子
+            model: 响应中的模型名称
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.model = model
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self._thread = None
+        self.reset()
+
+        handler = type('Handler', (_Handler,), {'mock': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """OpenAI 客户端使用的 base_url"""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self) -> 'MockLLMServer':
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._attempts.clear()
+            self._stats = {
+                'requests': 0,
+                'completions': 0,
+                'server_errors': 0,
+                'rate_limited': 0,
+                'truncated': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0
+            }
+            self._latencies: List[float] = []
+
+    def stats(self) -> Dict:
+        """
+        请求统计
+
+        Returns:
+            请求数、各类错误数、token用量与成功请求的服务端耗时百分位
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = list(self._latencies)
+        stats['latency'] = {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99)
+        }
+        return stats
+
+    def plan(self, prompt: str, partial: str) -> Tuple[str, float]:
+        """
+        决定一次请求的结果
+
+        Args:
+            prompt: 用户提示
+            partial: 续写请求中已输出的内容
+
+        Returns:
+            (结果类型 ok/error/rate_limit, 附加延迟秒数)
+        """
+        key = hashlib.sha256(f'{prompt}\0{len(partial)}'.encode('utf-8')).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            self._stats['requests'] += 1
+        digest = hashlib.sha256(f'{self.seed}\0{key}\0{attempt}'.encode('utf-8')).digest()
+        roll = int.from_bytes(digest[:8], 'big') / 2 ** 64
+        delay = self.latency + self.jitter * (int.from_bytes(digest[8:16], 'big') / 2 ** 64)
+        if roll < self.rate_limit_rate:
+            return 'rate_limit', delay
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'error', delay
+        return 'ok', delay
+
+    def complete(self, prompt: str, partial: str, max_tokens: Optional[int]) -> Tuple[str, str, int]:
+        """
+        生成响应内容：完整响应为提示中的代码，续写请求返回剩余部分，超出 max_tokens 时截断
+
+        Returns:
+            (内容, finish_reason, 输出token数)
+        """
+        full = f'```\n{extract_prompt_code(prompt)}\n```'
+        remaining = full[len(partial):] if full.startswith(partial) else full
+        tokens = estimate_tokens(remaining)
+        if max_tokens and tokens > max_tokens:
+            cut = max(1, int(len(remaining) * max_tokens / tokens))
+            return remaining[:cut], 'length', max_tokens
+        return remaining, 'stop', tokens
+
+    def record(self, outcome: str, prompt: str = '', completion_tokens: int = 0,
+               finish_reason: str = 'stop', elapsed: float = 0.0):
+        with self._lock:
+            if outcome == 'rate_limit':
+                self._stats['rate_limited'] += 1
+            elif outcome == 'error':
+                self._stats['server_errors'] += 1
+            else:
+                self._stats['completions'] += 1
+                self._stats['prompt_tokens'] += estimate_tokens(prompt)
+                self._stats['completion_tokens'] += completion_tokens
+                self._stats['truncated'] += int(finish_reason == 'length')
+                self._latencies.append(elapsed)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock: MockLLMServer = None
+
+    def log_message(self, format, *args):
+        # 压测时请求量很大，不输出访问日志
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.mock.stats())
+        elif self.path.rstrip('/') in ('/v1/models', '/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': self.mock.model, 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        path = self.path.rstrip('/')
+        if path == '/reset':
+            self.mock.reset()
+            self._send_json(200, {'ok': True})
+            return
+        if not path.endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'invalid JSON', 'type': 'invalid_request_error'}})
+            return
+
+        started = time.monotonic()
+        messages = payload.get('messages') or []
+        prompt = next((m.get('content') or '' for m in messages if m.get('role') == 'user'), '')
+        partial = next((m.get('content') or '' for m in messages if m.get('role') == 'assistant'), '')
+        outcome, delay = self.mock.plan(prompt, partial)
+        time.sleep(delay)
+
+        if outcome == 'rate_limit':
+            self.mock.record(outcome)
+            self._send_json(429, {'error': {'message': 'rate limit exceeded', 'type': 'rate_limit_error'}},
+                            {'Retry-After': str(self.mock.retry_after)})
+            return
+        if outcome == 'error':
+            self.mock.record(outcome)
+            self._send_json(500, {'error': {'message': 'injected server error', 'type': 'server_error'}})
+            return
+
+        content, finish_reason, completion_tokens = self.mock.complete(prompt, partial, payload.get('max_tokens'))
+        if payload.get('stream'):
+            self._send_stream(content, finish_reason, completion_tokens)
+        else:
+            if self.mock.tokens_per_second > 0:
+                time.sleep(completion_tokens / self.mock.tokens_per_second)
+            self._send_json(200, {
+                'id': f'chatcmpl-{uuid.uuid4().hex}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': payload.get('model') or self.mock.model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': finish_reason
+                }],
+                'usage': {
+                    'prompt_tokens': estimate_tokens(prompt),
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': estimate_tokens(prompt) + completion_tokens
+                }
+            })
+        self.mock.record(outcome, prompt, completion_tokens, finish_reason, time.monotonic() - started)
+
+    def _send_json(self, status: int, data: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content: str, finish_reason: str, completion_tokens: int):
+        # 流式响应长度未知，发送完毕后关闭连接
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        pieces = [content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)]
+        pause = 0.0
+        if self.mock.tokens_per_second > 0 and pieces:
+            pause = completion_tokens / self.mock.tokens_per_second / len(pieces)
+        for index, piece in enumerate(pieces + [None]):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': self.mock.model,
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': piece} if piece is not None else {},
+                    'finish_reason': finish_reason if piece is None else None
+                }]
+            }
+            if pause and piece is not None:
+                time.sleep(pause)
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟的 OpenAI 兼容接口服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=0.05, help='首个token前的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='附加随机延迟上限（秒）')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='输出速率，为0时不限速')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='HTTP 500 的概率')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='HTTP 429 的概率')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='429 响应的 Retry-After 秒数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.jitter, args.tokens_per_second,
+                           args.error_rate, args.rate_limit_rate, args.retry_after, args.seed)
+    print(f'模拟接口已启动: {server.url}（统计: GET http://{args.host}:{server.httpd.server_address[1]}/stats）')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,35 @@ class APIConfig:
     # API请求配置
     TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
     MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+    # 单个请求含重试的总时限（秒），为0时取 TIMEOUT * (MAX_RETRIES + 1)
+    REQUEST_DEADLINE = float(os.getenv("API_REQUEST_DEADLINE", "0"))
+    
+    # 限流配置：每秒请求数（为0时不限速）与允许的突发请求数
+    RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "0"))
+    RATE_BURST = int(os.getenv("API_RATE_BURST", "10"))
+    
+    # 异步客户端并发与连接池配置
+    MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "32"))
+    POOL_CONNECTIONS = int(os.getenv("API_POOL_CONNECTIONS", "32"))
+    
+    # 输出token预算配置：按输入长度和语言对估算 max_tokens，并限制在上下限之间
+    MIN_OUTPUT_TOKENS = int(os.getenv("API_MIN_OUTPUT_TOKENS", "256"))
+    MAX_OUTPUT_TOKENS = int(os.getenv("API_MAX_OUTPUT_TOKENS", "8192"))
+    # 估算值之上预留的比例
+    OUTPUT_TOKEN_MARGIN = float(os.getenv("API_OUTPUT_TOKEN_MARGIN", "0.3"))
+    # 输出因长度被截断时自动续写的最大次数
+    MAX_CONTINUATIONS = int(os.getenv("API_MAX_CONTINUATIONS", "3"))
+    
+    # 多后端配置：JSON列表，每项包含 name、type(openai/deepseek/mock)、api_base、api_key 或 api_key_env、
+    # model、weight、max_retries、rate_limit 等字段；为空时只使用上面的DeepSeek配置
+    BACKENDS = os.getenv("API_BACKENDS", "")
+    # 路由策略：least_outstanding（在途请求最少）或 weighted_round_robin（平滑加权轮询）
+    ROUTING = os.getenv("API_ROUTING", "least_outstanding")
+    # 多后端时单个后端的重试次数，失败后由注册表切换到其他后端
+    BACKEND_MAX_RETRIES = int(os.getenv("API_BACKEND_MAX_RETRIES", "1"))
+    # 熔断配置：连续失败次数阈值与断开后到允许探测请求的秒数
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("API_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("API_CIRCUIT_RESET_TIMEOUT", "30"))
     
     # 请求头配置
     HEADERS = {
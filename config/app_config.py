@@ -17,4 +17,109 @@ class AppConfig:
     
     # 日志配置
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
\ No newline at end of file
+    LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+    # 日志格式：text 或 json（每行一个JSON对象）
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    # 逐文件、逐请求等高频日志的保留比例（WARNING及以上不抽样）
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+    
+    # 项目转换进度配置：PROGRESS_DB_PATH 为空时进度只保存在当前进程，
+    # 多进程部署（如多worker的gunicorn）时设置为共享的SQLite文件路径
+    PROGRESS_DB_PATH = os.getenv("PROGRESS_DB_PATH", "")
+    # 已结束任务的进度保留时间（秒）、SSE心跳间隔（秒）、跨进程检查进度的间隔（秒）
+    PROGRESS_TTL = int(os.getenv("PROGRESS_TTL", "3600"))
+    PROGRESS_HEARTBEAT = float(os.getenv("PROGRESS_HEARTBEAT", "15"))
+    PROGRESS_POLL_INTERVAL = float(os.getenv("PROGRESS_POLL_INTERVAL", "0.2"))
+    # 逐文件进度事件的最小发布间隔（秒），状态变化总是立即发布
+    PROGRESS_MIN_INTERVAL = float(os.getenv("PROGRESS_MIN_INTERVAL", "0.1"))
+    
+    # 项目转换清单数据库路径：逐文件记录转换结果，失败或取消的任务可以续转，
+    # 再次上传同一项目时只转换内容变化的文件；为空时不记录
+    MANIFEST_DB_PATH = os.getenv("MANIFEST_DB_PATH", "data/manifest.db")
+    
+    # 语言对提示规则文件（docs/prompt_template.md 格式，“## 源语言 -> 目标语言” 小节），相对路径从项目根目录查找
+    PROMPT_TEMPLATE_PATH = os.getenv("PROMPT_TEMPLATE_PATH", "docs/prompt_template.md")
+    
+    # 上传配额：上传文件的总字节数、文件数和单个文件大小上限（ZIP按解压后的成员计算），
+    # 在接收请求体时逐块检查，超出时立即返回413；单个文件超过 UPLOAD_SPOOL_BYTES 后写入磁盘临时文件
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+    UPLOAD_MAX_FILES = int(os.getenv("UPLOAD_MAX_FILES", "20000"))
+    UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(100 * 1024 * 1024)))
+    UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+    
+    # 项目转换工作目录配置：WORKSPACE_ROOT 为空时使用系统临时目录；任务结束后超过 WORKSPACE_TTL 秒未使用的目录
+    # 由后台线程定期（WORKSPACE_REAP_INTERVAL 秒）删除，所有目录的占用超过 WORKSPACE_MAX_BYTES 时
+    # 从最久未使用的开始淘汰（为0时不限制）；目录删除后任务和进度记录一并删除
+    WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", "")
+    WORKSPACE_TTL = int(os.getenv("WORKSPACE_TTL", str(6 * 3600)))
+    WORKSPACE_MAX_BYTES = int(os.getenv("WORKSPACE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+    WORKSPACE_REAP_INTERVAL = float(os.getenv("WORKSPACE_REAP_INTERVAL", "60"))
+    
+    # 结果下载由前端服务器发送文件（X-Sendfile 头，需要 Apache mod_xsendfile 等支持）
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "False").lower() == "true"
+    
+    # 相似文件复用配置：按归一化的词法记号流（名称和字面量替换为占位符）计算MinHash签名，
+    # 只有标识符名称不同的文件由已转换文件的结果替换名称得到，不调用API；相似度不低于
+    # SIMILARITY_THRESHOLD 的文件只发送已转换文件的结果和源代码差异；记号数少于 SIMILARITY_MIN_TOKENS 的文件不参与
+    SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "True").lower() == "true"
+    SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.8"))
+    SIMILARITY_MIN_TOKENS = int(os.getenv("SIMILARITY_MIN_TOKENS", "50"))
+    # 跨任务的相似文件库路径，为空（默认）时只在本次任务内复用；设置后同名项目（project）之后的任务
+    # 可以复用之前任务的结果，不同项目之间不复用；条目保留时间（秒）
+    SIMILARITY_DB_PATH = os.getenv("SIMILARITY_DB_PATH", "")
+    SIMILARITY_TTL = int(os.getenv("SIMILARITY_TTL", str(30 * 24 * 3600)))
+    
+    # 项目转换并发配置
+    CONVERT_WORKERS = int(os.getenv("CONVERT_WORKERS", "8"))
+    MAX_INFLIGHT_CONVERSIONS = int(os.getenv("MAX_INFLIGHT_CONVERSIONS", "16"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    
+    # 转换结果缓存配置
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # 持久化缓存数据库路径，为空时只使用内存缓存
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", str(7 * 24 * 3600)))
+    
+    # 大文件分块转换配置
+    CHUNK_THRESHOLD_CHARS = int(os.getenv("CHUNK_THRESHOLD_CHARS", "12000"))
+    CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "6000"))
+    CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "4"))
+    
+    # 支持的代码文件扩展名
+    SUPPORTED_EXTENSIONS = {
+        'c': ['.c', '.h'],
+        'python': ['.py'],
+        'java': ['.java'],
+        'js': ['.js', '.jsx']
+    }
+    
+    # 项目文件索引配置：参与转换的单个文件大小上限（字节）
+    MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", str(1024 * 1024)))
+    
+    # 依赖顺序转换配置：按导入关系分层转换，并向每个文件附加其依赖的符号摘要
+    DEPENDENCY_ORDERING = os.getenv("DEPENDENCY_ORDERING", "True").lower() == "true"
+    # 单个依赖文件符号摘要的最大字符数
+    SYMBOL_SUMMARY_MAX_CHARS = int(os.getenv("SYMBOL_SUMMARY_MAX_CHARS", "1500"))
+    # 附加到单个文件提示中的依赖摘要总字符数上限
+    DEPENDENCY_CONTEXT_MAX_CHARS = int(os.getenv("DEPENDENCY_CONTEXT_MAX_CHARS", "6000"))
+    
+    # 转换结果语法验证配置：验证在独立进程池中运行
+    VALIDATION_ENABLED = os.getenv("VALIDATION_ENABLED", "True").lower() == "true"
+    # 验证进程数，为0时使用CPU核数
+    VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "0"))
+    VALIDATION_TIMEOUT = float(os.getenv("VALIDATION_TIMEOUT", "10"))
+    # 外部语法检查工具，找不到时退回到括号配对检查
+    C_COMPILER = os.getenv("C_COMPILER", "cc")
+    JAVAC_EXECUTABLE = os.getenv("JAVAC_EXECUTABLE", "javac")
+    NODE_EXECUTABLE = os.getenv("NODE_EXECUTABLE", "node")
+    
+    # 验证失败后的自动修复配置：单个文件的最大修复轮数（为0时只验证不修复）和同时进行的修复请求数
+    REPAIR_MAX_ROUNDS = int(os.getenv("REPAIR_MAX_ROUNDS", "2"))
+    REPAIR_WORKERS = int(os.getenv("REPAIR_WORKERS", "4"))
+    
+    # 批量转换配置：单次请求的最大代码段数、单个打包提示的源代码token预算和最大代码段数
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_TOKEN_BUDGET = int(os.getenv("BATCH_TOKEN_BUDGET", "2000"))
+    BATCH_MAX_ITEMS_PER_PROMPT = int(os.getenv("BATCH_MAX_ITEMS_PER_PROMPT", "20"))
@@ -1,7 +1,14 @@
 class PromptConfig:
     """提示模板配置类"""
     
-    # 代码转换基础提示模板
+    # 系统提示
+    SYSTEM_PROMPT = "你是一位专业的代码转换工程师。"
+    
+    # 输出因长度被截断后的续写提示
+    CONTINUE_PROMPT = "你的输出因长度限制被截断。请从中断处直接继续输出剩余内容，不要重复已输出的部分，不要添加任何解释或额外的代码块标记。"
+    
+    # 代码转换基础提示模板：只包含不随代码变化的转换要求，原代码由 CODE_PROMPT 接在提示末尾，
+    # 使同一语言对的请求共享相同的前缀
     BASE_PROMPT = """
     你是一位专业的代码转换工程师，请将以下代码从{source_lang}转换为{target_lang}。
     
@@ -16,9 +23,85 @@ class PromptConfig:
     8. 不要添加任何额外的解释或说明
     
     请直接输出转换后的完整代码，不要包含任何其他内容。
+    """
     
+    # 语言对规则的提示模板，规则来自 PAIR_PROMPTS 或 AppConfig.PROMPT_TEMPLATE_PATH 指向的文件
+    PAIR_RULES_PROMPT = """
+    针对本次语言组合的转换规则：
+    {rules}
+    """
+    
+    # 语言对规则：键为 (源语言, 目标语言)，语言可以写为 * 表示任意语言
+    PAIR_PROMPTS = {}
+    
+    # 提示末尾的原代码段，其后直接接源代码
+    CODE_PROMPT = """
     原代码：
-    {code}
+"""
+    
+    # 分块转换时附加的共享上下文提示模板
+    CHUNK_CONTEXT_PROMPT = """
+    注意：原代码只是一个较大源文件的一部分。该文件中的共享上下文（导入、类型声明、常量等）如下，仅供参考：
+    {context}
+    
+    只转换原代码部分，不要在输出中重复上述共享上下文。
+    """
+    
+    # 大类按成员分块转换时，附加在各成员块提示中的说明
+    CHUNK_MEMBER_PROMPT = """
+    注意：原代码是类 {enclosing} 的部分成员，该类的其他成员在其他请求中转换。
+    只输出这些成员转换后的代码，不要输出类声明和类的结束括号，成员代码不要整体缩进。
+    """
+    
+    # 大类按成员分块转换时，附加在文件骨架提示中的说明
+    CHUNK_SKELETON_PROMPT = """
+    注意：原代码中类 {enclosing} 的成员已省略，将在其他请求中转换。
+    只转换类声明和类之外的代码，类体保持为空（目标语言要求时使用空语句占位）。
+    """
+    
+    # 按依赖顺序转换时附加的已转换依赖符号摘要提示模板
+    DEPENDENCY_CONTEXT_PROMPT = """
+    注意：原代码依赖项目中的其他文件，这些文件已转换为目标语言，其中的顶层定义如下：
+    {symbols}
+    
+    引用这些定义时请沿用上述名称和签名，不要在输出中重复它们的实现。
+    """
+    
+    # 代码不在提示末尾时（参考结果、修复提示），用独占一行的分隔符标出代码的起止
+    CODE_BLOCK_BEGIN = "<<<CODE"
+    CODE_BLOCK_END = "CODE>>>"
+    
+    # 参照相似文件转换时附加的提示模板，原代码部分只提供与参考文件的差异
+    DELTA_PROMPT = """
+    注意：项目中有一个与原代码结构相似的参考文件，已转换为{target_lang}，转换结果位于下面的 <<<CODE 与 CODE>>> 两行之间：
+<<<CODE
+{reference_output}
+CODE>>>
+    
+    下面只给出参考文件的原代码与原代码之间的差异（unified diff，以 - 开头的行只在参考文件中，以 + 开头的行只在原代码中）。
+    请在参考文件转换结果的基础上体现这些差异，输出原代码完整的转换结果，命名风格和代码结构与参考文件保持一致。
+    """
+    
+    # 差异提示末尾的差异段，其后直接接 unified diff
+    DELTA_CODE_PROMPT = """
+    原代码与参考文件的差异：
+"""
+    
+    # 批量转换提示模板：多段独立代码共用一次请求，按分隔行拆分结果
+    BATCH_PROMPT = """
+    你是一位专业的代码转换工程师，请将以下多段代码分别从{source_lang}转换为{target_lang}。
+    
+    转换要求：
+    1. 各段代码相互独立，分别转换，保持各自的功能和逻辑完全一致
+    2. 遵循目标语言的最佳实践和编码规范
+    3. 保留所有重要的注释（如果有）
+    4. 不要添加任何额外的解释或说明
+    
+    输出格式：每段转换结果放在与原代码编号相同的分隔行之间：
+    ### BEGIN <编号>
+    转换后的代码
+    ### END <编号>
+    按原顺序输出全部代码段，不要省略任何一段，不要使用Markdown代码块标记。
     """
     
     # 错误修复提示模板
@@ -26,10 +109,14 @@ class PromptConfig:
     以下代码在转换后出现了错误，请分析并修复：
     
     原代码({source_lang})：
-    {original_code}
+<<<CODE
+{original_code}
+CODE>>>
     
     转换后代码({target_lang})：
-    {converted_code}
+<<<CODE
+{converted_code}
+CODE>>>
     
     错误信息：
     {error_message}
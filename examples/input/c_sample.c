@@ -0,0 +1,88 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef struct Node {
+    int value;
+    struct Node *next;
+} Node;
+
+typedef struct {
+    Node *head;
+    int size;
+} Stack;
+
+void stack_init(Stack *stack) {
+    stack->head = NULL;
+    stack->size = 0;
+}
+
+int stack_push(Stack *stack, int value) {
+    Node *node = (Node *)malloc(sizeof(Node));
+    if (node == NULL) {
+        return -1;
+    }
+    node->value = value;
+    node->next = stack->head;
+    stack->head = node;
+    stack->size++;
+    return 0;
+}
+
+int stack_pop(Stack *stack, int *value) {
+    if (stack->head == NULL) {
+        return -1;
+    }
+    Node *node = stack->head;
+    *value = node->value;
+    stack->head = node->next;
+    stack->size--;
+    free(node);
+    return 0;
+}
+
+void stack_free(Stack *stack) {
+    int value;
+    while (stack_pop(stack, &value) == 0) {
+    }
+}
+
+/* 计算逆波兰表达式，只支持个位数和 + - * / */
+int eval_rpn(const char *expr, int *result) {
+    Stack stack;
+    stack_init(&stack);
+    for (size_t i = 0; i < strlen(expr); i++) {
+        char ch = expr[i];
+        if (ch >= '0' && ch <= '9') {
+            stack_push(&stack, ch - '0');
+        } else if (ch == '+' || ch == '-' || ch == '*' || ch == '/') {
+            int b, a;
+            if (stack_pop(&stack, &b) != 0 || stack_pop(&stack, &a) != 0) {
+                stack_free(&stack);
+                return -1;
+            }
+            switch (ch) {
+                case '+': stack_push(&stack, a + b); break;
+                case '-': stack_push(&stack, a - b); break;
+                case '*': stack_push(&stack, a * b); break;
+                case '/': stack_push(&stack, b == 0 ? 0 : a / b); break;
+            }
+        }
+    }
+    int ok = stack.size == 1 ? stack_pop(&stack, result) : -1;
+    stack_free(&stack);
+    return ok;
+}
+
+int main(void) {
+    const char *expressions[] = {"34+2*", "93-4/", "12+34+*"};
+    for (int i = 0; i < 3; i++) {
+        int result;
+        if (eval_rpn(expressions[i], &result) == 0) {
+            printf("%s = %d\n", expressions[i], result);
+        } else {
+            printf("%s: invalid expression\n", expressions[i]);
+        }
+    }
+    return 0;
+}
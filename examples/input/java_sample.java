@@ -0,0 +1,81 @@
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+public class java_sample {
+
+    static class Account {
+        private final String owner;
+        private double balance;
+        private final List<String> log = new ArrayList<>();
+
+        Account(String owner, double balance) {
+            this.owner = owner;
+            this.balance = balance;
+        }
+
+        boolean withdraw(double amount) {
+            if (amount <= 0 || amount > balance) {
+                log.add("rejected withdraw " + amount);
+                return false;
+            }
+            balance -= amount;
+            log.add("withdraw " + amount);
+            return true;
+        }
+
+        void deposit(double amount) {
+            if (amount <= 0) {
+                throw new IllegalArgumentException("amount must be positive");
+            }
+            balance += amount;
+            log.add("deposit " + amount);
+        }
+
+        double getBalance() {
+            return balance;
+        }
+
+        String getOwner() {
+            return owner;
+        }
+    }
+
+    static class Bank {
+        private final Map<String, Account> accounts = new HashMap<>();
+
+        Account open(String owner, double initial) {
+            Account account = new Account(owner, initial);
+            accounts.put(owner, account);
+            return account;
+        }
+
+        boolean transfer(String from, String to, double amount) {
+            Account source = accounts.get(from);
+            Account target = accounts.get(to);
+            if (source == null || target == null || !source.withdraw(amount)) {
+                return false;
+            }
+            target.deposit(amount);
+            return true;
+        }
+
+        double totalDeposits() {
+            double total = 0;
+            for (Account account : accounts.values()) {
+                total += account.getBalance();
+            }
+            return total;
+        }
+    }
+
+    public static void main(String[] args) {
+        Bank bank = new Bank();
+        bank.open("alice", 100);
+        bank.open("bob", 50);
+        System.out.println("transfer ok: " + bank.transfer("alice", "bob", 30));
+        System.out.println("transfer ok: " + bank.transfer("bob", "carol", 10));
+        System.out.println("total: " + bank.totalDeposits());
+    }
+}
@@ -0,0 +1,54 @@
+'use strict';
+
+class TaskQueue {
+    constructor(concurrency = 2) {
+        this.concurrency = concurrency;
+        this.running = 0;
+        this.queue = [];
+        this.results = [];
+    }
+
+    push(name, durationMs) {
+        return new Promise((resolve) => {
+            this.queue.push({ name, durationMs, resolve });
+            this.next();
+        });
+    }
+
+    next() {
+        while (this.running < this.concurrency && this.queue.length > 0) {
+            const task = this.queue.shift();
+            this.running++;
+            setTimeout(() => {
+                this.running--;
+                this.results.push(task.name);
+                task.resolve(task.name);
+                this.next();
+            }, task.durationMs);
+        }
+    }
+}
+
+function groupBy(items, keyFn) {
+    return items.reduce((groups, item) => {
+        const key = keyFn(item);
+        (groups[key] = groups[key] || []).push(item);
+        return groups;
+    }, {});
+}
+
+async function main() {
+    const queue = new TaskQueue(2);
+    const names = await Promise.all([
+        queue.push('download', 30),
+        queue.push('parse', 10),
+        queue.push('render', 20)
+    ]);
+    console.log('finished:', names.join(', '));
+    console.log('order:', queue.results.join(', '));
+
+    const words = ['apple', 'avocado', 'banana', 'blueberry', 'cherry'];
+    console.log(groupBy(words, (word) => word[0]));
+}
+
+main();
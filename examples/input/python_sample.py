@@ -0,0 +1,55 @@
+from collections import defaultdict
+from typing import Dict, List
+
+
+class Inventory:
+    """简单的库存管理"""
+
+    def __init__(self):
+        self.items: Dict[str, int] = defaultdict(int)
+        self.history: List[tuple] = []
+
+    def add(self, name: str, quantity: int) -> None:
+        if quantity <= 0:
+            raise ValueError('quantity must be positive')
+        self.items[name] += quantity
+        self.history.append(('add', name, quantity))
+
+    def remove(self, name: str, quantity: int) -> bool:
+        if self.items.get(name, 0) < quantity:
+            return False
+        self.items[name] -= quantity
+        if self.items[name] == 0:
+            del self.items[name]
+        self.history.append(('remove', name, quantity))
+        return True
+
+    def total(self) -> int:
+        return sum(self.items.values())
+
+    def report(self) -> str:
+        lines = [f'{name}: {count}' for name, count in sorted(self.items.items())]
+        return '\n'.join(lines)
+
+
+def word_frequencies(text: str, top: int = 3) -> List[tuple]:
+    counts = defaultdict(int)
+    for word in text.lower().split():
+        word = word.strip('.,!?')
+        if word:
+            counts[word] += 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+
+def main():
+    inventory = Inventory()
+    inventory.add('apple', 5)
+    inventory.add('pear', 2)
+    inventory.remove('apple', 3)
+    print(inventory.report())
+    print('total:', inventory.total())
+    print(word_frequencies('the cat and the hat and the bat'))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,9 @@
 from src.api_client.base_client import BaseAPIClient
+from src.api_client.openai_client import OpenAIClient
 from src.api_client.deepseek_client import DeepSeekAPIClient
+from src.api_client.custom_client import MockAPIClient
+from src.api_client.async_client import AsyncDeepSeekAPIClient
+from src.api_client.registry import Backend, CircuitBreaker, ClientRegistry, build_api_client
 
-__all__ = ["BaseAPIClient", "DeepSeekAPIClient"]
\ No newline at end of file
+__all__ = ["BaseAPIClient", "OpenAIClient", "DeepSeekAPIClient", "MockAPIClient", "AsyncDeepSeekAPIClient",
+           "Backend", "CircuitBreaker", "ClientRegistry", "build_api_client"]
\ No newline at end of file
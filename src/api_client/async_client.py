@@ -0,0 +1,137 @@
+import asyncio
+from typing import List, Optional, Tuple, Union
+
+import httpx
+from openai import AsyncOpenAI
+
+from src.api_client.base_client import BaseAPIClient
+from src.api_client.retry import RetryScheduler, get_retry_scheduler
+from src.utils.token_estimator import TokenBudget, get_token_estimator
+from src.utils.prompt_builder import get_prompt_builder
+from config.api_config import APIConfig
+
+
+class AsyncDeepSeekAPIClient(BaseAPIClient):
+    """基于asyncio的DeepSeek API客户端，共享连接池并限制并发请求数
+
+    连接池和信号量在首次使用时绑定到当前事件循环，同一实例只应在一个事件循环中使用。
+    """
+
+    def __init__(self, api_key: str, api_base: str, model: str,
+                 max_concurrency: Optional[int] = None, max_connections: Optional[int] = None,
+                 retry_scheduler: Optional[RetryScheduler] = None):
+        """
+        初始化异步DeepSeek API客户端
+
+        Args:
+            api_key: DeepSeek API密钥
+            api_base: DeepSeek API基础URL
+            model: 使用的DeepSeek模型名称
+            max_concurrency: 同时在途的最大请求数，默认读取 APIConfig.MAX_CONCURRENCY
+            max_connections: 连接池大小，默认读取 APIConfig.POOL_CONNECTIONS
+            retry_scheduler: 重试调度器，默认使用全局共享的调度器
+        """
+        max_connections = max_connections or APIConfig.POOL_CONNECTIONS
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=APIConfig.TIMEOUT
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=api_base,
+            http_client=self._http_client,
+            # 重试由RetryScheduler统一处理
+            max_retries=0
+        )
+        self.model = model
+        self.max_concurrency = max_concurrency or APIConfig.MAX_CONCURRENCY
+        self._semaphore = None
+        self.retry_scheduler = retry_scheduler or get_retry_scheduler()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """限制在途请求数的信号量，首次使用时创建"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def generate_response(self, prompt: str, budget: Optional[TokenBudget] = None) -> str:
+        """
+        生成API响应，输出因长度被截断时自动续写
+        
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+            
+        Returns:
+            生成的响应文本
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        max_tokens = budget.max_tokens if budget is not None else APIConfig.MAX_OUTPUT_TOKENS
+        text = ''
+        completion_tokens = 0
+        continuations = 0
+        async with self.semaphore:
+            while True:
+                messages = self._build_messages(prompt, text)
+                response = await self.retry_scheduler.acall(lambda timeout: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=False,
+                    temperature=0.1,
+                    max_tokens=max_tokens,
+                    timeout=timeout
+                ))
+                choice = response.choices[0]
+                content = choice.message.content or ''
+                text += content
+                completion_tokens += self._record_usage(response.usage, messages, content)
+                if choice.finish_reason != 'length' or continuations >= APIConfig.MAX_CONTINUATIONS:
+                    break
+                continuations += 1
+                max_tokens = APIConfig.MAX_OUTPUT_TOKENS
+        
+        if budget is not None:
+            budget.record(completion_tokens, truncated=continuations > 0, continuations=continuations)
+        return text.strip()
+    
+    async def code_conversion(self, source_lang: str, target_lang: str, code: str) -> str:
+        """
+        代码转换功能
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+
+        Returns:
+            转换后的代码
+
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        prompt = get_prompt_builder().build(source_lang, target_lang, code)
+
+        return await self.generate_response(prompt, get_token_estimator().budget(source_lang, target_lang, code))
+
+    async def convert_many(self, items: List[Tuple[str, str, str]]) -> List[Union[str, Exception]]:
+        """
+        并发转换多段代码，并发数受信号量限制
+
+        Args:
+            items: (源代码语言, 目标代码语言, 源代码) 列表
+
+        Returns:
+            与输入顺序一致的结果列表，失败的条目为异常对象
+        """
+        return await asyncio.gather(
+            *(self.code_conversion(source_lang, target_lang, code) for source_lang, target_lang, code in items),
+            return_exceptions=True
+        )
+
+    async def aclose(self):
+        """关闭共享的HTTP连接池"""
+        await self._http_client.aclose()
@@ -1,4 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.metrics import count_tokens
+from src.utils.token_estimator import TokenBudget, estimate_tokens
+from config.prompt_config import PromptConfig
 
 class BaseAPIClient(ABC):
     """API客户端基础抽象类"""
@@ -16,12 +21,13 @@ class BaseAPIClient(ABC):
         pass
     
     @abstractmethod
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: str, budget: Optional[TokenBudget] = None) -> str:
         """
         生成API响应
         
         Args:
             prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
             
         Returns:
             生成的响应文本
@@ -31,6 +37,64 @@ class BaseAPIClient(ABC):
         """
         pass
     
+    def generate_response_stream(self, prompt: str, budget: Optional[TokenBudget] = None) -> Iterator[str]:
+        """
+        流式生成API响应，默认实现一次性返回完整响应
+        
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+            
+        Returns:
+            响应文本片段的迭代器
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        yield self.generate_response(prompt, budget)
+    
+    @staticmethod
+    def _build_messages(prompt: str, partial: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        构建对话消息
+        
+        Args:
+            prompt: 提示文本
+            partial: 因长度被截断的已输出内容，非空时追加续写请求
+            
+        Returns:
+            消息列表
+        """
+        messages = [
+            {"role": "system", "content": PromptConfig.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        if partial:
+            messages.append({"role": "assistant", "content": partial})
+            messages.append({"role": "user", "content": PromptConfig.CONTINUE_PROMPT})
+        return messages
+    
+    @staticmethod
+    def _record_usage(usage: Any, messages: List[Dict[str, Any]], content: str) -> int:
+        """
+        统计一次请求的token用量，响应未返回用量（如流式响应）时按文本估算
+        
+        Args:
+            usage: 响应中的用量信息，可以为None
+            messages: 请求的消息列表
+            content: 本次请求输出的文本
+            
+        Returns:
+            输出token数
+        """
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            prompt_tokens = sum(estimate_tokens(message['content']) for message in messages)
+            completion_tokens = estimate_tokens(content)
+        count_tokens(prompt_tokens, completion_tokens)
+        return completion_tokens
+    
     @abstractmethod
     def code_conversion(self, source_lang: str, target_lang: str, code: str) -> str:
         """
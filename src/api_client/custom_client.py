@@ -0,0 +1,156 @@
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+from config.prompt_config import PromptConfig
+from src.api_client.base_client import BaseAPIClient
+from src.utils.error_handler import APIError, RateLimitError
+from src.utils.token_estimator import TokenBudget, estimate_tokens, get_token_estimator
+from src.utils.prompt_builder import get_prompt_builder
+
+# 分隔符之间的代码块，分隔符各自独占一行
+_CODE_BLOCK = re.compile(r'^{}\n(.*?)\n{}$'.format(re.escape(PromptConfig.CODE_BLOCK_BEGIN),
+                                                    re.escape(PromptConfig.CODE_BLOCK_END)),
+                         re.MULTILINE | re.DOTALL)
+# unified diff 的块头，只需要参考文件一侧的起始行号
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+
+def apply_unified_diff(text: str, diff: str) -> Optional[str]:
+    """
+    将 unified diff 应用到文本上
+
+    Args:
+        text: 差异的原始一侧
+        diff: unified diff
+
+    Returns:
+        应用后的文本，差异与文本对不上时返回None
+    """
+    lines = text.splitlines()
+    result = []
+    position = 0
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            start = max(int(header.group(1)) - 1, 0)
+            if start < position or start > len(lines):
+                return None
+            result.extend(lines[position:start])
+            position = start
+        elif line.startswith(('---', '+++')):
+            continue
+        elif line.startswith((' ', '-')):
+            if position >= len(lines) or lines[position] != line[1:]:
+                return None
+            if line.startswith(' '):
+                result.append(line[1:])
+            position += 1
+        elif line.startswith('+'):
+            result.append(line[1:])
+    result.extend(lines[position:])
+    return '\n'.join(result)
+
+
+def extract_prompt_code(prompt: str) -> str:
+    """
+    按 PromptBuilder 的提示布局取出模拟回复应返回的代码
+
+    - 差异提示：将末尾的差异应用到参考文件的转换结果上，对不上时返回参考结果
+    - 转换提示（含批量）：代码位于"原代码："段之后直到提示末尾
+    - 修复提示：最后一个分隔符代码块（转换后代码）
+
+    Args:
+        prompt: 转换、差异或修复提示
+
+    Returns:
+        代码，无法识别布局时返回整个提示
+    """
+    if PromptConfig.DELTA_CODE_PROMPT in prompt:
+        head, diff = prompt.rsplit(PromptConfig.DELTA_CODE_PROMPT, 1)
+        blocks = _CODE_BLOCK.findall(head)
+        if blocks:
+            applied = apply_unified_diff(blocks[-1], diff)
+            return (blocks[-1] if applied is None else applied).strip()
+    if PromptConfig.CODE_PROMPT in prompt:
+        return prompt.split(PromptConfig.CODE_PROMPT, 1)[1].strip()
+    blocks = _CODE_BLOCK.findall(prompt)
+    if blocks:
+        return blocks[-1].strip()
+    return prompt.strip()
+
+
+class MockAPIClient(BaseAPIClient):
+    """本地模拟客户端，不发起网络请求，原样返回提示中的源代码
+
+    用于开发调试、负载测试以及在多后端路由中模拟慢速或不稳定的后端。
+    """
+
+    def __init__(self, api_key: str = '', api_base: str = '', model: str = 'mock',
+                 latency: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        初始化模拟客户端
+
+        Args:
+            api_key: 未使用，与其他客户端保持一致
+            api_base: 未使用，与其他客户端保持一致
+            model: 模型名称
+            latency: 每次请求的模拟延迟（秒）
+            error_rate: 请求以服务端错误（HTTP 503）失败的概率
+            rate_limit_rate: 请求以限流（HTTP 429）失败的概率
+            seed: 随机数种子，便于复现
+        """
+        self.model = model
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_response(self, prompt: str, budget: Optional[TokenBudget] = None) -> str:
+        """
+        模拟生成API响应
+
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算
+
+        Returns:
+            以Markdown代码块包裹的源代码
+
+        Raises:
+            APIError: 按配置的概率模拟请求失败
+        """
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.rate_limit_rate:
+            raise RateLimitError('API调用失败: 模拟限流', 429, 1.0)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise APIError('API调用失败: 模拟服务端错误', 503)
+
+        text = f'```\n{extract_prompt_code(prompt)}\n```'
+        if budget is not None:
+            budget.record(estimate_tokens(text))
+        return text
+
+    def code_conversion(self, source_lang: str, target_lang: str, code: str) -> str:
+        """
+        代码转换功能
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+
+        Returns:
+            以Markdown代码块包裹的源代码
+        """
+        prompt = get_prompt_builder().build(source_lang, target_lang, code)
+        return self.generate_response(prompt, get_token_estimator().budget(source_lang, target_lang, code))
@@ -0,0 +1,145 @@
+from typing import Iterator, Optional
+from openai import OpenAI
+from src.api_client.base_client import BaseAPIClient
+from src.api_client.retry import RetryScheduler, get_retry_scheduler
+from src.utils.error_handler import APIError
+from src.utils.token_estimator import TokenBudget, estimate_tokens, get_token_estimator
+from src.utils.prompt_builder import get_prompt_builder
+from config.api_config import APIConfig
+
+class OpenAIClient(BaseAPIClient):
+    """OpenAI兼容接口（OpenAI、DeepSeek、vLLM、Ollama等）的客户端实现"""
+    
+    def __init__(self, api_key: str, api_base: str, model: str,
+                 retry_scheduler: Optional[RetryScheduler] = None):
+        """
+        初始化OpenAI兼容接口客户端
+        
+        Args:
+            api_key: API密钥
+            api_base: API基础URL（通常以 /v1 结尾）
+            model: 使用的模型名称
+            retry_scheduler: 重试调度器，默认使用全局共享的调度器
+        """
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=api_base,
+            timeout=APIConfig.TIMEOUT,
+            # 重试由RetryScheduler统一处理
+            max_retries=0
+        )
+        self.model = model
+        self.retry_scheduler = retry_scheduler or get_retry_scheduler()
+    
+    def generate_response(self, prompt: str, budget: Optional[TokenBudget] = None) -> str:
+        """
+        生成API响应，输出因长度被截断时自动续写
+        
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+            
+        Returns:
+            生成的响应文本
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        max_tokens = budget.max_tokens if budget is not None else APIConfig.MAX_OUTPUT_TOKENS
+        text = ''
+        completion_tokens = 0
+        continuations = 0
+        while True:
+            messages = self._build_messages(prompt, text)
+            response = self.retry_scheduler.call(lambda timeout: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=False,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                timeout=timeout
+            ))
+            choice = response.choices[0]
+            content = choice.message.content or ''
+            text += content
+            completion_tokens += self._record_usage(response.usage, messages, content)
+            if choice.finish_reason != 'length' or continuations >= APIConfig.MAX_CONTINUATIONS:
+                break
+            # 续写时预算已被证明不足，直接使用最大输出长度
+            continuations += 1
+            max_tokens = APIConfig.MAX_OUTPUT_TOKENS
+        
+        if budget is not None:
+            budget.record(completion_tokens, truncated=continuations > 0, continuations=continuations)
+        return text.strip()
+    
+    def generate_response_stream(self, prompt: str, budget: Optional[TokenBudget] = None) -> Iterator[str]:
+        """
+        流式生成API响应，输出因长度被截断时自动续写
+        
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+            
+        Returns:
+            响应文本片段的迭代器
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        max_tokens = budget.max_tokens if budget is not None else APIConfig.MAX_OUTPUT_TOKENS
+        text = ''
+        continuations = 0
+        while True:
+            messages = self._build_messages(prompt, text)
+            # 只重试建立流的请求，开始输出后出错直接抛出
+            stream = self.retry_scheduler.call(lambda timeout: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                timeout=timeout
+            ))
+            finish_reason = None
+            streamed = len(text)
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    delta = choice.delta.content
+                    if delta:
+                        text += delta
+                        yield delta
+            except Exception as e:
+                raise APIError(f"API调用失败: {str(e)}") from e
+            self._record_usage(None, messages, text[streamed:])
+            if finish_reason != 'length' or continuations >= APIConfig.MAX_CONTINUATIONS:
+                break
+            continuations += 1
+            max_tokens = APIConfig.MAX_OUTPUT_TOKENS
+        
+        if budget is not None:
+            # 流式响应不返回用量，按输出文本估算
+            budget.record(estimate_tokens(text), truncated=continuations > 0, continuations=continuations)
+    
+    def code_conversion(self, source_lang: str, target_lang: str, code: str) -> str:
+        """
+        代码转换功能
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            
+        Returns:
+            转换后的代码
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        prompt = get_prompt_builder().build(source_lang, target_lang, code)
+        
+        return self.generate_response(prompt, get_token_estimator().budget(source_lang, target_lang, code))
\ No newline at end of file
@@ -0,0 +1,407 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from src.api_client.base_client import BaseAPIClient
+from src.api_client.custom_client import MockAPIClient
+from src.api_client.deepseek_client import DeepSeekAPIClient
+from src.api_client.openai_client import OpenAIClient
+from src.api_client.retry import RetryScheduler, TokenBucket
+from src.utils.error_handler import APIError, DeadlineExceededError
+from src.utils.token_estimator import TokenBudget, get_token_estimator
+from src.utils.prompt_builder import get_prompt_builder
+from config.api_config import APIConfig
+
+logger = logging.getLogger(__name__)
+
+# 路由策略
+LEAST_OUTSTANDING = 'least_outstanding'
+WEIGHTED_ROUND_ROBIN = 'weighted_round_robin'
+ROUTING_STRATEGIES = (LEAST_OUTSTANDING, WEIGHTED_ROUND_ROBIN)
+
+# 与请求内容本身有关的错误，换后端也不会成功，直接抛出且不计入后端健康状况
+_REQUEST_ERROR_CODES = {400, 413, 422}
+# 延迟滑动平均中新观测值的权重
+_LATENCY_EWMA_WEIGHT = 0.2
+# 收到429但没有 Retry-After 时的冷却秒数
+_DEFAULT_COOLDOWN = 1.0
+
+
+class CircuitBreaker:
+    """熔断器：连续失败达到阈值后断开，冷却后放行一个探测请求（半开），探测成功则恢复"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 断开前允许的连续失败次数
+            reset_timeout: 断开后到允许探测请求的秒数
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def available(self, now: float) -> bool:
+        """当前是否可以向该后端发送请求（不改变状态）"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now - self._opened_at >= self.reset_timeout
+        return not self._probing
+
+    def on_dispatch(self, now: float):
+        """请求发出前调用，断开状态冷却结束后转为半开并占用唯一的探测名额"""
+        if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self._probing = True
+
+    def on_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probing = False
+
+    def on_ignored(self):
+        """请求结果不反映后端健康状况时调用，不改变状态，只释放探测名额使后续请求可以重新探测"""
+        self._probing = False
+
+    def on_failure(self, now: float):
+        self.consecutive_failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = now
+
+
+class Backend:
+    """注册表中的一个后端及其健康统计"""
+
+    def __init__(self, name: str, client: BaseAPIClient, weight: float = 1.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        初始化后端
+
+        Args:
+            name: 后端名称
+            client: API客户端
+            weight: 路由权重
+            breaker: 熔断器，默认按 APIConfig 配置创建
+        """
+        self.name = name
+        self.client = client
+        self.weight = max(float(weight), 0.01)
+        self.breaker = breaker or CircuitBreaker(APIConfig.CIRCUIT_FAILURE_THRESHOLD,
+                                                 APIConfig.CIRCUIT_RESET_TIMEOUT)
+        # 平滑加权轮询的当前权重与有效权重，失败时有效权重下降，成功后逐步恢复
+        self.current_weight = 0.0
+        self.effective_weight = self.weight
+        self.outstanding = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.ewma_latency = 0.0
+        self.cooldown_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until and self.breaker.available(now)
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            'name': self.name,
+            'model': getattr(self.client, 'model', ''),
+            'weight': self.weight,
+            'effective_weight': round(self.effective_weight, 3),
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'successes': self.successes,
+            'failures': self.failures,
+            'ewma_latency': round(self.ewma_latency, 3),
+            'circuit': self.breaker.state,
+            'cooldown': round(max(0.0, self.cooldown_until - now), 3),
+            'available': self.available(now)
+        }
+
+
+class ClientRegistry(BaseAPIClient):
+    """多后端API客户端：按策略选择后端，跟踪健康状况并熔断，可重试的失败自动切换到其他后端"""
+
+    def __init__(self, backends: List[Backend], strategy: Optional[str] = None):
+        """
+        初始化后端注册表
+
+        Args:
+            backends: 后端列表
+            strategy: 路由策略，least_outstanding 或 weighted_round_robin，默认读取 APIConfig.ROUTING
+
+        Raises:
+            ValueError: 后端列表为空或路由策略不支持时抛出
+        """
+        if not backends:
+            raise ValueError('至少需要配置一个API后端')
+        strategy = strategy or APIConfig.ROUTING
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f'不支持的路由策略: {strategy}')
+        self.backends = backends
+        self.strategy = strategy
+        # 缓存键包含模型名称，使用所有后端模型的稳定组合
+        self.model = '+'.join(sorted({getattr(backend.client, 'model', '') for backend in backends}))
+        self._lock = threading.Lock()
+
+    def _acquire(self, tried: Set[str]) -> Optional[Backend]:
+        """选出一个后端并计入在途请求，所有后端都已尝试过时返回None"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [backend for backend in self.backends if backend.name not in tried]
+            if not candidates:
+                return None
+            healthy = [backend for backend in candidates if backend.available(now)]
+            # 全部不可用时仍然放行，由后端自身的重试调度器等待
+            candidates = healthy or candidates
+
+            if self.strategy == WEIGHTED_ROUND_ROBIN:
+                total = 0.0
+                for backend in candidates:
+                    backend.current_weight += backend.effective_weight
+                    total += backend.effective_weight
+                backend = max(candidates, key=lambda b: b.current_weight)
+                backend.current_weight -= total
+            else:
+                backend = min(candidates, key=lambda b: ((b.outstanding + 1) / b.effective_weight, b.ewma_latency))
+
+            backend.breaker.on_dispatch(now)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend: Backend, started: float, error: Optional[Exception] = None):
+        with self._lock:
+            now = time.monotonic()
+            backend.outstanding -= 1
+            if error is None:
+                latency = now - started
+                backend.successes += 1
+                backend.ewma_latency = latency if backend.successes == 1 else \
+                    backend.ewma_latency + _LATENCY_EWMA_WEIGHT * (latency - backend.ewma_latency)
+                backend.effective_weight = min(backend.weight, backend.effective_weight + backend.weight * 0.1)
+                backend.breaker.on_success()
+                return
+            if not _counts_against_backend(error):
+                # 请求本身的错误不说明后端是否健康，熔断状态保持不变，只归还探测名额
+                backend.breaker.on_ignored()
+                return
+            backend.failures += 1
+            backend.effective_weight = max(backend.weight * 0.1, backend.effective_weight / 2)
+            backend.breaker.on_failure(now)
+            if getattr(error, 'status_code', None) == 429:
+                retry_after = getattr(error, 'retry_after', None)
+                backend.cooldown_until = max(backend.cooldown_until,
+                                             now + (retry_after if retry_after is not None else _DEFAULT_COOLDOWN))
+
+    def _call(self, func: Callable[[BaseAPIClient], str]) -> str:
+        tried: Set[str] = set()
+        last_error = None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise last_error
+            tried.add(backend.name)
+            started = time.monotonic()
+            try:
+                result = func(backend.client)
+            except Exception as e:
+                self._release(backend, started, e)
+                if not _should_failover(e):
+                    raise
+                logger.warning(f'API后端 {backend.name} 请求失败，切换到其他后端: {e}')
+                last_error = e
+                continue
+            self._release(backend, started)
+            return result
+
+    def generate_response(self, prompt: str, budget: Optional[TokenBudget] = None) -> str:
+        """
+        选择后端生成API响应，可重试的失败自动切换到其他后端
+
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+
+        Returns:
+            生成的响应文本
+
+        Raises:
+            APIError: 所有后端都失败或错误不可重试时抛出
+        """
+        return self._call(lambda client: client.generate_response(prompt, budget))
+
+    def generate_response_stream(self, prompt: str, budget: Optional[TokenBudget] = None) -> Iterator[str]:
+        """
+        选择后端流式生成API响应，收到第一个片段之前失败时切换到其他后端
+
+        Args:
+            prompt: 提示文本
+            budget: 输出token预算，为None时使用最大输出长度
+
+        Returns:
+            响应文本片段的迭代器
+
+        Raises:
+            APIError: 所有后端都失败、错误不可重试或开始输出后出错时抛出
+        """
+        tried: Set[str] = set()
+        last_error = None
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                raise last_error
+            tried.add(backend.name)
+            started = time.monotonic()
+            stream = backend.client.generate_response_stream(prompt, budget)
+            try:
+                first = next(stream, None)
+            except Exception as e:
+                self._release(backend, started, e)
+                if not _should_failover(e):
+                    raise
+                logger.warning(f'API后端 {backend.name} 流式请求失败，切换到其他后端: {e}')
+                last_error = e
+                continue
+            break
+
+        # 已开始输出，之后的错误无法切换后端
+        try:
+            if first is not None:
+                yield first
+            for chunk in stream:
+                yield chunk
+        except GeneratorExit:
+            self._release(backend, started)
+            raise
+        except Exception as e:
+            self._release(backend, started, e)
+            raise
+        self._release(backend, started)
+
+    def code_conversion(self, source_lang: str, target_lang: str, code: str) -> str:
+        """
+        代码转换功能
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+
+        Returns:
+            转换后的代码
+
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        prompt = get_prompt_builder().build(source_lang, target_lang, code)
+        return self.generate_response(prompt, get_token_estimator().budget(source_lang, target_lang, code))
+
+    def stats(self) -> Dict:
+        """
+        各后端的路由与健康统计
+
+        Returns:
+            路由策略与后端统计列表
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'strategy': self.strategy,
+                'backends': [backend.to_dict(now) for backend in self.backends]
+            }
+
+
+def _counts_against_backend(error: Exception) -> bool:
+    return getattr(error, 'status_code', None) not in _REQUEST_ERROR_CODES
+
+
+def _should_failover(error: Exception) -> bool:
+    """限流、服务端错误、超时、连接失败以及后端自身的认证或配置错误都切换到其他后端"""
+    if isinstance(error, DeadlineExceededError):
+        return True
+    return isinstance(error, APIError) and _counts_against_backend(error)
+
+
+def _create_backend(index: int, spec: Dict) -> Backend:
+    backend_type = spec.get('type', 'openai')
+    name = spec.get('name') or f'{backend_type}-{index}'
+    model = spec.get('model', APIConfig.DEEPSEEK_MODEL)
+
+    if backend_type == 'mock':
+        client = MockAPIClient(
+            model=spec.get('model', 'mock'),
+            latency=float(spec.get('latency', 0)),
+            error_rate=float(spec.get('error_rate', 0)),
+            rate_limit_rate=float(spec.get('rate_limit_rate', 0)),
+            seed=spec.get('seed')
+        )
+    elif backend_type in ('openai', 'deepseek'):
+        api_key = spec.get('api_key')
+        if api_key is None:
+            api_key = os.getenv(spec.get('api_key_env', 'DEEPSEEK_API_KEY'), '')
+        # 每个后端使用独立的令牌桶，一个后端限流不会暂停其他后端
+        scheduler = RetryScheduler(
+            max_retries=int(spec.get('max_retries', APIConfig.BACKEND_MAX_RETRIES)),
+            timeout=float(spec.get('timeout', APIConfig.TIMEOUT)),
+            bucket=TokenBucket(float(spec.get('rate_limit', 0)), int(spec.get('rate_burst', APIConfig.RATE_BURST))),
+            deadline=APIConfig.REQUEST_DEADLINE or None
+        )
+        client_class = DeepSeekAPIClient if backend_type == 'deepseek' else OpenAIClient
+        client = client_class(api_key, spec.get('api_base', APIConfig.DEEPSEEK_API_BASE), model, scheduler)
+    else:
+        raise ValueError(f'不支持的API后端类型: {backend_type}')
+
+    return Backend(name, client, float(spec.get('weight', 1)))
+
+
+def build_api_client(backends_config: Optional[str] = None) -> BaseAPIClient:
+    """
+    按配置创建API客户端
+
+    未配置 API_BACKENDS 时返回单个 DeepSeek 客户端；配置后返回多后端注册表。
+
+    Args:
+        backends_config: 后端配置JSON，默认读取 APIConfig.BACKENDS
+
+    Returns:
+        API客户端
+
+    Raises:
+        ValueError: 后端配置无法解析或内容不合法时抛出
+    """
+    backends_config = APIConfig.BACKENDS if backends_config is None else backends_config
+    if not backends_config.strip():
+        return DeepSeekAPIClient(
+            api_key=APIConfig.DEEPSEEK_API_KEY,
+            api_base=APIConfig.DEEPSEEK_API_BASE,
+            model=APIConfig.DEEPSEEK_MODEL
+        )
+
+    try:
+        specs = json.loads(backends_config)
+    except json.JSONDecodeError as e:
+        raise ValueError(f'API_BACKENDS 不是合法的JSON: {str(e)}') from e
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise ValueError('API_BACKENDS 应为后端配置对象的列表')
+
+    backends = [_create_backend(index, spec) for index, spec in enumerate(specs)]
+    names = [backend.name for backend in backends]
+    if len(set(names)) != len(names):
+        raise ValueError('API_BACKENDS 中的后端名称重复')
+    logger.info(f'已配置 {len(backends)} 个API后端: {", ".join(names)}，路由策略: {APIConfig.ROUTING}')
+    return ClientRegistry(backends)
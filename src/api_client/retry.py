@@ -0,0 +1,266 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import openai
+
+from src.utils.error_handler import APIError, DeadlineExceededError, RateLimitError
+from src.utils.metrics import API_REQUESTS, API_RETRIES, observe_stage
+from config.api_config import APIConfig
+
+# 可重试的HTTP状态码
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """令牌桶限速器，同一进程内所有请求共享；收到429时整体暂停"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，小于等于0时不限速
+            capacity: 桶容量，即允许的突发请求数
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预定一个令牌
+
+        Returns:
+            调用方在发起请求前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            pause = max(0.0, self._paused_until - now)
+            if self.rate <= 0:
+                return pause
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            # 令牌不足时按欠账计算等待时间，保证多个调用方依次排队
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, pause)
+
+    def pause(self, seconds: float):
+        """
+        暂停所有请求
+
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryScheduler:
+    """带抖动指数退避的重试调度器，遵循 Retry-After 并为每个请求设定截止时间"""
+
+    def __init__(self, max_retries: int, timeout: float, bucket: TokenBucket,
+                 deadline: Optional[float] = None, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        初始化重试调度器
+
+        Args:
+            max_retries: 最大重试次数
+            timeout: 单次请求超时（秒）
+            bucket: 共享令牌桶
+            deadline: 单个请求含重试的总时限（秒），默认为 timeout * (max_retries + 1)
+            base_delay: 退避基础等待时间（秒）
+            max_delay: 单次退避的最长等待时间（秒）
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = bucket
+        self.deadline = deadline or timeout * (max_retries + 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        计算第 attempt 次失败后的等待时间
+
+        Args:
+            attempt: 已失败的次数（从0开始）
+            retry_after: 服务端建议的等待秒数
+
+        Returns:
+            等待秒数
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # Full Jitter：在 [0, base * 2^attempt] 内均匀取值
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, func: Callable[[float], Any]) -> Any:
+        """
+        同步执行带重试的请求
+
+        Args:
+            func: 请求函数，参数为本次尝试可用的超时秒数
+
+        Returns:
+            请求函数的返回值
+
+        Raises:
+            APIError: 重试用尽、错误不可重试或超过截止时间时抛出
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            time.sleep(self._wait_for_slot(deadline))
+            started = time.perf_counter()
+            try:
+                result = func(self._attempt_timeout(deadline))
+            except Exception as e:
+                self._record_attempt(started, e)
+                delay = self._on_failure(e, attempt, deadline)
+            else:
+                self._record_attempt(started)
+                return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, func: Callable[[float], Awaitable[Any]]) -> Any:
+        """
+        异步执行带重试的请求
+
+        Args:
+            func: 返回协程的请求函数，参数为本次尝试可用的超时秒数
+
+        Returns:
+            请求协程的结果
+
+        Raises:
+            APIError: 重试用尽、错误不可重试或超过截止时间时抛出
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._wait_for_slot(deadline))
+            started = time.perf_counter()
+            try:
+                result = await func(self._attempt_timeout(deadline))
+            except Exception as e:
+                self._record_attempt(started, e)
+                delay = self._on_failure(e, attempt, deadline)
+            else:
+                self._record_attempt(started)
+                return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _wait_for_slot(self, deadline: float) -> float:
+        wait = self.bucket.reserve()
+        if time.monotonic() + wait >= deadline:
+            raise DeadlineExceededError('API调用失败: 等待限流配额时超过请求截止时间')
+        return wait
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        return max(0.1, min(self.timeout, deadline - time.monotonic()))
+
+    @staticmethod
+    def _record_attempt(started: float, error: Optional[Exception] = None):
+        # 流式请求只统计建立流的耗时
+        observe_stage('api', time.perf_counter() - started)
+        API_REQUESTS.inc(outcome='success' if error is None else 'error')
+
+    def _on_failure(self, error: Exception, attempt: int, deadline: float) -> float:
+        """处理一次失败，返回重试前的等待秒数；不应重试时抛出APIError"""
+        retryable, status_code, retry_after = classify_error(error)
+        message = f'API调用失败: {str(error)}'
+        if status_code == 429:
+            # 限流时让共享同一令牌桶的所有请求一起退避
+            self.bucket.pause(retry_after if retry_after is not None else self.backoff_delay(attempt))
+        if not retryable or attempt >= self.max_retries:
+            error_class = RateLimitError if status_code == 429 else APIError
+            raise error_class(message, status_code, retry_after) from error
+        delay = self.backoff_delay(attempt, retry_after)
+        if time.monotonic() + delay >= deadline:
+            raise DeadlineExceededError(message, status_code, retry_after) from error
+        API_RETRIES.inc(reason=str(status_code) if status_code is not None else 'connection')
+        return delay
+
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[int], Optional[float]]:
+    """
+    判断错误是否可重试
+
+    Args:
+        error: 请求抛出的异常
+
+    Returns:
+        (是否可重试, HTTP状态码, Retry-After秒数)
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True, None, None
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        return False, None, None
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    return status_code in RETRYABLE_STATUS_CODES, status_code, parse_retry_after(headers)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    解析 Retry-After / retry-after-ms 响应头
+
+    Args:
+        headers: 响应头
+
+    Returns:
+        等待秒数，没有或无法解析时返回None
+    """
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # HTTP-date 格式
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_retry_scheduler() -> RetryScheduler:
+    """
+    获取按 APIConfig 配置创建的全局重试调度器，所有客户端共享同一个令牌桶
+
+    Returns:
+        全局重试调度器
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RetryScheduler(
+                max_retries=APIConfig.MAX_RETRIES,
+                timeout=APIConfig.TIMEOUT,
+                bucket=TokenBucket(APIConfig.RATE_LIMIT, APIConfig.RATE_BURST),
+                deadline=APIConfig.REQUEST_DEADLINE or None
+            )
+        return _default_scheduler
@@ -1,27 +1,379 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
 from src.api_client.base_client import BaseAPIClient
+from src.utils.cache import ConversionCache, get_conversion_cache, make_cache_key
+from src.utils.code_extractor import merge_class_members, split_into_chunks
+from src.utils.inflight import inflight_slot, released_slot
+from src.utils.metrics import stage_timer
+from src.utils.prompt_builder import get_prompt_builder
+from src.utils.token_estimator import TokenBudget, get_token_estimator
+from config.app_config import AppConfig
+from config.prompt_config import PromptConfig
+
+# 代码块首行可能出现的语言标记（可以根据需要扩展）
+COMMON_LANGUAGES = ['c', 'cpp', 'python', 'java', 'javascript', 'js', 'html', 'css', 'go', 'rust', 'ruby']
+
+
+class MarkdownFenceStripper:
+    """增量去除流式输出中的Markdown代码块标记，与 BaseConverter.format_code 的处理规则一致"""
+    
+    FENCE = '```'
+    
+    def __init__(self):
+        self._buffer = ''
+        # start: 等待判断是否以代码块开头；lang: 读取语言标记行；
+        # body_start: 跳过正文前的空白；body: 输出正文；plain: 非代码块，原样输出；done: 代码块已结束
+        self._state = 'start'
+    
+    def feed(self, chunk: str) -> str:
+        """
+        输入一段流式文本
+        
+        Args:
+            chunk: 新收到的文本
+            
+        Returns:
+            可以立即输出的文本
+        """
+        if self._state == 'done':
+            return ''
+        if self._state == 'plain':
+            return chunk
+        self._buffer += chunk
+        return self._drain(final=False)
+    
+    def finish(self) -> str:
+        """
+        结束输入，返回缓冲区中剩余的可输出文本
+        
+        Returns:
+            剩余文本
+        """
+        if self._state in ('done', 'plain'):
+            return ''
+        return self._drain(final=True)
+    
+    def _drain(self, final: bool) -> str:
+        output = ''
+        while True:
+            if self._state == 'start':
+                stripped = self._buffer.lstrip()
+                if len(stripped) < len(self.FENCE) and self.FENCE.startswith(stripped) and not final:
+                    return output
+                if stripped.startswith(self.FENCE):
+                    self._buffer = stripped[len(self.FENCE):]
+                    self._state = 'lang'
+                    continue
+                self._buffer = ''
+                self._state = 'plain'
+                return output + stripped
+            
+            if self._state == 'lang':
+                newline = self._buffer.find('\n')
+                if newline == -1:
+                    fence = self._buffer.find(self.FENCE)
+                    if fence != -1:
+                        # 代码块只有一行
+                        self._state = 'done'
+                        return output + self._buffer[:fence].strip()
+                    if not final:
+                        return output
+                    self._state = 'done'
+                    return output + self._buffer.strip()
+                first_line = self._buffer[:newline].strip()
+                if first_line.lower() in COMMON_LANGUAGES:
+                    self._buffer = self._buffer[newline + 1:]
+                self._state = 'body_start'
+                continue
+            
+            if self._state == 'body_start':
+                stripped = self._buffer.lstrip()
+                if not stripped:
+                    self._buffer = ''
+                    return output
+                self._buffer = stripped
+                self._state = 'body'
+                continue
+            
+            # body
+            fence = self._buffer.find(self.FENCE)
+            if fence != -1:
+                output += self._buffer[:fence]
+                self._buffer = ''
+                self._state = 'done'
+                return output
+            if final:
+                output += self._buffer
+                self._buffer = ''
+                return output
+            # 保留末尾可能属于结束标记的反引号
+            keep = len(self._buffer) - len(self._buffer.rstrip('`'))
+            keep = min(keep, len(self.FENCE) - 1)
+            cut = len(self._buffer) - keep
+            output += self._buffer[:cut]
+            self._buffer = self._buffer[cut:]
+            return output
+
 
 class BaseConverter(ABC):
     """转换器基础抽象类"""
     
-    def __init__(self, api_client: BaseAPIClient):
+    # 追加在基础提示模板之后的语言特定提示
+    SPECIFIC_PROMPT = ""
+    
+    def __init__(self, api_client: BaseAPIClient, cache: Optional[ConversionCache] = None):
         """
         初始化转换器
         
         Args:
             api_client: API客户端实例
+            cache: 转换结果缓存，默认使用按配置创建的全局缓存
         """
         self.api_client = api_client
+        self.cache = cache if cache is not None else get_conversion_cache()
+        self.prompt_builder = get_prompt_builder()
+    
+    def convert(self, source_lang: str, target_lang: str, code: str, dependencies: str = '') -> str:
+        """
+        转换代码，相同输入命中缓存时不再调用API
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            dependencies: 本文件所依赖的已转换文件的符号摘要
+            
+        Returns:
+            转换后的代码
+            
+        Raises:
+            ConversionError: 转换失败时抛出
+        """
+        context = self._dependency_context(dependencies)
+        if self.cache is None:
+            return self._convert_chunked(source_lang, target_lang, code, context)
+        
+        key = self._cache_key(source_lang, target_lang, code, context)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self._convert_chunked(source_lang, target_lang, code, context)
+        self.cache.set(key, result)
+        return result
+    
+    def convert_delta(self, source_lang: str, target_lang: str, code: str, reference_output: str, diff: str,
+                      dependencies: str = '') -> str:
+        """
+        参照结构相似文件的转换结果转换代码，提示中只包含参考文件的转换结果和两份源代码的差异
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码，用于缓存键和token预算
+            reference_output: 参考文件的转换结果
+            diff: 参考文件与本文件源代码的 unified diff
+            dependencies: 本文件所依赖的已转换文件的符号摘要
+            
+        Returns:
+            转换后的代码
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        context = self._dependency_context(dependencies)
+        key = None
+        if self.cache is not None:
+            # 参考结果不同时提示不同，缓存键随之变化
+            key = self._cache_key(source_lang, target_lang, code, context + PromptConfig.DELTA_PROMPT + reference_output)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        with stage_timer('prompt'):
+            prompt = self.prompt_builder.build_delta(source_lang, target_lang, reference_output, diff, context,
+                                                     self.SPECIFIC_PROMPT)
+        budget = self.token_budget(source_lang, target_lang, code)
+        result = self.format_code(target_lang, self.api_client.generate_response(prompt, budget))
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+    
+    def repair(self, source_lang: str, target_lang: str, original_code: str, converted_code: str,
+               error_message: str) -> str:
+        """
+        根据验证错误修复转换结果
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            original_code: 源代码
+            converted_code: 未通过验证的转换结果
+            error_message: 验证器给出的错误信息
+            
+        Returns:
+            修复后的代码
+            
+        Raises:
+            APIError: API调用失败时抛出
+        """
+        prompt = PromptConfig.ERROR_FIX_PROMPT.format(
+            source_lang=source_lang,
+            target_lang=target_lang,
+            original_code=original_code,
+            converted_code=converted_code,
+            error_message=error_message
+        )
+        budget = self.token_budget(target_lang, target_lang, converted_code)
+        return self.format_code(target_lang, self.api_client.generate_response(prompt, budget))
+    
+    def lookup_cache(self, source_lang: str, target_lang: str, code: str) -> Optional[str]:
+        """
+        查询缓存中的转换结果，不调用API
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            
+        Returns:
+            缓存的转换结果，未命中或未启用缓存时返回None
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(source_lang, target_lang, code))
+    
+    def update_cache(self, source_lang: str, target_lang: str, code: str, result: str, dependencies: str = ''):
+        """
+        将转换结果写入缓存（如覆盖修复前的结果），参数与 convert 一致
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            result: 新的转换结果
+            dependencies: 转换时使用的依赖符号摘要
+        """
+        if self.cache is not None:
+            key = self._cache_key(source_lang, target_lang, code, self._dependency_context(dependencies))
+            self.cache.set(key, result)
+    
+    def fingerprint(self, source_lang: str, target_lang: str, code: str, dependencies: str = '') -> str:
+        """
+        计算转换输入的指纹，源代码、依赖摘要、模型或提示模板任一变化时指纹随之变化，参数与 convert 一致
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            dependencies: 本文件所依赖的已转换文件的符号摘要
+            
+        Returns:
+            SHA-256 十六进制摘要
+        """
+        return self._cache_key(source_lang, target_lang, code, self._dependency_context(dependencies))
+    
+    @staticmethod
+    def _dependency_context(dependencies: str) -> str:
+        if not dependencies:
+            return ''
+        return PromptConfig.DEPENDENCY_CONTEXT_PROMPT.format(symbols=dependencies)
+    
+    def _convert_chunked(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
+        """
+        大文件按函数、类等顶层单元切块并发转换，再按原顺序拼接；只有一个顶层类的文件按类成员切块
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            context: 放在每个提示原代码之前的上下文说明
+            
+        Returns:
+            转换后的代码
+        """
+        if len(code) <= AppConfig.CHUNK_THRESHOLD_CHARS:
+            return self._convert(source_lang, target_lang, code, context)
+        
+        chunks = split_into_chunks(source_lang, code, AppConfig.CHUNK_MAX_CHARS)
+        if len(chunks) == 1:
+            return self._convert(source_lang, target_lang, code, context)
+        
+        def convert_chunk(chunk):
+            chunk_context = context
+            if chunk.context:
+                chunk_context += "\n" + PromptConfig.CHUNK_CONTEXT_PROMPT.format(context=chunk.context)
+            if chunk.skeleton:
+                chunk_context += "\n" + PromptConfig.CHUNK_SKELETON_PROMPT.format(enclosing=chunk.enclosing)
+            elif chunk.enclosing:
+                chunk_context += "\n" + PromptConfig.CHUNK_MEMBER_PROMPT.format(enclosing=chunk.enclosing)
+            # 每个分块请求都占用全局在途名额，与其他文件的转换共同受 MAX_INFLIGHT_CONVERSIONS 限制
+            with inflight_slot():
+                return self._convert(source_lang, target_lang, chunk.code, chunk_context)
+        
+        # 等待分块结果期间归还调用线程（转换池的工作线程）持有的名额，由分块请求使用
+        with released_slot(), ThreadPoolExecutor(max_workers=min(len(chunks), AppConfig.CHUNK_WORKERS),
+                                                 thread_name_prefix='chunk') as executor:
+            results = list(executor.map(convert_chunk, chunks))
+        if chunks[0].skeleton:
+            # 按类成员切分时，成员的转换结果插回骨架的类体
+            return merge_class_members(results[0], results[1:])
+        return '\n\n'.join(result.strip() for result in results if result.strip())
+    
+    def convert_stream(self, source_lang: str, target_lang: str, code: str) -> Iterator[str]:
+        """
+        流式转换代码，边生成边去除Markdown代码块标记
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            
+        Returns:
+            转换后代码片段的迭代器，拼接并去除首尾空白后即为完整结果
+            
+        Raises:
+            ConversionError: 转换失败时抛出
+        """
+        # 验证输入
+        if not source_lang or not target_lang or not code:
+            raise ValueError("源代码语言、目标代码语言和代码内容不能为空")
+        
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(source_lang, target_lang, code)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        stripper = MarkdownFenceStripper()
+        parts = []
+        prompt = self.build_prompt(source_lang, target_lang, code)
+        budget = self.token_budget(source_lang, target_lang, code)
+        for chunk in self.api_client.generate_response_stream(prompt, budget):
+            text = stripper.feed(chunk)
+            if text:
+                parts.append(text)
+                yield text
+        text = stripper.finish()
+        if text:
+            parts.append(text)
+            yield text
+        
+        if key is not None:
+            self.cache.set(key, ''.join(parts).strip())
     
     @abstractmethod
-    def convert(self, source_lang: str, target_lang: str, code: str) -> str:
+    def _convert(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
         """
-        转换代码
+        调用API转换代码，由子类实现
         
         Args:
             source_lang: 源代码语言
             target_lang: 目标代码语言
             code: 源代码
+            context: 放在原代码之前的上下文说明（依赖符号摘要、分块转换时的共享声明等）
             
         Returns:
             转换后的代码
@@ -31,6 +383,53 @@ class BaseConverter(ABC):
         """
         pass
     
+    def build_prompt(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
+        """
+        构建完整的转换提示，不随代码变化的部分在前，原代码在最后
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            context: 放在原代码之前的上下文说明
+            
+        Returns:
+            提示文本
+        """
+        with stage_timer('prompt'):
+            return self.prompt_builder.build(source_lang, target_lang, code, context, self.SPECIFIC_PROMPT)
+    
+    def token_budget(self, source_lang: str, target_lang: str, code: str) -> TokenBudget:
+        """
+        按输入长度和语言对估算请求的输出token预算
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 本次请求要转换的代码
+            
+        Returns:
+            token预算
+        """
+        return get_token_estimator().budget(source_lang, target_lang, code)
+    
+    def _cache_key(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
+        return make_cache_key(source_lang, target_lang, getattr(self.api_client, 'model', ''),
+                              self.prompt_template(source_lang, target_lang) + context, code)
+    
+    def prompt_template(self, source_lang: str, target_lang: str) -> str:
+        """
+        返回本转换器对该语言对使用的提示前缀，用于计算缓存键
+        
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            
+        Returns:
+            提示前缀文本
+        """
+        return self.prompt_builder.prefix(source_lang, target_lang, self.SPECIFIC_PROMPT)
+    
     @abstractmethod
     def validate(self, lang: str, code: str) -> bool:
         """
@@ -56,6 +455,10 @@ class BaseConverter(ABC):
         Returns:
             格式化后的代码
         """
+        with stage_timer('format'):
+            return self._format_code(lang, code)
+    
+    def _format_code(self, lang: str, code: str) -> str:
         # 清理字符串
         code = code.strip()
         
@@ -81,9 +484,7 @@ class BaseConverter(ABC):
                 if first_newline != -1:
                     # 检查第一行是否只有语言名称
                     first_line = code[:first_newline].strip()
-                    # 常见的语言名称列表（可以根据需要扩展）
-                    common_languages = ['c', 'cpp', 'python', 'java', 'javascript', 'js', 'html', 'css', 'go', 'rust', 'ruby']
-                    if first_line.lower() in common_languages:
+                    if first_line.lower() in COMMON_LANGUAGES:
                         # 移除语言标记行
                         code = code[first_newline:].strip()
             else:
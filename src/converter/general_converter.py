@@ -1,5 +1,6 @@
 from src.converter.base_converter import BaseConverter
 from src.api_client.base_client import BaseAPIClient
+from src.validator.validator_pool import get_validator_pool
 
 class GeneralConverter(BaseConverter):
     """通用代码转换器实现"""
@@ -13,7 +14,7 @@ class GeneralConverter(BaseConverter):
         """
         super().__init__(api_client)
     
-    def convert(self, source_lang: str, target_lang: str, code: str) -> str:
+    def _convert(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
         """
         转换代码
         
@@ -21,6 +22,7 @@ class GeneralConverter(BaseConverter):
             source_lang: 源代码语言
             target_lang: 目标代码语言
             code: 源代码
+            context: 放在原代码之前的上下文说明
             
         Returns:
             转换后的代码
@@ -34,7 +36,10 @@ class GeneralConverter(BaseConverter):
         
         try:
             # 使用API客户端进行代码转换
-            converted_code = self.api_client.code_conversion(source_lang, target_lang, code)
+            converted_code = self.api_client.generate_response(
+                self.build_prompt(source_lang, target_lang, code, context),
+                self.token_budget(source_lang, target_lang, code)
+            )
             
             # 格式化转换后的代码
             formatted_code = self.format_code(target_lang, converted_code)
@@ -46,7 +51,7 @@ class GeneralConverter(BaseConverter):
     
     def validate(self, lang: str, code: str) -> bool:
         """
-        验证代码是否有效（基本验证）
+        验证代码语法是否有效
         
         Args:
             lang: 代码语言
@@ -55,10 +60,5 @@ class GeneralConverter(BaseConverter):
         Returns:
             代码是否有效的布尔值
         """
-        # 基本验证：检查代码是否为空
-        if not code or not code.strip():
-            return False
-        
-        # 这里可以添加更复杂的验证逻辑，例如语法检查
-        # 由于是通用转换器，暂时只做基本验证
-        return True
\ No newline at end of file
+        # 在验证进程池中按目标语言做语法检查
+        return get_validator_pool().validate(lang, code).valid
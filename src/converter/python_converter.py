@@ -1,10 +1,23 @@
 from src.converter.base_converter import BaseConverter
 from src.api_client.base_client import BaseAPIClient
-from config.prompt_config import PromptConfig
+from src.validator.validator_pool import get_validator_pool
 
 class PythonConverter(BaseConverter):
     """Python语言代码转换器实现"""
     
+    # 针对Python语言转换的特定提示
+    SPECIFIC_PROMPT = """
+    请确保：
+    1. 完整转换所有函数、类和方法
+    2. 正确处理缩进和Python特有的语法结构
+    3. 转换列表推导式、生成器、装饰器等Python特性
+    4. 处理模块导入和包结构
+    5. 保持相同的功能和逻辑
+    6. 生成可直接运行的Python代码
+    7. 处理异常处理机制
+    8. 保持Python的代码风格和最佳实践
+    """
+    
     def __init__(self, api_client: BaseAPIClient):
         """
         初始化Python语言转换器
@@ -14,7 +27,7 @@ class PythonConverter(BaseConverter):
         """
         super().__init__(api_client)
     
-    def convert(self, source_lang: str, target_lang: str, code: str) -> str:
+    def _convert(self, source_lang: str, target_lang: str, code: str, context: str = '') -> str:
         """
         转换Python语言代码
         
@@ -22,6 +35,7 @@ class PythonConverter(BaseConverter):
             source_lang: 源代码语言
             target_lang: 目标代码语言
             code: 源代码
+            context: 放在原代码之前的上下文说明
             
         Returns:
             转换后的代码
@@ -34,28 +48,12 @@ class PythonConverter(BaseConverter):
             raise ValueError("源代码语言、目标代码语言和代码内容不能为空")
         
         try:
-            # 针对Python语言转换的特定提示
-            python_specific_prompt = """
-            请确保：
-            1. 完整转换所有函数、类和方法
-            2. 正确处理缩进和Python特有的语法结构
-            3. 转换列表推导式、生成器、装饰器等Python特性
-            4. 处理模块导入和包结构
-            5. 保持相同的功能和逻辑
-            6. 生成可直接运行的Python代码
-            7. 处理异常处理机制
-            8. 保持Python的代码风格和最佳实践
-            """
-            
             # 构建完整提示
-            full_prompt = PromptConfig.BASE_PROMPT.format(
-                source_lang=source_lang,
-                target_lang=target_lang,
-                code=code
-            ) + "\n" + python_specific_prompt
+            full_prompt = self.build_prompt(source_lang, target_lang, code, context)
             
             # 使用API客户端进行代码转换
-            converted_code = self.api_client.generate_response(full_prompt)
+            converted_code = self.api_client.generate_response(
+                full_prompt, self.token_budget(source_lang, target_lang, code))
             
             # 格式化转换后的代码
             formatted_code = self.format_code(target_lang, converted_code)
@@ -76,14 +74,5 @@ class PythonConverter(BaseConverter):
         Returns:
             代码是否有效的布尔值
         """
-        # 基本验证
-        if not code or not code.strip():
-            return False
-        
-        # Python语言特定验证
-        if lang == 'python':
-            # 检查是否包含基本的Python结构
-            if 'def ' in code or 'class ' in code or 'import ' in code or 'if ' in code:
-                return True
-        
-        return True
+        # 在验证进程池中按目标语言做语法检查
+        return get_validator_pool().validate(lang, code).valid
@@ -0,0 +1,277 @@
+"""
+命令行批量转换：直接转换本地目录，不经过Web服务的上传、临时目录和ZIP
+
+用法：
+    python src/main.py SOURCE_DIR --from c --to python -o OUTPUT_DIR
+    python src/main.py SOURCE_DIR --from python --to js --in-place
+
+输出目录（或原地转换时的源目录）中的 .langconverter-state.json 记录每个文件的转换状态，
+再次运行时源文件、依赖和提示都未变化的文件直接跳过。
+
+退出码：
+    0   全部成功
+    1   有文件转换失败
+    2   参数或配置错误
+    3   转换完成，但有文件未通过语法检查（--allow-invalid 时返回0）
+    130 被中断
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+# 将项目根目录添加到 Python 路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api_client.registry import build_api_client
+from src.converter.base_converter import BaseConverter
+from src.converter.c_converter import CConverter
+from src.converter.general_converter import GeneralConverter
+from src.converter.python_converter import PythonConverter
+from src.pipeline.directory_converter import DirectoryConverter, FileStatus
+from src.utils.logger import setup_logging
+from src.utils.metrics import TOKENS
+from config.app_config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INVALID = 3
+EXIT_INTERRUPTED = 130
+
+# 各源语言使用的转换器，其他语言使用通用转换器
+_CONVERTERS = {
+    'c': CConverter,
+    'python': PythonConverter
+}
+# 非终端输出（如CI日志）时打印进度行的间隔（秒）
+_LOG_INTERVAL = 10.0
+# 终端中刷新进度行的最小间隔（秒）
+_TTY_INTERVAL = 0.2
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f'{seconds // 3600}h{seconds % 3600 // 60:02d}m'
+    if seconds >= 60:
+        return f'{seconds // 60}m{seconds % 60:02d}s'
+    return f'{seconds}s'
+
+
+class ProgressReporter:
+    """实时输出处理进度和吞吐量：终端中原地刷新一行，非终端时按间隔逐行打印"""
+
+    def __init__(self, stream=None, quiet: bool = False):
+        """
+        初始化进度输出
+
+        Args:
+            stream: 输出流，默认为标准错误
+            quiet: 为True时不输出进度
+        """
+        self.stream = stream or sys.stderr
+        self.quiet = quiet
+        self.tty = self.stream.isatty()
+        self.total = 0
+        self.counts = {FileStatus.CONVERTED: 0, FileStatus.UP_TO_DATE: 0, FileStatus.FAILED: 0,
+                       FileStatus.INVALID: 0}
+        self.started = time.monotonic()
+        # 第一个需要转换的文件开始计时，跳过的文件不计入吞吐量
+        self._converting_since = None
+        self._printed_at = 0.0
+        self._lock = threading.Lock()
+
+    def on_plan(self, total: int):
+        with self._lock:
+            self.total = total
+            self._converting_since = time.monotonic()
+        self._print(force=True)
+
+    def on_file(self, rel_path: str, status: str):
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+        self._print()
+
+    def line(self) -> str:
+        """当前进度行"""
+        with self._lock:
+            counts = dict(self.counts)
+            total = self.total
+            since = self._converting_since
+        done = counts[FileStatus.CONVERTED] + counts[FileStatus.UP_TO_DATE] + counts[FileStatus.FAILED]
+        text = f'[{done}/{total}]'
+        if total:
+            text += f' {done * 100 // total}%'
+        converted = counts[FileStatus.CONVERTED]
+        if since is not None and converted:
+            elapsed = max(time.monotonic() - since, 1e-6)
+            rate = converted / elapsed
+            text += f' {rate:.2f} 文件/秒'
+            remaining = max(total - done, 0)
+            if remaining:
+                text += f' 预计剩余 {_format_duration(remaining / rate)}'
+        text += (f' 转换 {converted} 最新 {counts[FileStatus.UP_TO_DATE]}'
+                 f' 失败 {counts[FileStatus.FAILED]} 未通过检查 {counts[FileStatus.INVALID]}')
+        return text
+
+    def _print(self, force: bool = False):
+        if self.quiet:
+            return
+        now = time.monotonic()
+        interval = _TTY_INTERVAL if self.tty else _LOG_INTERVAL
+        with self._lock:
+            if not force and now - self._printed_at < interval:
+                return
+            self._printed_at = now
+        if self.tty:
+            self.stream.write('\r\033[K' + self.line())
+        else:
+            self.stream.write(self.line() + '\n')
+        self.stream.flush()
+
+    def finish(self):
+        """输出最终进度行"""
+        if self.quiet:
+            return
+        self._printed_at = 0.0
+        self._print(force=True)
+        if self.tty:
+            self.stream.write('\n')
+            self.stream.flush()
+
+
+def _split_patterns(values: Optional[List[str]]) -> List[str]:
+    patterns = []
+    for value in values or []:
+        patterns.extend(p.strip() for p in value.replace(',', '\n').splitlines() if p.strip())
+    return patterns
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    构建命令行参数解析器
+
+    Returns:
+        参数解析器
+    """
+    languages = sorted(AppConfig.SUPPORTED_EXTENSIONS)
+    parser = argparse.ArgumentParser(
+        prog='langconverter',
+        description='将本地目录中的代码转换为另一种语言',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='退出码：0 成功；1 有文件转换失败；2 参数或配置错误；3 有文件未通过语法检查；130 被中断'
+    )
+    parser.add_argument('source_dir', help='源代码目录')
+    parser.add_argument('-f', '--from', dest='source_lang', required=True, choices=languages, help='源代码语言')
+    parser.add_argument('-t', '--to', dest='target_lang', required=True, choices=languages, help='目标代码语言')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('-o', '--output', help='输出目录，生成与源目录结构相同的项目，其他文件原样复制')
+    output.add_argument('--in-place', action='store_true', help='转换结果写在源文件旁边')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help=f'并发转换的文件数（默认 {AppConfig.CONVERT_WORKERS}，'
+                             f'同时受 MAX_INFLIGHT_CONVERSIONS={AppConfig.MAX_INFLIGHT_CONVERSIONS} 限制）')
+    parser.add_argument('--include', action='append', help='只转换匹配的文件（gitignore风格，逗号分隔，可重复）')
+    parser.add_argument('--exclude', action='append', help='额外排除的文件（gitignore风格，逗号分隔，可重复）')
+    parser.add_argument('--no-gitignore', action='store_true', help='不遵循项目中的 .gitignore')
+    parser.add_argument('--force', action='store_true', help='忽略转换状态，全部重新转换')
+    parser.add_argument('--no-validate', action='store_true', help='不做语法检查和自动修复')
+    parser.add_argument('--fail-fast', action='store_true', help='出现失败时不再开始新的文件')
+    parser.add_argument('--allow-invalid', action='store_true', help='有文件未通过语法检查时仍返回0')
+    parser.add_argument('--json', action='store_true', help='以JSON输出最终统计')
+    parser.add_argument('-q', '--quiet', action='store_true', help='不输出实时进度')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出INFO级别日志')
+    return parser
+
+
+def _make_converter(source_lang: str) -> BaseConverter:
+    api_client = build_api_client()
+    return _CONVERTERS.get(source_lang, GeneralConverter)(api_client)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数，默认读取 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    setup_logging(level='INFO' if args.verbose else 'WARNING')
+
+    if not os.path.isdir(args.source_dir):
+        print(f'源目录不存在: {args.source_dir}', file=sys.stderr)
+        return EXIT_USAGE
+    if args.workers is not None and args.workers < 1:
+        print('--workers 必须大于0', file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        converter = _make_converter(args.source_lang)
+    except Exception as e:
+        print(f'初始化API客户端失败: {e}', file=sys.stderr)
+        return EXIT_USAGE
+
+    reporter = ProgressReporter(quiet=args.quiet)
+    directory_converter = DirectoryConverter(
+        converter, args.source_lang, args.target_lang,
+        workers=args.workers,
+        validate=False if args.no_validate else None,
+        force=args.force,
+        fail_fast=args.fail_fast,
+        include=_split_patterns(args.include),
+        exclude=_split_patterns(args.exclude),
+        use_gitignore=not args.no_gitignore,
+        on_plan=reporter.on_plan,
+        on_file=reporter.on_file
+    )
+    try:
+        result = directory_converter.run(args.source_dir, None if args.in_place else args.output)
+    except KeyboardInterrupt:
+        reporter.finish()
+        print('已中断，已完成的文件记录在转换状态中，再次运行时跳过', file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        reporter.finish()
+        logger.exception('目录转换失败')
+        print(f'目录转换失败: {e}', file=sys.stderr)
+        return EXIT_FAILED
+    reporter.finish()
+
+    summary = result.to_dict()
+    summary['tokens'] = {'prompt': int(TOKENS.value(kind='prompt')),
+                         'completion': int(TOKENS.value(kind='completion'))}
+    if result.converted and result.elapsed:
+        summary['files_per_second'] = round(len(result.converted) / result.elapsed, 3)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(f'转换 {summary["converted"]} 个文件，已是最新 {summary["up_to_date"]}，'
+              f'复用重复文件 {summary["duplicates"]}，失败 {len(result.failed)}，'
+              f'未通过检查 {len(result.invalid)}，复制其他文件 {summary["copied"]}，'
+              f'删除过期输出 {summary["removed"]}，跳过 {summary["skipped"]}，'
+              f'耗时 {_format_duration(result.elapsed)}，'
+              f'token 输入 {summary["tokens"]["prompt"]} / 输出 {summary["tokens"]["completion"]}')
+        for rel_path, error in sorted(result.failed.items()):
+            print(f'  失败 {rel_path}: {error}')
+        for target, errors in sorted(result.invalid.items()):
+            print(f'  未通过检查 {target}: {"; ".join(errors)[:300]}')
+
+    if result.failed:
+        return EXIT_FAILED
+    if result.invalid and not args.allow_invalid:
+        return EXIT_INVALID
+    return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+from src.pipeline.worker_pool import ConversionPool, TaskResult
+from src.pipeline.job_queue import Job, JobCancelled, JobQueue, JobStatus
+from src.pipeline.directory_converter import DirectoryConversionResult, DirectoryConverter, FileStatus
+from src.pipeline.manifest import ManifestEntry, ProjectManifest, get_project_manifest, make_project_key
+from src.pipeline.progress import MemoryProgressBus, ProgressBus, ProgressTracker, SQLiteProgressBus, get_progress_bus
+from src.pipeline.workspace import Workspace, WorkspaceManager
+from src.pipeline.similarity import SimilarityMethod, SimilarityReuser, SimilarityStore, get_similarity_store
+
+__all__ = ["ConversionPool", "TaskResult", "Job", "JobCancelled", "JobQueue", "JobStatus",
+           "ProgressBus", "MemoryProgressBus", "SQLiteProgressBus", "ProgressTracker", "get_progress_bus",
+           "ManifestEntry", "ProjectManifest", "get_project_manifest", "make_project_key",
+           "DirectoryConverter", "DirectoryConversionResult", "FileStatus",
+           "Workspace", "WorkspaceManager",
+           "SimilarityMethod", "SimilarityReuser", "SimilarityStore", "get_similarity_store"]
@@ -0,0 +1,208 @@
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from src.converter.base_converter import BaseConverter
+from src.pipeline.worker_pool import ConversionPool
+from src.utils.token_estimator import estimate_tokens
+from config.app_config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# 转换结果中的分隔块：### BEGIN S1 ... ### END S1
+_SECTION = re.compile(r'^[ \t]*### BEGIN (S\d+)[ \t]*\n(.*?)^[ \t]*### END \1[ \t]*$', re.MULTILINE | re.DOTALL)
+# 每段代码在提示中的分隔行等固定开销（估算token数）
+_SECTION_OVERHEAD_TOKENS = 12
+
+
+def split_sections(response: str) -> Dict[str, str]:
+    """
+    按分隔行拆分打包转换的结果
+
+    Args:
+        response: 模型返回的文本
+
+    Returns:
+        编号（如 S1）到该段结果的映射；同一编号出现多次时取第一段，未闭合的段落忽略
+    """
+    sections = {}
+    for marker, body in _SECTION.findall(response):
+        sections.setdefault(marker, body)
+    return sections
+
+
+class BatchItem:
+    """批量转换中的一段代码"""
+
+    def __init__(self, item_id: Any, source_lang: str, target_lang: str, code: str):
+        """
+        初始化批量转换条目
+
+        Args:
+            item_id: 调用方指定的条目ID
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+        """
+        self.id = item_id
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.code = code
+
+
+class BatchResult:
+    """批量转换中一段代码的结果"""
+
+    def __init__(self, item_id: Any, result: Optional[str] = None, error: Optional[str] = None):
+        self.id = item_id
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict:
+        if self.ok:
+            return {'id': self.id, 'success': True, 'result': self.result}
+        return {'id': self.id, 'success': False, 'error': self.error}
+
+
+class BatchConverter:
+    """批量转换：把同一语言对的小段代码打包进共享提示，按分隔行拆分结果，各组并发请求"""
+
+    def __init__(self, get_converter: Callable[[str], BaseConverter],
+                 token_budget: Optional[int] = None,
+                 max_items_per_prompt: Optional[int] = None,
+                 max_workers: Optional[int] = None):
+        """
+        初始化批量转换器
+
+        Args:
+            get_converter: 按源代码语言获取转换器的函数
+            token_budget: 单个打包提示中源代码的token预算，默认读取 AppConfig.BATCH_TOKEN_BUDGET
+            max_items_per_prompt: 单个打包提示的最大代码段数，默认读取 AppConfig.BATCH_MAX_ITEMS_PER_PROMPT
+            max_workers: 并发请求的组数，默认读取 AppConfig.CONVERT_WORKERS
+        """
+        self.get_converter = get_converter
+        self.token_budget = token_budget or AppConfig.BATCH_TOKEN_BUDGET
+        self.max_items_per_prompt = max_items_per_prompt or AppConfig.BATCH_MAX_ITEMS_PER_PROMPT
+        self.pool = ConversionPool(max_workers)
+        self.stats = {}
+
+    def convert(self, items: List[BatchItem]) -> List[BatchResult]:
+        """
+        批量转换
+
+        Args:
+            items: 待转换的代码段
+
+        Returns:
+            与输入顺序一致的结果列表
+        """
+        results: Dict[int, BatchResult] = {}
+        pending = []
+        cache_hits = 0
+        for index, item in enumerate(items):
+            cached = self.get_converter(item.source_lang).lookup_cache(item.source_lang, item.target_lang, item.code)
+            if cached is not None:
+                results[index] = BatchResult(item.id, result=cached)
+                cache_hits += 1
+            else:
+                pending.append((index, item))
+
+        groups = self._pack(pending)
+        fallback = []
+        for task_result in self.pool.run(groups, self._convert_group, fail_fast=False):
+            if not task_result.ok:
+                for index, item in task_result.item:
+                    results[index] = BatchResult(item.id, error=str(task_result.error))
+                continue
+            converted, missing = task_result.result
+            for index, item in task_result.item:
+                if index in converted:
+                    results[index] = BatchResult(item.id, result=converted[index])
+            fallback.extend(missing)
+
+        # 打包结果中缺失或无法拆分的代码段单独转换
+        if fallback:
+            logger.info(f'批量转换中有 {len(fallback)} 段代码需要单独转换')
+        for task_result in self.pool.run(fallback, self._convert_single, fail_fast=False):
+            index, item = task_result.item
+            if task_result.ok:
+                results[index] = BatchResult(item.id, result=task_result.result)
+            else:
+                results[index] = BatchResult(item.id, error=str(task_result.error))
+
+        self.stats = {
+            'items': len(items),
+            'cache_hits': cache_hits,
+            'prompts': sum(1 for group in groups if len(group) > 1),
+            'single_requests': sum(1 for group in groups if len(group) == 1) + len(fallback),
+            'fallbacks': len(fallback)
+        }
+        return [results[index] for index in range(len(items))]
+
+    def _pack(self, pending: List[tuple]) -> List[List[tuple]]:
+        # 按语言对分组后依次装箱，保持组内的输入顺序
+        by_pair: Dict[tuple, List[tuple]] = {}
+        for index, item in pending:
+            by_pair.setdefault((item.source_lang, item.target_lang), []).append((index, item))
+
+        groups = []
+        for pair_items in by_pair.values():
+            current = []
+            used = 0
+            for entry in pair_items:
+                cost = estimate_tokens(entry[1].code) + _SECTION_OVERHEAD_TOKENS
+                if current and (used + cost > self.token_budget or len(current) >= self.max_items_per_prompt):
+                    groups.append(current)
+                    current = []
+                    used = 0
+                current.append(entry)
+                used += cost
+            if current:
+                groups.append(current)
+        return groups
+
+    def _convert_single(self, entry: tuple) -> str:
+        item = entry[1]
+        return self.get_converter(item.source_lang).convert(item.source_lang, item.target_lang, item.code)
+
+    def _convert_group(self, group: List[tuple]):
+        # 单段代码或超出预算的代码直接走普通转换（含大文件分块）
+        if len(group) == 1:
+            index, _ = group[0]
+            return {index: self._convert_single(group[0])}, []
+
+        first = group[0][1]
+        converter = self.get_converter(first.source_lang)
+        markers = {f'S{position + 1}': entry for position, entry in enumerate(group)}
+        snippets = '\n'.join(
+            f'### BEGIN {marker}\n{item.code.strip()}\n### END {marker}'
+            for marker, (_, item) in markers.items()
+        )
+        prompt = converter.prompt_builder.build_batch(first.source_lang, first.target_lang, snippets,
+                                                      converter.SPECIFIC_PROMPT)
+
+        budget = converter.token_budget(first.source_lang, first.target_lang,
+                                        '\n'.join(item.code for _, item in group))
+        try:
+            response = converter.api_client.generate_response(prompt, budget)
+        except Exception as e:
+            # 打包请求整体失败（如某段代码触发请求错误、输出过长）时全部改为单独转换，只让真正出错的代码段失败
+            logger.warning(f'批量转换请求失败，{len(group)} 段代码改为单独转换: {str(e)}')
+            return {}, list(group)
+
+        converted = {}
+        for marker, body in split_sections(response).items():
+            entry = markers.get(marker)
+            if entry is None:
+                continue
+            code = converter.format_code(first.target_lang, body)
+            if code:
+                index, item = entry
+                converted[index] = code
+                converter.update_cache(item.source_lang, item.target_lang, item.code, code)
+        missing = [entry for entry in group if entry[0] not in converted]
+        return converted, missing
@@ -0,0 +1,326 @@
+import ast
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.utils.code_extractor import CodeUnit, extract_units
+
+_C_INCLUDE = re.compile(r'^\s*#\s*include\s+"([^"]+)"', re.MULTILINE)
+_JAVA_PACKAGE = re.compile(r'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+_JAVA_IMPORT = re.compile(r'^\s*import\s+(?:static\s+)?([\w.]+(?:\.\*)?)\s*;', re.MULTILINE)
+_JAVA_IDENTIFIER = re.compile(r'(?<![\w$])[A-Za-z_$][\w$]*')
+_JS_IMPORT = re.compile(
+    r'''(?:\bimport\s+(?:[\w*{}\s,$]+\s+from\s+)?|\bexport\s+[\w*{}\s,$]*\s+from\s+|\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"]+)['"]'''
+)
+_BRACE_CONTAINER = re.compile(r'\b(?:class|interface|enum|struct|union)\b')
+_JS_EXTENSIONS = ('', '.js', '.jsx', '/index.js', '/index.jsx')
+
+
+class DependencyGraph:
+    """项目内文件的导入/包含关系图，用于按拓扑层次安排转换顺序"""
+
+    def __init__(self, paths: Iterable[str]):
+        """
+        初始化依赖图
+
+        Args:
+            paths: 参与转换的文件路径（使用'/'分隔）
+        """
+        self.paths = list(paths)
+        self.dependencies: Dict[str, Set[str]] = {path: set() for path in self.paths}
+
+    @classmethod
+    def build(cls, source, paths: Iterable[str], lang: str,
+              aliases: Optional[Dict[str, str]] = None) -> 'DependencyGraph':
+        """
+        读取文件并解析依赖关系，只保留指向 paths 内文件的依赖
+
+        Args:
+            source: 项目源
+            paths: 参与转换的文件路径
+            lang: 源代码语言
+            aliases: 不单独转换的文件路径到其代表文件路径的映射（如内容重复的文件），
+                指向这些文件的依赖会记到代表文件上
+
+        Returns:
+            依赖图
+        """
+        graph = cls(paths)
+        aliases = aliases or {}
+        all_paths = graph.paths + [path for path in aliases if path not in graph.dependencies]
+
+        if lang == 'python':
+            resolver = _PythonResolver(all_paths)
+            resolve = resolver.resolve
+        elif lang == 'c':
+            resolve = lambda path, code: _resolve_c_includes(path, code, all_paths)
+        elif lang == 'java':
+            # Java需要先读取所有文件的包声明，只保留包名，不同时持有所有文件的内容
+            resolver = _JavaResolver({path: _java_package(source.read_text(path)) for path in all_paths})
+            resolve = resolver.resolve
+        elif lang == 'js':
+            known = set(all_paths)
+            resolve = lambda path, code: _resolve_js_imports(path, code, known)
+        else:
+            return graph
+
+        for path in graph.paths:
+            targets = resolve(path, source.read_text(path))
+            graph._add(path, (aliases.get(target, target) for target in targets))
+        return graph
+
+    def _add(self, path: str, targets: Iterable[str]):
+        for target in targets:
+            if target != path and target in self.dependencies:
+                self.dependencies[path].add(target)
+
+    def depended_on(self) -> Set[str]:
+        """
+        被其他文件依赖的文件集合，只有这些文件需要生成符号摘要
+
+        Returns:
+            文件路径集合
+        """
+        return {dep for deps in self.dependencies.values() for dep in deps}
+
+    def waves(self) -> List[List[str]]:
+        """
+        将文件分为拓扑层次：每层只依赖之前各层的文件，同一层内可以并行转换；循环依赖的文件放在同一层
+
+        Returns:
+            按转换顺序排列的文件层次列表
+        """
+        components = self._strongly_connected_components()
+        component_of = {}
+        for index, component in enumerate(components):
+            for path in component:
+                component_of[path] = index
+
+        # Tarjan算法按逆拓扑序产出强连通分量，依赖总是先于依赖它的分量出现
+        levels = []
+        for index, component in enumerate(components):
+            level = 0
+            for path in component:
+                for dep in self.dependencies[path]:
+                    dep_index = component_of[dep]
+                    if dep_index != index:
+                        level = max(level, levels[dep_index] + 1)
+            levels.append(level)
+
+        waves: List[List[str]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for index, component in enumerate(components):
+            waves[levels[index]].extend(component)
+        order = {path: i for i, path in enumerate(self.paths)}
+        return [sorted(wave, key=order.get) for wave in waves]
+
+    def _strongly_connected_components(self) -> List[List[str]]:
+        index_of = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        for root in self.paths:
+            if root in index_of:
+                continue
+            # 迭代实现，避免大项目递归过深
+            work = [(root, iter(sorted(self.dependencies[root])))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.dependencies[child]))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+
+def summarize_symbols(lang: str, path: str, code: str, max_chars: int) -> str:
+    """
+    生成转换后文件的符号摘要：文件路径加每个顶层定义的签名行
+
+    Args:
+        lang: 转换后代码的语言
+        path: 转换后文件的路径
+        code: 转换后的代码
+        max_chars: 摘要的最大字符数
+
+    Returns:
+        摘要文本，无法解析时只包含文件路径
+    """
+    lines = [f'{path}:']
+    for unit in extract_units(lang, code) or []:
+        if unit.kind == CodeUnit.DEFINITION and unit.signature:
+            lines.append(f'  {unit.signature}')
+            lines.extend(f'    {member}' for member in _member_signatures(lang, unit.text))
+    summary = '\n'.join(lines)
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit('\n', 1)[0]
+    return summary
+
+
+def _member_signatures(lang: str, text: str) -> List[str]:
+    """类、结构体等定义内部成员的签名行"""
+    if lang == 'python':
+        try:
+            tree = ast.parse(text)
+        except SyntaxError:
+            return []
+        source_lines = text.splitlines()
+        members = []
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                for child in node.body:
+                    if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        continue
+                    # 私有方法不会被其他文件引用，构造函数除外
+                    if child.name == '__init__' or not child.name.startswith('_'):
+                        members.append(source_lines[child.lineno - 1].strip())
+        return members
+
+    if not _BRACE_CONTAINER.search(text.split('{', 1)[0]):
+        return []
+    start = text.find('{')
+    end = text.rfind('}')
+    if start == -1 or end <= start:
+        return []
+    members = []
+    for unit in extract_units(lang, text[start + 1:end]) or []:
+        signature = unit.signature
+        if signature and not signature.startswith(('private ', 'private:')):
+            members.append(signature)
+    return members
+
+
+class _PythonResolver:
+    def __init__(self, paths: List[str]):
+        # 模块名 -> 文件路径列表；为每个路径的所有后缀生成模块名，兼容打包时多出的顶层目录
+        self._modules: Dict[str, List[str]] = {}
+        self._paths = set(paths)
+        for path in paths:
+            parts = path[:-3].split('/')
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            for start in range(len(parts)):
+                self._modules.setdefault('.'.join(parts[start:]), []).append(path)
+
+    def resolve(self, path: str, code: str) -> Set[str]:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return set()
+        package_parts = path.split('/')[:-1]
+        targets = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    targets.update(self._lookup(path, alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    base_parts = package_parts[:len(package_parts) - node.level + 1]
+                    base = '/'.join(base_parts + (node.module.split('.') if node.module else []))
+                    candidates = [base + '.py', base + '/__init__.py']
+                    candidates += [f'{base}/{alias.name}.py' for alias in node.names]
+                    targets.update(c for c in candidates if c in self._paths)
+                else:
+                    module = node.module or ''
+                    targets.update(self._lookup(path, module))
+                    for alias in node.names:
+                        targets.update(self._lookup(path, f'{module}.{alias.name}'))
+        return targets
+
+    def _lookup(self, importer: str, module: str) -> List[str]:
+        candidates = self._modules.get(module, [])
+        if len(candidates) <= 1:
+            return candidates
+        # 同名模块有多个时选与导入方共同前缀最长的
+        return [max(candidates, key=lambda c: len(posixpath.commonprefix([c, importer])))]
+
+
+def _resolve_c_includes(path: str, code: str, paths: List[str]) -> Set[str]:
+    known = set(paths)
+    targets = set()
+    for header in _C_INCLUDE.findall(code):
+        local = posixpath.normpath(posixpath.join(posixpath.dirname(path), header))
+        if local in known:
+            targets.add(local)
+            continue
+        # 退回到按路径后缀匹配（对应 -I 指定的包含目录）
+        suffix = '/' + header.lstrip('./')
+        targets.update(p for p in paths if p.endswith(suffix) or p == header)
+    return targets
+
+
+def _java_package(code: str) -> str:
+    match = _JAVA_PACKAGE.search(code)
+    return match.group(1) if match else ''
+
+
+class _JavaResolver:
+    def __init__(self, packages: Dict[str, str]):
+        self._by_fqn = {}
+        self._by_package: Dict[str, Dict[str, str]] = {}
+        self._package_of = {}
+        for path, package in packages.items():
+            name = posixpath.splitext(posixpath.basename(path))[0]
+            self._package_of[path] = package
+            self._by_fqn[f'{package}.{name}' if package else name] = path
+            self._by_package.setdefault(package, {})[name] = path
+
+    def resolve(self, path: str, code: str) -> Set[str]:
+        targets = set()
+        for name in _JAVA_IMPORT.findall(code):
+            if name.endswith('.*'):
+                targets.update(self._by_package.get(name[:-2], {}).values())
+                continue
+            # 静态导入或内部类导入时逐级去掉末尾成员
+            while name:
+                if name in self._by_fqn:
+                    targets.add(self._by_fqn[name])
+                    break
+                name = name.rpartition('.')[0]
+        # 同一包内的类无需导入，按类名出现情况判断依赖；先取出文件中的全部标识符，避免逐个类名搜索
+        same_package = self._by_package.get(self._package_of[path], {})
+        for name in set(_JAVA_IDENTIFIER.findall(code)) & same_package.keys():
+            if same_package[name] != path:
+                targets.add(same_package[name])
+        return targets
+
+
+def _resolve_js_imports(path: str, code: str, known: Set[str]) -> Set[str]:
+    targets = set()
+    for spec in _JS_IMPORT.findall(code):
+        if not spec.startswith('.'):
+            continue
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(path), spec))
+        for ext in _JS_EXTENSIONS:
+            if base + ext in known:
+                targets.add(base + ext)
+                break
+    return targets
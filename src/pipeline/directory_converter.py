@@ -0,0 +1,475 @@
+import json
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.converter.base_converter import BaseConverter
+from src.pipeline.dependency_graph import DependencyGraph, summarize_symbols
+from src.pipeline.file_index import DEFAULT_EXCLUDES, GlobMatcher, ProjectIndex
+from src.pipeline.repair import RepairStage
+from src.pipeline.worker_pool import ConversionPool
+from src.utils.file_operate import DirectorySource
+from src.validator.validator_pool import get_validator_pool
+from config.app_config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# 输出目录中记录转换状态的文件
+STATE_FILE = '.langconverter-state.json'
+# 状态文件格式版本，版本不一致时丢弃旧状态
+_STATE_VERSION = 1
+# 转换过程中保存状态文件的最小间隔（秒），中断后已完成的文件不必重新转换
+_STATE_SAVE_INTERVAL = 5.0
+
+
+class FileStatus:
+    """单个文件的处理结果"""
+    CONVERTED = 'converted'
+    UP_TO_DATE = 'up_to_date'
+    FAILED = 'failed'
+    INVALID = 'invalid'
+
+
+class ConversionState:
+    """目录转换状态：逐文件记录源文件的修改时间、大小、哈希、转换指纹以及输出文件的修改时间和大小"""
+
+    def __init__(self, path: str, source_lang: str, target_lang: str):
+        """
+        读取状态文件，语言对或格式版本不一致时从空状态开始
+
+        Args:
+            path: 状态文件路径
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+        """
+        self.path = path
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.files: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (data.get('version') == _STATE_VERSION and data.get('source_lang') == source_lang
+                and data.get('target_lang') == target_lang):
+            self.files = data.get('files') or {}
+
+    def get(self, rel_path: str) -> Optional[Dict]:
+        with self._lock:
+            return self.files.get(rel_path)
+
+    def update(self, rel_path: str, record: Dict):
+        """
+        写入文件记录，距上次保存超过间隔时顺带保存状态文件
+
+        Args:
+            rel_path: 源文件相对路径
+            record: 文件记录
+        """
+        with self._lock:
+            self.files[rel_path] = record
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= _STATE_SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def remove(self, rel_path: str) -> Optional[Dict]:
+        with self._lock:
+            record = self.files.pop(rel_path, None)
+            if record is not None:
+                self._dirty = True
+            return record
+
+    def save(self):
+        """先写临时文件再替换，中断时不会留下不完整的状态文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({
+                'version': _STATE_VERSION,
+                'source_lang': self.source_lang,
+                'target_lang': self.target_lang,
+                'files': self.files
+            }, ensure_ascii=False, sort_keys=True)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            _write_atomic(self.path, data)
+
+
+class DirectoryConversionResult:
+    """目录转换的统计结果"""
+
+    def __init__(self):
+        self.converted: List[str] = []
+        self.up_to_date: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.invalid: Dict[str, List[str]] = {}
+        self.duplicates = 0
+        self.copied = 0
+        self.removed = 0
+        self.skipped: Dict[str, str] = {}
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """是否没有转换失败的文件"""
+        return not self.failed
+
+    def to_dict(self) -> Dict:
+        return {
+            'converted': len(self.converted),
+            'up_to_date': len(self.up_to_date),
+            'duplicates': self.duplicates,
+            'failed': self.failed,
+            'invalid': self.invalid,
+            'copied': self.copied,
+            'removed': self.removed,
+            'skipped': len(self.skipped),
+            'elapsed_seconds': round(self.elapsed, 3)
+        }
+
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class DirectoryConverter:
+    """本地目录转换：转换结果写入输出目录（或源目录），不经过上传、临时目录和ZIP
+
+    源文件的修改时间和大小未变化时直接沿用记录的哈希，不再读取；源文件哈希、依赖摘要、模型和
+    提示模板都未变化且输出文件未被改动的文件视为已是最新，不再转换。
+    """
+
+    def __init__(self, converter: BaseConverter, source_lang: str, target_lang: str,
+                 workers: Optional[int] = None, validate: Optional[bool] = None,
+                 force: bool = False, fail_fast: bool = False,
+                 include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 use_gitignore: bool = True,
+                 on_plan: Optional[Callable[[int], None]] = None,
+                 on_file: Optional[Callable[[str, str], None]] = None):
+        """
+        初始化目录转换
+
+        Args:
+            converter: 源语言对应的转换器
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            workers: 并发转换的文件数，默认读取 AppConfig.CONVERT_WORKERS
+            validate: 是否验证并修复转换结果，默认读取 AppConfig.VALIDATION_ENABLED
+            force: 忽略转换状态，全部重新转换
+            fail_fast: 出现失败时不再开始新的文件
+            include: 包含模式，非空时只有匹配的文件参与转换
+            exclude: 额外的排除模式
+            use_gitignore: 是否遵循项目中的 .gitignore
+            on_plan: 确定待处理文件数后的回调，参数为文件数
+            on_file: 每个文件处理结束时的回调，参数为文件相对路径和 FileStatus
+        """
+        self.converter = converter
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.workers = workers
+        self.validate = AppConfig.VALIDATION_ENABLED if validate is None else validate
+        self.force = force
+        self.fail_fast = fail_fast
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.use_gitignore = use_gitignore
+        self.on_plan = on_plan
+        self.on_file = on_file
+
+    def run(self, source_dir: str, output_dir: Optional[str] = None) -> DirectoryConversionResult:
+        """
+        转换目录
+
+        Args:
+            source_dir: 源代码目录
+            output_dir: 输出目录，为None时转换结果写在源文件旁边（原地转换），
+                        否则在输出目录中生成与源目录结构相同的项目，其他文件原样复制
+
+        Returns:
+            转换统计
+        """
+        started = time.monotonic()
+        source_dir = os.path.abspath(source_dir)
+        output_dir = os.path.abspath(output_dir) if output_dir else source_dir
+        in_place = output_dir == source_dir
+        result = DirectoryConversionResult()
+        state = ConversionState(os.path.join(output_dir, STATE_FILE), self.source_lang, self.target_lang)
+
+        # 输出目录位于源目录之内时不把它当作源文件
+        ignored_prefixes = [STATE_FILE]
+        exclude = list(self.exclude)
+        if not in_place and output_dir.startswith(source_dir + os.sep):
+            rel_output = os.path.relpath(output_dir, source_dir).replace(os.sep, '/')
+            ignored_prefixes.append(rel_output + '/')
+            exclude.append(rel_output + '/**')
+
+        source = DirectorySource(source_dir)
+        index = ProjectIndex.build(source, self.source_lang, include=self.include, exclude=exclude,
+                                   use_gitignore=self.use_gitignore, known_hashes=self._known_hashes(source_dir, state))
+        result.skipped = dict(index.skipped)
+        paths = [entry.path for entry in index.unique_entries]
+        entries = {entry.path: entry for entry in index.entries}
+        if self.on_plan:
+            self.on_plan(len(index.entries))
+
+        graph = None
+        waves = [paths]
+        if AppConfig.DEPENDENCY_ORDERING:
+            graph = DependencyGraph.build(source, paths, self.source_lang,
+                                          aliases={entry.path: entry.duplicate_of for entry in index.duplicates})
+            waves = graph.waves()
+        summary_sources = graph.depended_on() if graph is not None else set()
+
+        passthrough = []
+        if not in_place:
+            excluded = GlobMatcher(DEFAULT_EXCLUDES + self.exclude)
+            passthrough = [path for path in index.passthrough + sorted(index.skipped)
+                           if not any(path.startswith(prefix) for prefix in ignored_prefixes)
+                           and not excluded.match(path)]
+        # 原地转换时避开目录中已有的其他文件，上次生成的输出文件除外
+        taken = set(passthrough)
+        if in_place:
+            previous_outputs = {record.get('target') for record in state.files.values()}
+            taken = set(index.passthrough) - previous_outputs
+        targets = self._assign_targets(sorted(entries), taken)
+
+        symbol_summaries: Dict[str, str] = {}
+        statuses: Dict[str, str] = {}
+        repair_stage = None
+        if self.validate:
+            repair_stage = RepairStage(self.converter, self.source_lang, self.target_lang, get_validator_pool())
+
+        def dependency_context(rel_path):
+            if graph is None:
+                return ''
+            parts = []
+            total = 0
+            for dep in sorted(graph.dependencies[rel_path]):
+                summary = symbol_summaries.get(dep)
+                if not summary:
+                    continue
+                if total + len(summary) > AppConfig.DEPENDENCY_CONTEXT_MAX_CHARS:
+                    break
+                parts.append(summary)
+                total += len(summary) + 1
+            return '\n'.join(parts)
+
+        def write_output(rel_path, fingerprint, code, valid):
+            output_path = os.path.join(output_dir, targets[rel_path])
+            _write_atomic(output_path, code)
+            source_stat = os.stat(os.path.join(source_dir, rel_path))
+            output_stat = os.stat(output_path)
+            state.update(rel_path, {
+                'mtime_ns': source_stat.st_mtime_ns,
+                'size': source_stat.st_size,
+                'sha256': entries[rel_path].sha256,
+                'fingerprint': fingerprint,
+                'target': targets[rel_path],
+                'summary': symbol_summaries.get(rel_path),
+                # 未通过检查的结果下次重新转换
+                'valid': valid,
+                'output_mtime_ns': output_stat.st_mtime_ns,
+                'output_size': output_stat.st_size
+            })
+
+        def convert_file(rel_path):
+            entry = entries[rel_path]
+            dependencies = dependency_context(rel_path)
+            # 以源文件哈希代替源代码计算指纹，已是最新的文件不必读取
+            fingerprint = self.converter.fingerprint(self.source_lang, self.target_lang, entry.sha256, dependencies)
+            record = state.get(rel_path)
+            if not self.force and self._up_to_date(record, fingerprint, targets[rel_path], output_dir):
+                if rel_path in summary_sources and record.get('summary') is not None:
+                    symbol_summaries[rel_path] = record['summary']
+                statuses[rel_path] = FileStatus.UP_TO_DATE
+                return FileStatus.UP_TO_DATE
+
+            code = source.read_text(rel_path)
+            converted_code = self.converter.convert(self.source_lang, self.target_lang, code, dependencies)
+            if rel_path in summary_sources:
+                symbol_summaries[rel_path] = summarize_symbols(self.target_lang, targets[rel_path], converted_code,
+                                                               AppConfig.SYMBOL_SUMMARY_MAX_CHARS)
+
+            def on_checked(outcome):
+                if outcome.rounds and outcome.valid:
+                    self.converter.update_cache(self.source_lang, self.target_lang, code, outcome.code, dependencies)
+                write_output(rel_path, fingerprint, outcome.code, outcome.valid)
+                if not outcome.valid:
+                    result.invalid[targets[rel_path]] = outcome.validation.errors
+                    if self.on_file:
+                        self.on_file(rel_path, FileStatus.INVALID)
+
+            if repair_stage is not None:
+                repair_stage.submit(rel_path, code, converted_code, on_checked)
+            else:
+                write_output(rel_path, fingerprint, converted_code, True)
+            statuses[rel_path] = FileStatus.CONVERTED
+            return FileStatus.CONVERTED
+
+        def on_file_finish(task_result):
+            if task_result.ok:
+                status = task_result.result
+                (result.converted if status == FileStatus.CONVERTED else result.up_to_date).append(task_result.item)
+            else:
+                status = FileStatus.FAILED
+                result.failed[task_result.item] = str(task_result.error)
+                logger.error(f'转换文件 {task_result.item} 失败: {task_result.error}')
+            if self.on_file:
+                self.on_file(task_result.item, status)
+
+        try:
+            pool = ConversionPool(self.workers)
+            for wave in waves:
+                pool.run(wave, convert_file, on_finish=on_file_finish, fail_fast=self.fail_fast)
+                if self.fail_fast and result.failed:
+                    break
+            if repair_stage is not None:
+                # 分段等待，便于响应中断
+                while not repair_stage.wait(timeout=0.5):
+                    pass
+                if repair_stage.errors:
+                    raise repair_stage.errors[0]
+
+            self._write_duplicates(index, entries, targets, statuses, source_dir, output_dir, state, result)
+            result.copied = self._copy_passthrough(passthrough, source_dir, output_dir)
+            if not result.failed:
+                result.removed = self._remove_stale(state, set(entries), output_dir)
+        finally:
+            if repair_stage is not None:
+                repair_stage.shutdown()
+            state.save()
+            result.elapsed = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def _known_hashes(source_dir: str, state: ConversionState) -> Dict[str, str]:
+        # 修改时间和大小都未变化的源文件沿用记录的哈希
+        known = {}
+        for rel_path, record in state.files.items():
+            stat = _stat(os.path.join(source_dir, rel_path))
+            if (stat is not None and record.get('sha256') and stat.st_mtime_ns == record.get('mtime_ns')
+                    and stat.st_size == record.get('size')):
+                known[rel_path] = record['sha256']
+        return known
+
+    def _assign_targets(self, paths: List[str], taken: set) -> Dict[str, str]:
+        # 按路径顺序分配输出文件名，冲突时追加序号，多次运行得到相同的文件名
+        target_ext = AppConfig.SUPPORTED_EXTENSIONS.get(self.target_lang, [''])[0]
+        targets = {}
+        for rel_path in paths:
+            stem = posixpath.splitext(rel_path)[0]
+            candidate = stem + target_ext
+            index = 1
+            while candidate in taken:
+                candidate = f'{stem}_{index}{target_ext}'
+                index += 1
+            taken.add(candidate)
+            targets[rel_path] = candidate
+        return targets
+
+    @staticmethod
+    def _up_to_date(record: Optional[Dict], fingerprint: str, target: str, output_dir: str) -> bool:
+        if not record or record.get('fingerprint') != fingerprint or not record.get('valid', False):
+            return False
+        if record.get('target') != target:
+            return False
+        # 输出文件被删除或改动时重新生成
+        stat = _stat(os.path.join(output_dir, target))
+        return (stat is not None and stat.st_mtime_ns == record.get('output_mtime_ns')
+                and stat.st_size == record.get('output_size'))
+
+    def _write_duplicates(self, index: ProjectIndex, entries, targets, statuses, source_dir: str,
+                          output_dir: str, state: ConversionState, result: DirectoryConversionResult):
+        # 内容相同的文件复用首个文件的输出
+        for entry in index.duplicates:
+            original = entry.duplicate_of
+            if original not in statuses:
+                result.failed[entry.path] = f'与之内容相同的文件 {original} 未转换成功'
+                continue
+            with open(os.path.join(output_dir, targets[original]), 'r', encoding='utf-8') as f:
+                code = f.read()
+            output_path = os.path.join(output_dir, targets[entry.path])
+            current = None
+            if os.path.exists(output_path):
+                with open(output_path, 'r', encoding='utf-8', errors='replace') as f:
+                    current = f.read()
+            if current != code:
+                _write_atomic(output_path, code)
+            source_stat = os.stat(os.path.join(source_dir, entry.path))
+            state.update(entry.path, {
+                'mtime_ns': source_stat.st_mtime_ns,
+                'size': source_stat.st_size,
+                'sha256': entry.sha256,
+                'target': targets[entry.path],
+                'duplicate_of': original
+            })
+            result.duplicates += 1
+            if self.on_file:
+                self.on_file(entry.path, statuses[original])
+
+    @staticmethod
+    def _copy_passthrough(paths: List[str], source_dir: str, output_dir: str) -> int:
+        # 只复制新增或改动过的文件，copy2 保留修改时间供下次比较
+        copied = 0
+        for rel_path in paths:
+            src = os.path.join(source_dir, rel_path)
+            dst = os.path.join(output_dir, rel_path)
+            src_stat = _stat(src)
+            dst_stat = _stat(dst)
+            if src_stat is None:
+                continue
+            if (dst_stat is not None and dst_stat.st_size == src_stat.st_size
+                    and dst_stat.st_mtime_ns == src_stat.st_mtime_ns):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+            copied += 1
+        return copied
+
+    @staticmethod
+    def _remove_stale(state: ConversionState, current: set, output_dir: str) -> int:
+        # 源文件已删除时一并删除未被改动过的输出文件
+        removed = 0
+        for rel_path in [path for path in state.files if path not in current]:
+            record = state.remove(rel_path)
+            target = record.get('target')
+            if not target:
+                continue
+            output_path = os.path.join(output_dir, target)
+            stat = _stat(output_path)
+            if stat is None:
+                continue
+            unchanged = (record.get('output_mtime_ns') is None
+                         or (stat.st_mtime_ns == record.get('output_mtime_ns')
+                             and stat.st_size == record.get('output_size')))
+            if unchanged:
+                os.remove(output_path)
+                removed += 1
+        return removed
@@ -0,0 +1,318 @@
+import codecs
+import hashlib
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.app_config import AppConfig
+
+# 默认排除的依赖、构建产物和测试夹具目录
+DEFAULT_EXCLUDES = [
+    '.git/', '.svn/', '.hg/', '.idea/', '.vscode/',
+    'node_modules/', 'bower_components/', 'vendor/', 'third_party/', 'third-party/',
+    'dist/', 'build/', 'out/', 'target/', '__pycache__/', '.venv/', 'venv/',
+    'fixtures/', 'testdata/', '__fixtures__/',
+    '*.min.js', '*.bundle.js', '*_pb2.py', '*_pb2_grpc.py', '*.pb.c', '*.pb.h',
+]
+
+# 生成代码常见的文件头标记
+_GENERATED_MARKERS = (b'@generated', b'do not edit', b'auto-generated', b'autogenerated', b'generated by')
+# 平均行长超过该值的JS文件视为压缩代码
+_MINIFIED_LINE_LENGTH = 300
+# 用于判断二进制文件的读取长度
+_SNIFF_BYTES = 8192
+# 扫描文件内容时每次读取的字节数，大文件不整体读入内存
+_SCAN_CHUNK_BYTES = 64 * 1024
+
+
+class SkipReason:
+    """文件不参与转换的原因"""
+    EXCLUDED = 'excluded'
+    GITIGNORE = 'gitignore'
+    BINARY = 'binary'
+    TOO_LARGE = 'too_large'
+    GENERATED = 'generated'
+    MINIFIED = 'minified'
+
+
+class FileEntry:
+    """项目索引中的一个待转换文件"""
+
+    def __init__(self, path: str, size: int, sha256: str, language: str, duplicate_of: Optional[str] = None):
+        """
+        初始化索引条目
+
+        Args:
+            path: 使用'/'分隔的相对路径
+            size: 文件字节数
+            sha256: 文件内容的SHA-256
+            language: 按扩展名识别的语言
+            duplicate_of: 内容相同的首个文件路径，自身为首个文件时为None
+        """
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.language = language
+        self.duplicate_of = duplicate_of
+
+    def to_dict(self) -> Dict:
+        return {
+            'path': self.path,
+            'size': self.size,
+            'sha256': self.sha256,
+            'language': self.language,
+            'duplicate_of': self.duplicate_of
+        }
+
+
+class GlobMatcher:
+    """gitignore风格的路径匹配：不含'/'的模式匹配任意层级的文件名，以'/'结尾的模式匹配目录，支持'**'和'!'取反"""
+
+    def __init__(self, patterns: Iterable[str], base: str = ''):
+        """
+        初始化匹配器
+
+        Args:
+            patterns: 模式列表，空行和'#'开头的行会被忽略
+            base: 模式所在目录（.gitignore所在目录），为空表示项目根目录
+        """
+        self.base = base.strip('/')
+        self._rules = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:]
+            self._rules.append((negate, _compile_glob(pattern)))
+
+    def match(self, path: str) -> Optional[bool]:
+        """
+        匹配路径
+
+        Args:
+            path: 相对项目根目录的路径
+
+        Returns:
+            True表示匹配，False表示被取反规则排除，None表示没有规则适用
+        """
+        if self.base:
+            if not path.startswith(self.base + '/'):
+                return None
+            path = path[len(self.base) + 1:]
+        result = None
+        for negate, regex in self._rules:
+            if regex.match(path):
+                result = not negate
+        return result
+
+
+def _compile_glob(pattern: str):
+    dir_only = pattern.endswith('/')
+    pattern = pattern.strip('/') if dir_only else pattern.lstrip('/')
+    anchored = '/' in pattern
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    # 目录模式匹配目录下的所有文件；文件模式也匹配同名目录下的文件
+    suffix = '/.*' if dir_only else '(?:/.*)?'
+    return re.compile(f'^{prefix}{regex}{suffix}$')
+
+
+class ProjectIndex:
+    """项目文件索引：筛选待转换文件并记录大小、哈希、语言，内容相同的文件只转换一次"""
+
+    def __init__(self):
+        self.entries: List[FileEntry] = []
+        self.passthrough: List[str] = []
+        self.skipped: Dict[str, str] = {}
+
+    @property
+    def unique_entries(self) -> List[FileEntry]:
+        """需要调用API转换的文件"""
+        return [entry for entry in self.entries if entry.duplicate_of is None]
+
+    @property
+    def duplicates(self) -> List[FileEntry]:
+        """与其他文件内容相同、直接复用转换结果的文件"""
+        return [entry for entry in self.entries if entry.duplicate_of is not None]
+
+    @classmethod
+    def build(cls, source, source_lang: str,
+              include: Optional[List[str]] = None,
+              exclude: Optional[List[str]] = None,
+              use_gitignore: bool = True,
+              max_file_bytes: Optional[int] = None,
+              known_hashes: Optional[Dict[str, str]] = None) -> 'ProjectIndex':
+        """
+        扫描项目源并建立索引
+
+        Args:
+            source: 项目源（DirectorySource 或 ZipSource）
+            source_lang: 源代码语言
+            include: 包含模式，非空时只有匹配的文件参与转换
+            exclude: 额外的排除模式，在默认排除规则之外生效
+            use_gitignore: 是否遵循项目中的 .gitignore
+            max_file_bytes: 参与转换的单个文件大小上限，默认读取 AppConfig.MAX_FILE_BYTES
+            known_hashes: 已知未变化（如按修改时间和大小判断）的文件到其内容SHA-256的映射，
+                          这些文件上次已通过内容检查，不再读取
+
+        Returns:
+            项目索引
+        """
+        index = cls()
+        max_file_bytes = max_file_bytes or AppConfig.MAX_FILE_BYTES
+        extensions = AppConfig.SUPPORTED_EXTENSIONS.get(source_lang, [])
+        include_matcher = GlobMatcher(include) if include else None
+        exclude_matcher = GlobMatcher(DEFAULT_EXCLUDES + list(exclude or []))
+
+        files = source.list_files()
+        gitignores = []
+        if use_gitignore:
+            for path in files:
+                if posixpath.basename(path) == '.gitignore':
+                    with source.open(path) as f:
+                        lines = f.read().decode('utf-8', errors='ignore').splitlines()
+                    gitignores.append(GlobMatcher(lines, posixpath.dirname(path)))
+            # 上层目录的规则先生效，子目录的规则可以覆盖
+            gitignores.sort(key=lambda matcher: matcher.base.count('/') if matcher.base else -1)
+
+        first_by_hash = {}
+        for path in files:
+            if posixpath.splitext(path)[1].lower() not in extensions:
+                index.passthrough.append(path)
+                continue
+
+            reason = cls._filter_reason(path, include_matcher, exclude_matcher, gitignores)
+            size = source.size(path) if reason is None else 0
+            if reason is None and size > max_file_bytes:
+                reason = SkipReason.TOO_LARGE
+            known = known_hashes.get(path) if known_hashes and reason is None else None
+            if known is not None:
+                entry = FileEntry(path, size, known, source_lang, first_by_hash.get(known))
+                first_by_hash.setdefault(known, path)
+                index.entries.append(entry)
+                continue
+            if reason is None:
+                with source.open(path) as f:
+                    reason, size, digest = cls._scan(path, f)
+            if reason is not None:
+                index.skipped[path] = reason
+                continue
+
+            entry = FileEntry(path, size, digest, source_lang, first_by_hash.get(digest))
+            first_by_hash.setdefault(digest, path)
+            index.entries.append(entry)
+        return index
+
+    @staticmethod
+    def _filter_reason(path: str, include_matcher, exclude_matcher, gitignores) -> Optional[str]:
+        if include_matcher is not None and not include_matcher.match(path):
+            return SkipReason.EXCLUDED
+        if exclude_matcher.match(path):
+            return SkipReason.EXCLUDED
+        ignored = None
+        for matcher in gitignores:
+            result = matcher.match(path)
+            if result is not None:
+                ignored = result
+        if ignored:
+            return SkipReason.GITIGNORE
+        return None
+
+    @classmethod
+    def _scan(cls, path: str, stream) -> Tuple[Optional[str], int, str]:
+        """
+        分块读取文件内容，同时计算哈希并检查内容，不把整个文件读入内存
+
+        Args:
+            path: 相对路径
+            stream: 二进制文件对象
+
+        Returns:
+            (跳过原因或None, 文件字节数, 内容SHA-256)
+        """
+        sha256 = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        head = b''
+        size = 0
+        newlines = 0
+        while True:
+            chunk = stream.read(_SCAN_CHUNK_BYTES)
+            if not chunk:
+                break
+            if len(head) < _SNIFF_BYTES:
+                head += chunk[:_SNIFF_BYTES - len(head)]
+                if b'\0' in head:
+                    return SkipReason.BINARY, size, ''
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError:
+                return SkipReason.BINARY, size, ''
+            sha256.update(chunk)
+            size += len(chunk)
+            newlines += chunk.count(b'\n')
+        try:
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return SkipReason.BINARY, size, ''
+        return cls._content_reason(path, head, size, newlines), size, sha256.hexdigest()
+
+    @staticmethod
+    def _content_reason(path: str, head: bytes, size: int, newlines: int) -> Optional[str]:
+        lowered = b'\n'.join(head.lower().splitlines()[:5])
+        if any(marker in lowered for marker in _GENERATED_MARKERS):
+            return SkipReason.GENERATED
+        if path.endswith(('.js', '.jsx')) and size:
+            if size / (newlines + 1) > _MINIFIED_LINE_LENGTH:
+                return SkipReason.MINIFIED
+        return None
+
+    def summary(self) -> Dict:
+        """
+        索引统计信息
+
+        Returns:
+            候选文件数、去重后文件数、重复文件数以及各跳过原因的计数
+        """
+        skipped = {}
+        for reason in self.skipped.values():
+            skipped[reason] = skipped.get(reason, 0) + 1
+        unique = len(self.unique_entries)
+        return {
+            'candidates': len(self.entries),
+            'unique': unique,
+            'duplicates': len(self.entries) - unique,
+            'skipped': skipped,
+            'total_bytes': sum(entry.size for entry in self.entries)
+        }
+
+    def to_manifest(self) -> Dict:
+        """
+        导出完整清单
+
+        Returns:
+            包含所有条目、跳过文件和统计信息的字典
+        """
+        return {
+            'entries': [entry.to_dict() for entry in self.entries],
+            'skipped': dict(self.skipped),
+            'summary': self.summary()
+        }
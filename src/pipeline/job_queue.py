@@ -0,0 +1,201 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.app_config import AppConfig
+
+
+class JobStatus:
+    """后台任务状态"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    TERMINAL = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """任务被取消时由任务函数抛出"""
+    pass
+
+
+class Job:
+    """后台任务"""
+
+    def __init__(self, job_id: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        初始化任务
+
+        Args:
+            job_id: 任务ID
+            metadata: 任务附带的信息，如工作目录、结果文件路径等
+        """
+        self.id = job_id
+        self.metadata = metadata or {}
+        self.status = JobStatus.QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._future = None
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self.cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """是否已结束"""
+        return self.status in JobStatus.TERMINAL
+
+    def check_cancelled(self):
+        """
+        检查取消标记，供任务函数在阶段之间调用
+
+        Raises:
+            JobCancelled: 任务已被请求取消时抛出
+        """
+        if self.cancelled:
+            raise JobCancelled(f'任务 {self.id} 已取消')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为可JSON序列化的字典
+
+        Returns:
+            任务状态字典
+        """
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobQueue:
+    """后台任务队列，由固定大小的线程池执行任务"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        初始化任务队列
+
+        Args:
+            max_workers: 同时运行的任务数，默认读取 AppConfig.JOB_WORKERS
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers or AppConfig.JOB_WORKERS),
+                                            thread_name_prefix='job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args, job_id: Optional[str] = None,
+               metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+        """
+        提交任务，立即返回
+
+        Args:
+            func: 任务函数，第一个参数为Job实例，返回值作为任务结果
+            *args: 传给任务函数的位置参数
+            job_id: 指定任务ID，默认自动生成
+            metadata: 任务附带的信息
+            **kwargs: 传给任务函数的关键字参数
+
+        Returns:
+            新建的任务
+        """
+        job = Job(job_id or uuid.uuid4().hex, metadata)
+        with self._lock:
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict):
+        if job.cancelled:
+            self._finish(job, JobStatus.CANCELLED)
+            return
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = func(job, *args, **kwargs)
+            self._finish(job, JobStatus.CANCELLED if job.cancelled else JobStatus.COMPLETED)
+        except JobCancelled:
+            self._finish(job, JobStatus.CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.FAILED)
+
+    @staticmethod
+    def _finish(job: Job, status: str):
+        job.finished_at = time.time()
+        job.status = status
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        查找任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            任务，不存在时返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id: str) -> bool:
+        """
+        删除已结束任务的记录
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            是否删除了记录；任务不存在或未结束时返回False
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return False
+            del self._jobs[job_id]
+            return True
+
+    def status_counts(self) -> Dict[str, int]:
+        """
+        按状态统计任务数
+
+        Returns:
+            各状态的任务数
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (JobStatus.QUEUED, JobStatus.RUNNING) + JobStatus.TERMINAL}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务；排队中的任务直接取消，运行中的任务在下一个检查点停止
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            是否成功发出取消请求
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, JobStatus.CANCELLED)
+        return True
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from config.app_config import AppConfig
+
+
+def make_project_key(project: str, source_lang: str, target_lang: str) -> str:
+    """
+    计算项目清单的键：同一项目、同一语言对的多次转换共享同一份清单
+
+    Args:
+        project: 项目名称
+        source_lang: 源代码语言
+        target_lang: 目标代码语言
+
+    Returns:
+        SHA-256 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for part in (project, source_lang, target_lang):
+        digest.update((part or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ManifestEntry(NamedTuple):
+    """清单中一个文件的转换记录"""
+    # 转换输入的指纹，见 BaseConverter.fingerprint
+    fingerprint: str
+    # 最终写入结果的代码（已通过验证或修复）
+    output: str
+    # 转换时生成的符号摘要，供依赖本文件的文件复用
+    summary: Optional[str]
+
+
+class ProjectManifest:
+    """基于SQLite的项目转换清单，逐文件记录转换输入的指纹和最终结果
+
+    文件转换完成即写入，任务失败或取消后已完成的文件不会丢失；
+    再次转换同一项目时，指纹未变化的文件直接复用记录的结果。
+    """
+
+    def __init__(self, path: str):
+        """
+        初始化项目清单
+
+        Args:
+            path: SQLite数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS manifest_files ('
+                'project_key TEXT NOT NULL, path TEXT NOT NULL, fingerprint TEXT NOT NULL, '
+                'output TEXT NOT NULL, summary TEXT, job_id TEXT, updated_at REAL NOT NULL, '
+                'PRIMARY KEY (project_key, path))'
+            )
+
+    def lookup(self, project_key: str, path: str, fingerprint: str) -> Optional[ManifestEntry]:
+        """
+        查询文件的转换记录，指纹不一致时视为未转换
+
+        Args:
+            project_key: 项目清单的键
+            path: 文件相对路径
+            fingerprint: 本次转换输入的指纹
+
+        Returns:
+            转换记录，没有记录或指纹已变化时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT fingerprint, output, summary FROM manifest_files '
+                'WHERE project_key = ? AND path = ? AND fingerprint = ?',
+                (project_key, path, fingerprint)
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def record(self, project_key: str, path: str, fingerprint: str, output: str,
+               summary: Optional[str] = None, job_id: Optional[str] = None):
+        """
+        写入文件的转换记录，覆盖之前的记录
+
+        Args:
+            project_key: 项目清单的键
+            path: 文件相对路径
+            fingerprint: 转换输入的指纹
+            output: 最终结果
+            summary: 转换时生成的符号摘要
+            job_id: 产生该结果的任务ID
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO manifest_files '
+                '(project_key, path, fingerprint, output, summary, job_id, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (project_key, path, fingerprint, output, summary, job_id, time.time())
+            )
+
+    def prune(self, project_key: str, keep_paths: Iterable[str]) -> int:
+        """
+        删除项目中已不存在的文件的记录
+
+        Args:
+            project_key: 项目清单的键
+            keep_paths: 项目当前包含的文件相对路径
+
+        Returns:
+            删除的记录数
+        """
+        keep = set(keep_paths)
+        with self._lock, self._conn:
+            paths = [row[0] for row in self._conn.execute(
+                'SELECT path FROM manifest_files WHERE project_key = ?', (project_key,))]
+            stale = [(project_key, path) for path in paths if path not in keep]
+            self._conn.executemany('DELETE FROM manifest_files WHERE project_key = ? AND path = ?', stale)
+        return len(stale)
+
+    def count(self, project_key: str) -> int:
+        """
+        项目已记录的文件数
+
+        Args:
+            project_key: 项目清单的键
+
+        Returns:
+            记录数
+        """
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM manifest_files WHERE project_key = ?', (project_key,)).fetchone()[0]
+
+
+_default_manifest = None
+_default_manifest_lock = threading.Lock()
+
+
+def get_project_manifest() -> Optional[ProjectManifest]:
+    """
+    获取按 AppConfig 配置创建的全局项目清单
+
+    Returns:
+        全局清单实例，未配置 MANIFEST_DB_PATH 时返回None
+    """
+    global _default_manifest
+    if not AppConfig.MANIFEST_DB_PATH:
+        return None
+    with _default_manifest_lock:
+        if _default_manifest is None:
+            _default_manifest = ProjectManifest(AppConfig.MANIFEST_DB_PATH)
+        return _default_manifest
@@ -0,0 +1,398 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from config.app_config import AppConfig
+
+# 任务结束时的进度状态，订阅者收到后即可停止
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+# 逐文件事件中保留的最近完成文件数
+_RECENT_FILES = 10
+
+
+class ProgressBus(ABC):
+    """进度发布/订阅：发布方写入任务的最新状态，订阅方只在状态变化时收到事件"""
+
+    @abstractmethod
+    def publish(self, job_id: str, state: Dict[str, Any]) -> int:
+        """
+        发布任务的最新状态
+
+        Args:
+            job_id: 任务ID
+            state: 可JSON序列化的进度状态
+
+        Returns:
+            状态序号，每次发布递增
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        读取任务的最新状态
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            (状态序号, 状态)，任务不存在时返回None
+        """
+        pass
+
+    @abstractmethod
+    def discard(self, job_id: str):
+        """
+        删除任务的进度
+
+        Args:
+            job_id: 任务ID
+        """
+        pass
+
+    @abstractmethod
+    def _wait(self, job_id: str, after: int, timeout: float) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """等待序号大于 after 的状态，超时返回当前状态（可能未变化），任务不存在时返回None"""
+        pass
+
+    def state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取任务的最新状态
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            状态，任务不存在时返回None
+        """
+        entry = self.get(job_id)
+        return entry[1] if entry else None
+
+    def subscribe(self, job_id: str, after: int = 0,
+                  heartbeat: Optional[float] = None) -> Iterator[Optional[Tuple[int, Dict[str, Any]]]]:
+        """
+        订阅任务进度，状态变化时产出 (序号, 状态)，超过心跳间隔没有变化时产出None；
+        任务结束或进度被删除后停止
+
+        Args:
+            job_id: 任务ID
+            after: 只接收序号大于该值的状态（断线重连时传入最后收到的序号）
+            heartbeat: 心跳间隔（秒），默认读取 AppConfig.PROGRESS_HEARTBEAT
+
+        Returns:
+            进度事件的迭代器
+        """
+        heartbeat = heartbeat or AppConfig.PROGRESS_HEARTBEAT
+        # 重连时已收到过结束状态，直接结束而不是等满一个心跳间隔
+        entry = self.get(job_id)
+        if entry is not None and entry[0] <= after and entry[1].get('status') in TERMINAL_STATUSES:
+            return
+        while True:
+            entry = self._wait(job_id, after, heartbeat)
+            if entry is None:
+                return
+            seq, state = entry
+            if seq <= after:
+                # 重连时已收到过结束状态
+                if state.get('status') in TERMINAL_STATUSES:
+                    return
+                yield None
+                continue
+            after = seq
+            yield seq, state
+            if state.get('status') in TERMINAL_STATUSES:
+                return
+
+
+class MemoryProgressBus(ProgressBus):
+    """进程内的进度总线，订阅方在条件变量上等待，不轮询"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        初始化进程内进度总线
+
+        Args:
+            ttl: 已结束任务的进度保留时间（秒），默认读取 AppConfig.PROGRESS_TTL
+        """
+        self.ttl = AppConfig.PROGRESS_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, Dict[str, Any], float]] = {}
+        self._conditions: Dict[str, threading.Condition] = {}
+
+    def _condition(self, job_id: str) -> threading.Condition:
+        # 每个任务一个条件变量，发布时只唤醒该任务的订阅者
+        condition = self._conditions.get(job_id)
+        if condition is None:
+            condition = self._conditions[job_id] = threading.Condition(self._lock)
+        return condition
+
+    def publish(self, job_id: str, state: Dict[str, Any]) -> int:
+        # 先序列化，保证发布方之后修改状态不会影响订阅方
+        snapshot = json.loads(json.dumps(state))
+        with self._lock:
+            entry = self._entries.get(job_id)
+            seq = entry[0] + 1 if entry else 1
+            self._entries[job_id] = (seq, snapshot, time.time())
+            self._condition(job_id).notify_all()
+            self._purge_locked()
+        return seq
+
+    def get(self, job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+        return (entry[0], entry[1]) if entry else None
+
+    def discard(self, job_id: str):
+        with self._lock:
+            self._entries.pop(job_id, None)
+            condition = self._conditions.pop(job_id, None)
+            if condition is not None:
+                condition.notify_all()
+
+    def _wait(self, job_id: str, after: int, timeout: float) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            if job_id not in self._entries:
+                return None
+            self._condition(job_id).wait_for(
+                lambda: job_id not in self._entries or self._entries[job_id][0] > after, timeout)
+            entry = self._entries.get(job_id)
+        return (entry[0], entry[1]) if entry else None
+
+    def _purge_locked(self):
+        if self.ttl <= 0:
+            return
+        expired_before = time.time() - self.ttl
+        for job_id, (_, state, updated_at) in list(self._entries.items()):
+            if updated_at < expired_before and state.get('status') in TERMINAL_STATUSES:
+                del self._entries[job_id]
+                condition = self._conditions.pop(job_id, None)
+                if condition is not None:
+                    condition.notify_all()
+
+
+class SQLiteProgressBus(ProgressBus):
+    """基于SQLite文件的进度总线，多个服务进程（如多worker的gunicorn）共享同一个数据库文件
+
+    同一进程内的发布直接唤醒订阅者；其他进程的发布通过按间隔查询状态序号发现，
+    订阅者只在序号变化时收到事件。
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, poll_interval: Optional[float] = None):
+        """
+        初始化SQLite进度总线
+
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 已结束任务的进度保留时间（秒），默认读取 AppConfig.PROGRESS_TTL
+            poll_interval: 检查其他进程发布的间隔（秒），默认读取 AppConfig.PROGRESS_POLL_INTERVAL
+        """
+        self.path = path
+        self.ttl = AppConfig.PROGRESS_TTL if ttl is None else ttl
+        self.poll_interval = poll_interval or AppConfig.PROGRESS_POLL_INTERVAL
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        with self._lock, self._conn:
+            # 进度是临时数据，WAL 加 synchronous=NORMAL 避免每次发布都等待刷盘
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS job_progress ('
+                'job_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, state TEXT NOT NULL, '
+                'terminal INTEGER NOT NULL, updated_at REAL NOT NULL)'
+            )
+
+    def publish(self, job_id: str, state: Dict[str, Any]) -> int:
+        data = json.dumps(state, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO job_progress (job_id, seq, state, terminal, updated_at) VALUES (?, 1, ?, ?, ?) '
+                'ON CONFLICT(job_id) DO UPDATE SET seq = seq + 1, state = excluded.state, '
+                'terminal = excluded.terminal, updated_at = excluded.updated_at',
+                (job_id, data, int(state.get('status') in TERMINAL_STATUSES), now)
+            )
+            seq = self._conn.execute('SELECT seq FROM job_progress WHERE job_id = ?', (job_id,)).fetchone()[0]
+            if self.ttl > 0:
+                self._conn.execute('DELETE FROM job_progress WHERE terminal = 1 AND updated_at < ?',
+                                   (now - self.ttl,))
+        with self._changed:
+            self._changed.notify_all()
+        return seq
+
+    def get(self, job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute('SELECT seq, state FROM job_progress WHERE job_id = ?', (job_id,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def discard(self, job_id: str):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM job_progress WHERE job_id = ?', (job_id,))
+        with self._changed:
+            self._changed.notify_all()
+
+    def _seq(self, job_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute('SELECT seq FROM job_progress WHERE job_id = ?', (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _wait(self, job_id: str, after: int, timeout: float) -> Optional[Tuple[int, Dict[str, Any]]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self._seq(job_id)
+            if seq is None:
+                return None
+            remaining = deadline - time.monotonic()
+            if seq > after or remaining <= 0:
+                return self.get(job_id)
+            # 本进程发布时立即唤醒，其他进程的发布在下一次查询时发现
+            with self._changed:
+                self._changed.wait(min(self.poll_interval, remaining))
+
+
+class ProgressTracker:
+    """单个项目转换任务的进度：记录逐文件耗时，估算剩余时间，状态变化时发布到进度总线"""
+
+    def __init__(self, bus: ProgressBus, job_id: str, min_interval: Optional[float] = None):
+        """
+        初始化进度跟踪
+
+        Args:
+            bus: 进度总线
+            job_id: 任务ID
+            min_interval: 逐文件事件的最小发布间隔（秒），状态变化和最后一个文件总是立即发布，
+                          默认读取 AppConfig.PROGRESS_MIN_INTERVAL
+        """
+        self.bus = bus
+        self.job_id = job_id
+        self.min_interval = AppConfig.PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self._lock = threading.Lock()
+        self._created_at = time.monotonic()
+        self._converting_at = None
+        self._file_started: Dict[str, float] = {}
+        self._file_seconds_total = 0.0
+        self._last_published = 0.0
+        self.state: Dict[str, Any] = {
+            'current': 0,
+            'total': 0,
+            'failed': 0,
+            'current_file': '',
+            'current_file_status': '',
+            'in_progress': [],
+            'recent_files': [],
+            'status': 'preparing',
+            'elapsed_seconds': 0.0,
+            'avg_file_seconds': None,
+            'files_per_second': None,
+            'eta_seconds': None
+        }
+
+    def set_status(self, status: str, **fields):
+        """
+        更新任务状态并立即发布
+
+        Args:
+            status: 新状态（preparing/converting/validating/completed/error/cancelled）
+            **fields: 需要一并更新的其他字段，如 total、error
+        """
+        with self._lock:
+            if status == 'converting' and self._converting_at is None:
+                self._converting_at = time.monotonic()
+            self.state['status'] = status
+            self.state.update(fields)
+            if status in TERMINAL_STATUSES:
+                self.state['in_progress'] = []
+                self.state['eta_seconds'] = 0 if status == 'completed' else None
+            self._publish_locked(force=True)
+
+    def file_started(self, rel_path: str):
+        """
+        记录一个文件开始转换
+
+        Args:
+            rel_path: 文件相对路径
+        """
+        with self._lock:
+            name = os.path.basename(rel_path)
+            self._file_started[rel_path] = time.monotonic()
+            self.state['current_file'] = name
+            self.state['current_file_status'] = 'converting'
+            self.state['in_progress'].append(name)
+            self._publish_locked()
+
+    def file_finished(self, rel_path: str, ok: bool = True):
+        """
+        记录一个文件转换结束
+
+        Args:
+            rel_path: 文件相对路径
+            ok: 是否转换成功
+        """
+        with self._lock:
+            name = os.path.basename(rel_path)
+            started = self._file_started.pop(rel_path, None)
+            seconds = time.monotonic() - started if started is not None else 0.0
+            self._file_seconds_total += seconds
+            self.state['current'] += 1
+            if not ok:
+                self.state['failed'] += 1
+            if name in self.state['in_progress']:
+                self.state['in_progress'].remove(name)
+            if ok:
+                self.state['current_file_status'] = 'completed'
+            recent = self.state['recent_files']
+            recent.append({'file': name, 'seconds': round(seconds, 3), 'ok': ok})
+            del recent[:-_RECENT_FILES]
+            self._publish_locked(force=self.state['current'] >= self.state['total'])
+
+    def _update_timing_locked(self):
+        now = time.monotonic()
+        state = self.state
+        state['elapsed_seconds'] = round(now - self._created_at, 3)
+        done = state['current']
+        if not done or self._converting_at is None:
+            return
+        # 按开始转换以来的整体吞吐估算剩余时间，已包含并发的效果
+        converting_seconds = max(now - self._converting_at, 1e-6)
+        rate = done / converting_seconds
+        state['avg_file_seconds'] = round(self._file_seconds_total / done, 3)
+        state['files_per_second'] = round(rate, 3)
+        if state['status'] == 'converting':
+            state['eta_seconds'] = round(max(state['total'] - done, 0) / rate, 1)
+
+    def _publish_locked(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_published < self.min_interval:
+            return
+        self._last_published = now
+        self._update_timing_locked()
+        self.bus.publish(self.job_id, self.state)
+
+
+_default_bus = None
+_default_bus_lock = threading.Lock()
+
+
+def get_progress_bus() -> ProgressBus:
+    """
+    获取按 AppConfig 配置创建的全局进度总线：配置了 PROGRESS_DB_PATH 时使用多进程共享的SQLite总线，
+    否则使用进程内总线
+
+    Returns:
+        全局进度总线
+    """
+    global _default_bus
+    with _default_bus_lock:
+        if _default_bus is None:
+            if AppConfig.PROGRESS_DB_PATH:
+                _default_bus = SQLiteProgressBus(AppConfig.PROGRESS_DB_PATH)
+            else:
+                _default_bus = MemoryProgressBus()
+        return _default_bus
@@ -0,0 +1,189 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.converter.base_converter import BaseConverter
+from src.utils.inflight import inflight_slot
+from src.utils.logger import SAMPLED
+from src.validator.base_validator import ValidationResult
+from src.validator.validator_pool import ValidatorPool
+from config.app_config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class RepairOutcome:
+    """单个文件经过验证与修复后的最终结果"""
+
+    def __init__(self, key: Any, code: str, validation: ValidationResult, rounds: int):
+        """
+        初始化修复结果
+
+        Args:
+            key: 提交时指定的文件标识
+            code: 最终代码（通过验证的修复结果，或最后一次的结果）
+            validation: 最终代码的验证结果
+            rounds: 实际进行的修复轮数
+        """
+        self.key = key
+        self.code = code
+        self.validation = validation
+        self.rounds = rounds
+
+    @property
+    def valid(self) -> bool:
+        return self.validation.valid
+
+
+class _RepairItem:
+    def __init__(self, key: Any, original_code: str, code: str, on_done):
+        self.key = key
+        self.original_code = original_code
+        self.code = code
+        self.on_done = on_done
+        self.rounds = 0
+
+
+class RepairStage:
+    """转换后的验证与修复阶段
+
+    每个文件转换完成后立即提交验证；验证在进程池中进行，未通过的文件带上错误信息使用
+    ERROR_FIX_PROMPT 修复并重新验证，直到通过或达到轮数上限。验证和修复都不占用转换线程，
+    与项目中其他文件的转换同时进行。
+    """
+
+    def __init__(self, converter: BaseConverter, source_lang: str, target_lang: str,
+                 validator_pool: ValidatorPool, max_rounds: Optional[int] = None,
+                 max_workers: Optional[int] = None):
+        """
+        初始化验证与修复阶段
+
+        Args:
+            converter: 用于修复的转换器
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            validator_pool: 验证进程池
+            max_rounds: 单个文件的最大修复轮数，默认读取 AppConfig.REPAIR_MAX_ROUNDS，为0时只验证不修复
+            max_workers: 同时进行的修复请求数，默认读取 AppConfig.REPAIR_WORKERS
+        """
+        self.converter = converter
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.validator_pool = validator_pool
+        self.max_rounds = AppConfig.REPAIR_MAX_ROUNDS if max_rounds is None else max_rounds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers or AppConfig.REPAIR_WORKERS),
+                                            thread_name_prefix='repair')
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._cancelled = False
+        self.outcomes: Dict[Any, RepairOutcome] = {}
+        self.errors: List[BaseException] = []
+
+    def submit(self, key: Any, original_code: str, converted_code: str,
+               on_done: Optional[Callable[[RepairOutcome], None]] = None):
+        """
+        提交一个转换结果，立即返回
+
+        Args:
+            key: 文件标识
+            original_code: 源代码
+            converted_code: 转换结果
+            on_done: 得到最终结果时的回调，在验证或修复线程中调用
+        """
+        item = _RepairItem(key, original_code, converted_code, on_done)
+        with self._cond:
+            self._pending += 1
+        self._validate(item)
+
+    def _validate(self, item: _RepairItem):
+        future = self.validator_pool.submit(self.target_lang, item.code)
+        future.add_done_callback(lambda f: self._on_validated(item, f))
+
+    def _on_validated(self, item: _RepairItem, future: Future):
+        try:
+            validation = self.validator_pool.result(future)
+            if validation.valid or item.rounds >= self.max_rounds or self._cancelled:
+                self._finish(item, validation)
+                return
+            logger.info('第%d轮修复 %s: %s', item.rounds + 1, item.key, validation.message, extra=SAMPLED)
+            self._executor.submit(self._repair, item, validation)
+        except Exception as e:
+            self._fail(e)
+
+    def _repair(self, item: _RepairItem, validation: ValidationResult):
+        try:
+            item.rounds += 1
+            try:
+                with inflight_slot():
+                    repaired = self.converter.repair(self.source_lang, self.target_lang,
+                                                     item.original_code, item.code, validation.message)
+            except Exception as e:
+                # 修复请求失败时保留原结果，不影响整个项目
+                logger.warning(f'修复 {item.key} 失败: {str(e)}')
+                self._finish(item, validation)
+                return
+            if not repaired.strip():
+                self._finish(item, validation)
+                return
+            item.code = repaired
+            self._validate(item)
+        except Exception as e:
+            self._fail(e)
+
+    def _finish(self, item: _RepairItem, validation: ValidationResult):
+        outcome = RepairOutcome(item.key, item.code, validation, item.rounds)
+        try:
+            if item.on_done is not None:
+                item.on_done(outcome)
+        except Exception as e:
+            self._fail(e)
+            return
+        with self._cond:
+            self.outcomes[item.key] = outcome
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def _fail(self, error: BaseException):
+        with self._cond:
+            self.errors.append(error)
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def cancel(self):
+        """不再发起新的修复，正在进行的验证结束后直接作为最终结果"""
+        self._cancelled = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有已提交的文件得到最终结果
+
+        Args:
+            timeout: 最长等待秒数，为None时一直等待
+
+        Returns:
+            是否全部完成
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self):
+        """关闭修复线程池"""
+        self._cancelled = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> Dict:
+        """
+        验证与修复统计
+
+        Returns:
+            检查文件数、修复过的文件数、修复请求数以及最终仍未通过的文件及错误
+        """
+        invalid = {key: outcome.validation.errors for key, outcome in self.outcomes.items() if not outcome.valid}
+        return {
+            'checked': len(self.outcomes),
+            'repaired': sum(1 for outcome in self.outcomes.values() if outcome.rounds and outcome.valid),
+            'repair_calls': sum(outcome.rounds for outcome in self.outcomes.values()),
+            'invalid': len(invalid),
+            'errors': invalid
+        }
@@ -0,0 +1,723 @@
+import difflib
+import hashlib
+import keyword
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from config.app_config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# MinHash签名长度（单次哈希分桶，每个文件只需对每个记号片段计算一次哈希）
+NUM_BINS = 64
+# LSH分段：16段、每段4个值，相似度约0.5以上的文件大概率落入同一个桶，再按签名核对
+LSH_BANDS = 16
+LSH_ROWS = NUM_BINS // LSH_BANDS
+# 记号片段长度
+SHINGLE_SIZE = 5
+# 相似文件库删除过期条目的最短间隔（秒）
+_PURGE_INTERVAL = 3600
+# 差异中改动的行超过原代码长度的该比例时不使用差异提示
+_MAX_DELTA_RATIO = 0.5
+_EMPTY_BIN = (1 << 58) - 1
+
+_KEYWORDS = {
+    'python': set(keyword.kwlist) | {'self', 'cls'},
+    'c': {'auto', 'break', 'case', 'char', 'const', 'continue', 'default', 'do', 'double', 'else', 'enum',
+          'extern', 'float', 'for', 'goto', 'if', 'inline', 'int', 'long', 'register', 'restrict', 'return',
+          'short', 'signed', 'sizeof', 'static', 'struct', 'switch', 'typedef', 'union', 'unsigned', 'void',
+          'volatile', 'while', 'include', 'define', 'ifdef', 'ifndef', 'endif', 'NULL'},
+    'java': {'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch', 'char', 'class', 'const',
+             'continue', 'default', 'do', 'double', 'else', 'enum', 'extends', 'final', 'finally', 'float', 'for',
+             'if', 'implements', 'import', 'instanceof', 'int', 'interface', 'long', 'native', 'new', 'package',
+             'private', 'protected', 'public', 'return', 'short', 'static', 'super', 'switch', 'synchronized',
+             'this', 'throw', 'throws', 'try', 'void', 'volatile', 'while', 'null', 'true', 'false', 'var'},
+    'js': {'async', 'await', 'break', 'case', 'catch', 'class', 'const', 'continue', 'debugger', 'default',
+           'delete', 'do', 'else', 'export', 'extends', 'finally', 'for', 'from', 'function', 'if', 'import',
+           'in', 'instanceof', 'let', 'new', 'null', 'of', 'return', 'static', 'super', 'switch', 'this',
+           'throw', 'try', 'typeof', 'undefined', 'var', 'void', 'while', 'yield', 'true', 'false'},
+}
+
+_STRING = r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\''
+_PATTERNS = {
+    'python': (r'#[^\n]*',
+               r'[rRbBuUfF]{0,2}(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|' + _STRING + ')'),
+    'js': (r'//[^\n]*|/\*[\s\S]*?\*/', r'`(?:[^`\\]|\\.)*`|' + _STRING),
+}
+_C_LIKE = (r'//[^\n]*|/\*[\s\S]*?\*/', _STRING)
+_NUMBER = r'(?:0[xX][0-9a-fA-F]+|\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+)[uUlLfFdDjJn]*'
+_IDENT = r'[A-Za-z_$][A-Za-z0-9_$]*'
+_TOKEN_REGEXES = {}
+
+
+def _token_regex(lang: str):
+    regex = _TOKEN_REGEXES.get(lang)
+    if regex is None:
+        comment, string = _PATTERNS.get(lang, _C_LIKE)
+        regex = re.compile(f'(?P<comment>{comment})|(?P<str>{string})|(?P<num>{_NUMBER})|(?P<id>{_IDENT})|(?P<op>\\S)')
+        _TOKEN_REGEXES[lang] = regex
+    return regex
+
+
+class Token(NamedTuple):
+    """词法记号"""
+    # comment、str、num、id、kw 或 op
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+def tokenize(code: str, lang: str) -> List[Token]:
+    """
+    按语言切分词法记号，不做完整的语法分析，只区分注释、字符串、数字、标识符、关键字和符号
+
+    Args:
+        code: 代码
+        lang: 语言
+
+    Returns:
+        记号列表（含注释）
+    """
+    keywords = _KEYWORDS.get(lang, set())
+    tokens = []
+    for match in _token_regex(lang).finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'id' and text in keywords:
+            kind = 'kw'
+        tokens.append(Token(kind, text, match.start(), match.end()))
+    return tokens
+
+
+def normalize(tokens: Iterable[Token]) -> List[str]:
+    """
+    归一化记号流：去掉注释，标识符和字面量替换为占位符，只保留代码结构
+
+    Args:
+        tokens: 记号列表
+
+    Returns:
+        归一化后的记号文本列表
+    """
+    placeholders = {'id': 'ID', 'str': 'STR', 'num': 'NUM'}
+    return [placeholders.get(token.kind, token.text) for token in tokens if token.kind != 'comment']
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def shape_hash(normalized: List[str]) -> str:
+    """
+    归一化记号流的哈希，相同表示两个文件只有名称或字面量不同
+
+    Args:
+        normalized: 归一化后的记号文本列表
+
+    Returns:
+        十六进制摘要
+    """
+    return hashlib.sha256('\x1f'.join(normalized).encode('utf-8')).hexdigest()
+
+
+def minhash(normalized: List[str]) -> Tuple[int, ...]:
+    """
+    计算归一化记号流的MinHash签名：每个记号片段只哈希一次，按低位分桶取各桶最小值，
+    空桶从右侧最近的非空桶借值
+
+    Args:
+        normalized: 归一化后的记号文本列表
+
+    Returns:
+        NUM_BINS 个整数组成的签名
+    """
+    signature = [_EMPTY_BIN] * NUM_BINS
+    shingles = {'\x1f'.join(normalized[i:i + SHINGLE_SIZE])
+                for i in range(max(len(normalized) - SHINGLE_SIZE + 1, 1))}
+    for shingle in shingles:
+        value = _hash64(shingle.encode('utf-8'))
+        index = value % NUM_BINS
+        value >>= 6
+        if value < signature[index]:
+            signature[index] = value
+    if all(value == _EMPTY_BIN for value in signature):
+        return tuple(signature)
+    for index in range(NUM_BINS):
+        offset = 1
+        while signature[index] == _EMPTY_BIN:
+            borrowed = signature[(index + offset) % NUM_BINS]
+            if borrowed != _EMPTY_BIN:
+                # 借来的值加上距离，避免不同的空桶总是与同一个桶相等
+                signature[index] = (borrowed + offset * 0x9E3779B97F4A7C15) % _EMPTY_BIN
+            offset += 1
+    return tuple(signature)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """
+    按签名估算两个文件记号片段集合的Jaccard相似度
+
+    Args:
+        a: 签名
+        b: 签名
+
+    Returns:
+        0到1之间的相似度
+    """
+    return sum(x == y for x, y in zip(a, b)) / NUM_BINS
+
+
+def band_keys(signature: Tuple[int, ...]) -> List[str]:
+    """
+    签名的LSH分段键
+
+    Args:
+        signature: 签名
+
+    Returns:
+        LSH_BANDS 个分段键
+    """
+    keys = []
+    for band in range(LSH_BANDS):
+        values = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        keys.append(f'{band}:{_hash64(struct.pack(f"<{LSH_ROWS}Q", *values)):016x}')
+    return keys
+
+
+def _identifiers(tokens: Iterable[Token]) -> set:
+    # 关键字也计入，避免把名称改成目标语言的关键字
+    return {token.text for token in tokens if token.kind in ('id', 'kw')}
+
+
+def _comment_renamer(id_changes: Dict[str, str]) -> Callable[[str], str]:
+    if not id_changes:
+        return lambda text: text
+    regex = re.compile(r'\b(' + '|'.join(re.escape(old) for old in
+                                         sorted(id_changes, key=len, reverse=True)) + r')\b')
+    return lambda text: regex.sub(lambda match: id_changes[match.group(1)], text)
+
+
+def _rewrite(text: str, tokens: List[Token], id_changes: Dict[str, str]) -> str:
+    rename_comment = _comment_renamer(id_changes)
+    parts = []
+    position = 0
+    for token in tokens:
+        if token.kind == 'id' and token.text in id_changes:
+            replacement = id_changes[token.text]
+        elif token.kind == 'comment':
+            replacement = rename_comment(token.text)
+        else:
+            continue
+        parts.append(text[position:token.start])
+        parts.append(replacement)
+        position = token.end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def substitute_clone(reference_source: str, reference_output: str, code: str,
+                     source_lang: str, target_lang: str) -> Optional[str]:
+    """
+    结构相同、只有标识符名称不同的文件，将参考文件转换结果中对应的名称替换为本文件的，得到转换结果。
+    字符串或数字字面量不同时不替换：转换结果中同样的字面量可能是模型自行添加的，与源代码没有对应关系
+
+    Args:
+        reference_source: 参考文件的源代码
+        reference_output: 参考文件的转换结果
+        code: 本文件的源代码
+        source_lang: 源代码语言
+        target_lang: 目标代码语言
+
+    Returns:
+        转换结果；两者结构或字面量不同、名称对应关系不一致、注释在改名后仍不同，
+        或改动的名称在转换结果中找不到时返回None
+    """
+    old_all = tokenize(reference_source, source_lang)
+    new_all = tokenize(code, source_lang)
+    old_tokens = [token for token in old_all if token.kind != 'comment']
+    new_tokens = [token for token in new_all if token.kind != 'comment']
+    if len(old_tokens) != len(new_tokens):
+        return None
+
+    # 参考文件中的标识符到本文件的一一对应关系
+    mapping: Dict[str, str] = {}
+    reverse: Dict[str, str] = {}
+    for old, new in zip(old_tokens, new_tokens):
+        if old.kind != new.kind:
+            return None
+        if old.kind != 'id':
+            if old.text != new.text:
+                return None
+            continue
+        if mapping.setdefault(old.text, new.text) != new.text:
+            return None
+        if reverse.setdefault(new.text, old.text) != old.text:
+            return None
+    id_changes = {old: new for old, new in mapping.items() if old != new}
+
+    # 注释（版权声明、文档等）在改名后必须与本文件的一致，否则转换结果会带上参考文件的注释
+    rename_comment = _comment_renamer(id_changes)
+    old_comments = [rename_comment(token.text) for token in old_all if token.kind == 'comment']
+    if old_comments != [token.text for token in new_all if token.kind == 'comment']:
+        return None
+    if not id_changes:
+        return reference_output
+
+    output_tokens = tokenize(reference_output, target_lang)
+    present = _identifiers(output_tokens)
+    for old, new in id_changes.items():
+        # 改动的名称在转换结果中找不到（如被改写为目标语言的命名风格），无法可靠替换
+        if old not in present:
+            return None
+        # 新名称与转换结果中其他未改动的名称冲突
+        if new in present and new not in id_changes:
+            return None
+    return _rewrite(reference_output, output_tokens, id_changes)
+
+
+def align_reference(reference_source: str, reference_output: str, code: str,
+                    source_lang: str, target_lang: str) -> Tuple[str, str]:
+    """
+    结构相似的文件，按记号对齐找出参考文件与本文件对应位置上改名的标识符，
+    在参考文件的源代码和转换结果中改为本文件的名称，使两者的差异只剩结构、字面量和注释上的改动。
+    对应关系不一致、或改名会与已有名称冲突的名称保持不变；字面量不参与改名，其差异留在diff中
+
+    Args:
+        reference_source: 参考文件的源代码
+        reference_output: 参考文件的转换结果
+        code: 本文件的源代码
+        source_lang: 源代码语言
+        target_lang: 目标代码语言
+
+    Returns:
+        改名后的参考文件源代码和转换结果
+    """
+    old_tokens = [token for token in tokenize(reference_source, source_lang) if token.kind != 'comment']
+    new_tokens = [token for token in tokenize(code, source_lang) if token.kind != 'comment']
+    matcher = difflib.SequenceMatcher(None, normalize(old_tokens), normalize(new_tokens), autojunk=False)
+
+    mapping: Dict[str, str] = {}
+    conflicts = set()
+    for old_start, new_start, size in matcher.get_matching_blocks():
+        for old, new in zip(old_tokens[old_start:old_start + size], new_tokens[new_start:new_start + size]):
+            if old.kind == 'id' and mapping.setdefault(old.text, new.text) != new.text:
+                conflicts.add(old.text)
+    id_changes = {old: new for old, new in mapping.items() if old != new and old not in conflicts}
+    # 多个名称改为同一个名称时都不改
+    targets = list(id_changes.values())
+    id_changes = {old: new for old, new in id_changes.items() if targets.count(new) == 1}
+    if not id_changes:
+        return reference_source, reference_output
+
+    renamed = []
+    for text, lang in ((reference_source, source_lang), (reference_output, target_lang)):
+        tokens = tokenize(text, lang)
+        present = _identifiers(tokens)
+        # 新名称与未改动的名称冲突时不改，避免把两个不同的名称合并
+        text_changes = {old: new for old, new in id_changes.items()
+                        if not (new in present and new not in id_changes)}
+        renamed.append(_rewrite(text, tokens, text_changes))
+    return renamed[0], renamed[1]
+
+
+def source_diff(reference_source: str, code: str) -> str:
+    """
+    参考文件与本文件源代码的 unified diff
+
+    Args:
+        reference_source: 参考文件的源代码
+        code: 本文件的源代码
+
+    Returns:
+        差异文本
+    """
+    return ''.join(difflib.unified_diff(reference_source.splitlines(True), code.splitlines(True),
+                                        'reference', 'source', n=2))
+
+
+class Fingerprint(NamedTuple):
+    """文件的相似度特征"""
+    shape: str
+    signature: Tuple[int, ...]
+    tokens: int
+
+
+def fingerprint_code(code: str, lang: str) -> Fingerprint:
+    """
+    计算代码的相似度特征
+
+    Args:
+        code: 源代码
+        lang: 语言
+
+    Returns:
+        相似度特征
+    """
+    normalized = normalize(tokenize(code, lang))
+    return Fingerprint(shape_hash(normalized), minhash(normalized), len(normalized))
+
+
+class Reference(NamedTuple):
+    """可供参照的已转换文件"""
+    source: str
+    output: str
+    # 与本文件结构完全相同（只有名称或字面量不同），能否直接替换名称由 substitute_clone 判断
+    exact: bool
+    similarity: float
+    # 来自跨任务的相似文件库
+    stored: bool = False
+
+
+class SimilarityStore:
+    """基于SQLite的跨任务相似文件库，按范围（项目、语言对、模型和提示模板）保存已通过检查的转换结果"""
+
+    def __init__(self, path: str, ttl: Optional[int] = None):
+        """
+        初始化相似文件库
+
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 条目保留时间（秒），默认读取 AppConfig.SIMILARITY_TTL，为0时不过期
+        """
+        self.path = path
+        self.ttl = AppConfig.SIMILARITY_TTL if ttl is None else ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS similarity_files ('
+                'id INTEGER PRIMARY KEY, scope TEXT NOT NULL, shape TEXT NOT NULL, signature BLOB NOT NULL, '
+                'source TEXT NOT NULL, output TEXT NOT NULL, updated_at REAL NOT NULL, UNIQUE (scope, shape))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS similarity_bands ('
+                'scope TEXT NOT NULL, band TEXT NOT NULL, file_id INTEGER NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS similarity_bands_lookup ON similarity_bands (scope, band)')
+        self._last_purge = 0.0
+        self.purge_expired()
+
+    def find(self, scope: str, fingerprint: Fingerprint, threshold: float) -> Optional[Reference]:
+        """
+        查找结构相同或最相似的已转换文件
+
+        Args:
+            scope: 范围键
+            fingerprint: 本文件的相似度特征
+            threshold: 相似度下限
+
+        Returns:
+            参照文件，没有达到下限的文件时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT source, output FROM similarity_files WHERE scope = ? AND shape = ?',
+                (scope, fingerprint.shape)
+            ).fetchone()
+            if row is not None:
+                return Reference(row[0], row[1], True, 1.0, True)
+            keys = band_keys(fingerprint.signature)
+            candidates = self._conn.execute(
+                f'SELECT f.id, f.signature FROM similarity_files f WHERE f.id IN ('
+                f'SELECT file_id FROM similarity_bands WHERE scope = ? AND band IN ({",".join("?" * len(keys))}))',
+                [scope] + keys
+            ).fetchall()
+            best_id, best = None, threshold
+            for file_id, blob in candidates:
+                score = similarity(fingerprint.signature, struct.unpack(f'<{NUM_BINS}Q', blob))
+                if score >= best:
+                    best_id, best = file_id, score
+            if best_id is None:
+                return None
+            row = self._conn.execute('SELECT source, output FROM similarity_files WHERE id = ?',
+                                     (best_id,)).fetchone()
+        return Reference(row[0], row[1], False, best, True) if row else None
+
+    def add(self, scope: str, fingerprint: Fingerprint, source: str, output: str):
+        """
+        保存已通过检查的转换结果，同一范围内结构相同的文件只保留最新的一份；
+        距上次清理超过 _PURGE_INTERVAL 时顺便删除过期条目
+
+        Args:
+            scope: 范围键
+            fingerprint: 源代码的相似度特征
+            source: 源代码
+            output: 转换结果
+        """
+        blob = struct.pack(f'<{NUM_BINS}Q', *fingerprint.signature)
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT id FROM similarity_files WHERE scope = ? AND shape = ?',
+                                     (scope, fingerprint.shape)).fetchone()
+            if row is not None:
+                self._conn.execute('DELETE FROM similarity_bands WHERE file_id = ?', (row[0],))
+                self._conn.execute('DELETE FROM similarity_files WHERE id = ?', (row[0],))
+            file_id = self._conn.execute(
+                'INSERT INTO similarity_files (scope, shape, signature, source, output, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (scope, fingerprint.shape, blob, source, output, time.time())
+            ).lastrowid
+            self._conn.executemany('INSERT INTO similarity_bands (scope, band, file_id) VALUES (?, ?, ?)',
+                                   [(scope, key, file_id) for key in band_keys(fingerprint.signature)])
+        if time.time() - self._last_purge >= _PURGE_INTERVAL:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """
+        删除过期条目
+
+        Returns:
+            删除的条目数
+        """
+        if self.ttl <= 0:
+            return 0
+        with self._lock, self._conn:
+            self._last_purge = time.time()
+            deleted = self._conn.execute('DELETE FROM similarity_files WHERE updated_at < ?',
+                                         (self._last_purge - self.ttl,)).rowcount
+            if deleted:
+                self._conn.execute('DELETE FROM similarity_bands WHERE file_id NOT IN (SELECT id FROM similarity_files)')
+        return deleted
+
+
+class SimilarityMethod:
+    """文件转换结果的来源"""
+    CONVERTED = 'converted'
+    # 由结构相同、只有标识符名称不同的文件的结果替换名称得到，不调用API
+    CLONE = 'clone'
+    # 只发送参考文件的转换结果和源代码差异
+    DELTA = 'delta'
+
+
+class SimilarityReuser:
+    """项目转换中的相似文件复用
+
+    plan 按转换顺序为项目内结构相同或相似的文件分组，每组第一个文件作为代表正常转换，
+    其余文件在代表之后转换：只有标识符名称不同的由代表的结果替换名称得到，其他相似的只发送代表的转换结果和差异。
+    项目内没有结构相同的代表文件时，在同一项目之前任务的相似文件库中查找参照。
+    """
+
+    def __init__(self, converter, source_lang: str, target_lang: str, store: Optional[SimilarityStore] = None,
+                 project_key: str = '', threshold: Optional[float] = None, min_tokens: Optional[int] = None):
+        """
+        初始化相似文件复用
+
+        Args:
+            converter: 源语言对应的转换器
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            store: 跨任务的相似文件库，为None时只在本次任务内复用
+            project_key: 项目键，库中的条目只在同一项目内复用，不同项目的代码和转换结果互不可见
+            threshold: 相似度下限，默认读取 AppConfig.SIMILARITY_THRESHOLD
+            min_tokens: 参与比较的文件最少记号数，默认读取 AppConfig.SIMILARITY_MIN_TOKENS
+        """
+        self.converter = converter
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.store = store
+        self.threshold = AppConfig.SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.min_tokens = AppConfig.SIMILARITY_MIN_TOKENS if min_tokens is None else min_tokens
+        # 范围键：项目、语言对、模型或提示模板变化时不复用之前的结果
+        self.scope = hashlib.sha256(
+            f"{converter.fingerprint(source_lang, target_lang, '')}\0{project_key}".encode('utf-8')).hexdigest()
+        self._fingerprints: Dict[str, Fingerprint] = {}
+        # 分组成员到代表文件的映射，以及代表文件转换后保留的源代码和结果
+        self._representative: Dict[str, str] = {}
+        self._leaders: set = set()
+        self._references: Dict[str, Tuple[str, str]] = {}
+        self._methods: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'clusters': 0, 'clones': 0, 'deltas': 0, 'cross_job': 0}
+
+    def plan(self, waves: List[List[str]], read_text: Callable[[str], str]):
+        """
+        按转换顺序为文件分组；逐个读取文件，只保留相似度特征
+
+        Args:
+            waves: 依赖分层后的文件列表
+            read_text: 读取文件内容的函数
+        """
+        shapes: Dict[str, str] = {}
+        buckets: Dict[str, List[str]] = {}
+        for wave in waves:
+            for path in wave:
+                fingerprint = fingerprint_code(read_text(path), self.source_lang)
+                if fingerprint.tokens < self.min_tokens:
+                    continue
+                self._fingerprints[path] = fingerprint
+                representative = shapes.get(fingerprint.shape)
+                if representative is None:
+                    candidates = {candidate for key in band_keys(fingerprint.signature)
+                                  for candidate in buckets.get(key, ())}
+                    best = self.threshold
+                    for candidate in sorted(candidates):
+                        score = similarity(fingerprint.signature, self._fingerprints[candidate].signature)
+                        if score >= best:
+                            representative, best = candidate, score
+                if representative is not None:
+                    self._representative[path] = representative
+                    continue
+                shapes[fingerprint.shape] = path
+                for key in band_keys(fingerprint.signature):
+                    buckets.setdefault(key, []).append(path)
+        self._leaders = set(self._representative.values())
+        self.stats['clusters'] = len(self._leaders)
+
+    def split_wave(self, wave: List[str]) -> List[List[str]]:
+        """
+        将一层文件分为代表文件（及不属于分组的文件）和分组成员两批，成员在代表转换之后转换
+
+        Args:
+            wave: 同一层的文件
+
+        Returns:
+            非空的批次列表
+        """
+        followers = [path for path in wave if path in self._representative]
+        leaders = [path for path in wave if path not in self._representative]
+        return [batch for batch in (leaders, followers) if batch]
+
+    def method(self, path: str) -> Optional[str]:
+        """
+        文件转换结果的来源
+
+        Args:
+            path: 文件相对路径
+
+        Returns:
+            SimilarityMethod 中的值，文件未经本对象转换时返回None
+        """
+        with self._lock:
+            return self._methods.get(path)
+
+    def convert(self, path: str, code: str, dependencies: str = '') -> str:
+        """
+        转换文件，有可参照的相似文件时复用其结果
+
+        Args:
+            path: 文件相对路径
+            code: 源代码
+            dependencies: 依赖符号摘要
+
+        Returns:
+            转换结果
+        """
+        reference = self._find_reference(path)
+        output, method = None, SimilarityMethod.CONVERTED
+        if reference is not None:
+            output, method = self._derive(code, reference, dependencies)
+        if output is None:
+            output = self.converter.convert(self.source_lang, self.target_lang, code, dependencies)
+            method = SimilarityMethod.CONVERTED
+        with self._lock:
+            self._methods[path] = method
+            if method == SimilarityMethod.CLONE:
+                self.stats['clones'] += 1
+            elif method == SimilarityMethod.DELTA:
+                self.stats['deltas'] += 1
+            if method != SimilarityMethod.CONVERTED and reference.stored:
+                self.stats['cross_job'] += 1
+            if path in self._leaders:
+                # 代表文件的结果供同组成员参照
+                self._references[path] = (code, output)
+        return output
+
+    def remember(self, path: str, code: str, output: str):
+        """
+        记录通过检查的最终结果：更新供同组成员参照的结果，调用API转换的结果存入跨任务的相似文件库
+
+        Args:
+            path: 文件相对路径
+            code: 源代码
+            output: 最终结果
+        """
+        fingerprint = self._fingerprints.get(path)
+        if fingerprint is None:
+            return
+        with self._lock:
+            if path in self._references:
+                self._references[path] = (code, output)
+            method = self._methods.get(path)
+        if self.store is not None and method == SimilarityMethod.CONVERTED:
+            try:
+                self.store.add(self.scope, fingerprint, code, output)
+            except sqlite3.Error as e:
+                logger.warning(f'保存相似文件失败: {str(e)}')
+
+    def _find_reference(self, path: str) -> Optional[Reference]:
+        fingerprint = self._fingerprints.get(path)
+        if fingerprint is None:
+            return None
+        local = None
+        representative = self._representative.get(path)
+        if representative is not None:
+            with self._lock:
+                stored = self._references.get(representative)
+            # 代表文件转换失败时按独立文件处理
+            if stored is not None:
+                exact = self._fingerprints[representative].shape == fingerprint.shape
+                score = similarity(fingerprint.signature, self._fingerprints[representative].signature)
+                local = Reference(stored[0], stored[1], exact, score)
+                if exact:
+                    return local
+        if self.store is None:
+            return local
+        try:
+            found = self.store.find(self.scope, fingerprint, self.threshold)
+        except sqlite3.Error as e:
+            logger.warning(f'查询相似文件失败: {str(e)}')
+            return local
+        # 项目内只有相似的代表文件时，优先使用库中结构相同或更相似的文件
+        if found is not None and (local is None or found.exact or found.similarity > local.similarity):
+            return found
+        return local
+
+    def _derive(self, code: str, reference: Reference, dependencies: str) -> Tuple[Optional[str], str]:
+        if reference.exact:
+            output = substitute_clone(reference.source, reference.output, code, self.source_lang, self.target_lang)
+            if output is not None:
+                return output, SimilarityMethod.CLONE
+        # 差异提示依赖参考文件的完整结果，大文件仍按分块转换处理
+        if len(code) > AppConfig.CHUNK_THRESHOLD_CHARS or len(reference.output) > AppConfig.CHUNK_THRESHOLD_CHARS:
+            return None, SimilarityMethod.CONVERTED
+        # 先把参考文件中改名的标识符改为本文件的名称，差异只剩结构上的改动
+        reference_source, reference_output = align_reference(reference.source, reference.output, code,
+                                                              self.source_lang, self.target_lang)
+        diff = source_diff(reference_source, code)
+        # 只统计改动的行，不计入文件头和上下文行
+        changed = sum(len(line) for line in diff.splitlines()[2:] if line[:1] in '+-')
+        if not diff or changed > len(code) * _MAX_DELTA_RATIO:
+            return None, SimilarityMethod.CONVERTED
+        output = self.converter.convert_delta(self.source_lang, self.target_lang, code, reference_output,
+                                              diff, dependencies)
+        return output, SimilarityMethod.DELTA
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_similarity_store() -> Optional[SimilarityStore]:
+    """
+    获取按 AppConfig 配置创建的全局相似文件库
+
+    Returns:
+        全局相似文件库，未配置 SIMILARITY_DB_PATH 时返回None
+    """
+    global _default_store
+    if not AppConfig.SIMILARITY_DB_PATH:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SimilarityStore(AppConfig.SIMILARITY_DB_PATH)
+        return _default_store
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, List, Optional
+
+from src.utils.inflight import inflight_slot
+from config.app_config import AppConfig
+
+
+class TaskResult:
+    """单个转换任务的结果"""
+
+    def __init__(self, item: Any, result: Any = None, error: Optional[BaseException] = None):
+        """
+        初始化任务结果
+
+        Args:
+            item: 任务输入
+            result: 任务返回值
+            error: 任务失败时的异常
+        """
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """任务是否成功"""
+        return self.error is None
+
+
+class ConversionPool:
+    """项目文件并发转换池"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        初始化转换池
+
+        Args:
+            max_workers: 最大并发线程数，默认读取 AppConfig.CONVERT_WORKERS
+        """
+        self.max_workers = max(1, max_workers or AppConfig.CONVERT_WORKERS)
+
+    def run(self,
+            items: Iterable[Any],
+            func: Callable[[Any], Any],
+            on_start: Optional[Callable[[Any], None]] = None,
+            on_finish: Optional[Callable[[TaskResult], None]] = None,
+            fail_fast: bool = True,
+            should_stop: Optional[Callable[[], bool]] = None) -> List[TaskResult]:
+        """
+        并发执行转换任务
+
+        Args:
+            items: 任务输入列表
+            func: 对单个输入执行的转换函数
+            on_start: 任务真正开始执行（拿到在途名额）时的回调
+            on_finish: 任务结束时的回调，在完成顺序上调用
+            fail_fast: 出现失败时是否取消尚未开始的任务
+            should_stop: 返回True时不再启动新的任务
+
+        Returns:
+            已执行任务的结果列表，顺序与输入一致
+        """
+        items = list(items)
+        stop_event = threading.Event()
+
+        def worker(item):
+            if stop_event.is_set() or (should_stop and should_stop()):
+                stop_event.set()
+                return None
+            with inflight_slot():
+                if stop_event.is_set():
+                    return None
+                if on_start:
+                    on_start(item)
+                try:
+                    return TaskResult(item, result=func(item))
+                except Exception as e:
+                    return TaskResult(item, error=e)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='convert') as executor:
+            futures = {executor.submit(worker, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                # 失败后被取消的任务同样会出现在 as_completed 中
+                if future.cancelled():
+                    continue
+                task_result = future.result()
+                if task_result is None:
+                    continue
+                results[futures[future]] = task_result
+                if on_finish:
+                    on_finish(task_result)
+                if not task_result.ok and fail_fast:
+                    stop_event.set()
+                    for pending in futures:
+                        pending.cancel()
+
+        return [results[index] for index in sorted(results)]
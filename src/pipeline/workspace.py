@@ -0,0 +1,311 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from config.app_config import AppConfig
+from src.utils.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# 项目转换工作目录的名称前缀，同时用于识别上次运行遗留的目录
+WORKSPACE_PREFIX = 'project_convert_'
+
+_REAPED = get_metrics_registry().counter('workspaces_reaped_total', '被清理的工作目录数', ['reason'])
+
+
+class Workspace:
+    """一个项目转换任务的工作目录"""
+
+    def __init__(self, workspace_id: str, path: str, created_at: float, orphan: bool = False):
+        """
+        初始化工作目录记录
+
+        Args:
+            workspace_id: 工作目录ID（即目录名，同时作为任务ID）
+            path: 目录路径
+            created_at: 创建时间
+            orphan: 是否为上次运行遗留、不属于当前进程任务的目录
+        """
+        self.id = workspace_id
+        self.path = path
+        self.created_at = created_at
+        self.last_used = created_at
+        self.orphan = orphan
+        # 上传文件保存完、任务提交之前由创建者持有，不会被清理
+        self.held = False
+        # 最近一次清理检查时统计的占用字节数
+        self.size = 0
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class WorkspaceManager:
+    """项目转换工作目录的生命周期管理
+
+    后台线程定期清理超过 ttl 未使用的目录，占用总量超过 max_bytes 时按最近使用时间从旧到新淘汰；
+    仍在排队或运行的任务（in_use 返回True）的目录不会被清理。目录被清理后调用 on_remove，
+    由调用方一并删除任务和进度记录。
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 interval: Optional[float] = None, in_use: Optional[Callable[[str], bool]] = None,
+                 on_remove: Optional[Callable[[str], None]] = None):
+        """
+        初始化工作目录管理器
+
+        Args:
+            root: 工作目录所在的目录，默认读取 AppConfig.WORKSPACE_ROOT，为空时使用系统临时目录
+            ttl: 未使用的目录保留时间（秒），默认读取 AppConfig.WORKSPACE_TTL，为0时不按时间清理
+            max_bytes: 所有工作目录的占用总量上限，默认读取 AppConfig.WORKSPACE_MAX_BYTES，为0时不限制
+            interval: 后台清理的检查间隔（秒），默认读取 AppConfig.WORKSPACE_REAP_INTERVAL
+            in_use: 判断工作目录是否仍被任务使用的函数
+            on_remove: 工作目录被清理后调用的函数，参数为工作目录ID
+        """
+        self.root = root or AppConfig.WORKSPACE_ROOT or tempfile.gettempdir()
+        self.ttl = AppConfig.WORKSPACE_TTL if ttl is None else ttl
+        self.max_bytes = AppConfig.WORKSPACE_MAX_BYTES if max_bytes is None else max_bytes
+        self.interval = AppConfig.WORKSPACE_REAP_INTERVAL if interval is None else interval
+        self.in_use = in_use or (lambda workspace_id: False)
+        self.on_remove = on_remove
+        self._workspaces: Dict[str, Workspace] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        os.makedirs(self.root, exist_ok=True)
+        get_metrics_registry().add_collector(self._collect_metrics)
+
+    def create(self) -> Workspace:
+        """
+        新建工作目录，新目录处于持有状态，任务提交后调用 release
+
+        Returns:
+            工作目录
+        """
+        path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+        workspace = Workspace(os.path.basename(path), path, time.time())
+        workspace.held = True
+        with self._lock:
+            self._workspaces[workspace.id] = workspace
+        return workspace
+
+    def release(self, workspace_id: str):
+        """
+        结束对新建目录的持有，之后由 in_use 判断目录是否仍在使用，并检查磁盘占用
+
+        Args:
+            workspace_id: 工作目录ID
+        """
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is not None:
+                workspace.held = False
+                workspace.last_used = time.time()
+        self._wakeup.set()
+
+    def get(self, workspace_id: str) -> Optional[Workspace]:
+        """
+        查找工作目录
+
+        Args:
+            workspace_id: 工作目录ID
+
+        Returns:
+            工作目录，不存在时返回None
+        """
+        with self._lock:
+            return self._workspaces.get(workspace_id)
+
+    def hold(self, workspace_id: str) -> bool:
+        """
+        重新持有已有的工作目录（如续转提交任务期间），持有期间不会被清理，之后调用 release
+
+        Args:
+            workspace_id: 工作目录ID
+
+        Returns:
+            工作目录是否仍然存在，不存在时没有持有任何目录
+        """
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is None:
+                return False
+            workspace.held = True
+            return True
+
+    def touch(self, workspace_id: str):
+        """
+        记录工作目录被使用（如下载结果、续转），重新开始计算保留时间
+
+        Args:
+            workspace_id: 工作目录ID
+        """
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is not None:
+                workspace.last_used = time.time()
+
+    def remove(self, workspace_id: str, reason: str = 'removed', idle_since: Optional[float] = None) -> bool:
+        """
+        删除工作目录及其记录
+
+        Args:
+            workspace_id: 工作目录ID
+            reason: 删除原因，记入指标
+            idle_since: 清理线程检查时记录的最近使用时间；传入时在锁内重新确认目录未被持有、
+                任务已结束且检查之后没有被使用，否则不删除
+
+        Returns:
+            工作目录是否被删除
+        """
+        with self._lock:
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is None:
+                return False
+            if idle_since is not None and not self._still_idle(workspace, idle_since):
+                return False
+            del self._workspaces[workspace_id]
+        shutil.rmtree(workspace.path, ignore_errors=True)
+        _REAPED.inc(reason=reason)
+        logger.info(f'已清理工作目录 {workspace.id}', extra={'reason': reason, 'bytes': workspace.size})
+        if self.on_remove is not None and not workspace.orphan:
+            try:
+                self.on_remove(workspace.id)
+            except Exception as e:
+                logger.error(f'清理工作目录 {workspace.id} 的任务记录失败: {str(e)}')
+        return True
+
+    def _still_idle(self, workspace: Workspace, idle_since: float) -> bool:
+        """调用方持有 _lock；检查之后目录被持有、被使用或任务重新开始时返回False"""
+        if workspace.held or workspace.last_used != idle_since:
+            return False
+        return workspace.orphan or not self.in_use(workspace.id)
+
+    def usage(self) -> int:
+        """
+        最近一次检查时所有工作目录的占用字节数
+
+        Returns:
+            字节数
+        """
+        with self._lock:
+            return sum(workspace.size for workspace in self._workspaces.values())
+
+    def adopt_orphans(self) -> int:
+        """
+        登记上次运行遗留的工作目录，按目录的修改时间计算保留时间，过期后删除
+
+        Returns:
+            登记的目录数
+        """
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        adopted = 0
+        for name in names:
+            path = os.path.join(self.root, name)
+            if not name.startswith(WORKSPACE_PREFIX) or not os.path.isdir(path):
+                continue
+            with self._lock:
+                if name in self._workspaces:
+                    continue
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    continue
+                self._workspaces[name] = Workspace(name, path, mtime, orphan=True)
+            adopted += 1
+        if adopted:
+            logger.info(f'发现 {adopted} 个遗留的工作目录')
+        return adopted
+
+    def reap(self) -> List[str]:
+        """
+        执行一次清理：删除过期的目录，占用超出上限时淘汰最久未使用的目录
+
+        Returns:
+            被删除的工作目录ID列表
+        """
+        now = time.time()
+        with self._lock:
+            workspaces = list(self._workspaces.values())
+        # 可以清理的目录：未被持有且任务已结束；记下检查时的最近使用时间，删除前在锁内重新确认
+        idle = []
+        for workspace in workspaces:
+            workspace.size = _dir_size(workspace.path)
+            last_used = workspace.last_used
+            if workspace.held or (not workspace.orphan and self.in_use(workspace.id)):
+                # 任务结束后才开始计算保留时间
+                with self._lock:
+                    workspace.last_used = now
+            else:
+                idle.append((workspace, last_used))
+
+        removed = []
+        if self.ttl > 0:
+            for workspace, last_used in idle:
+                if now - last_used > self.ttl and self.remove(workspace.id, 'ttl', idle_since=last_used):
+                    removed.append(workspace.id)
+        if self.max_bytes > 0:
+            total = sum(workspace.size for workspace in workspaces if workspace.id not in removed)
+            # 遗留目录可能属于共用同一目录的其他服务进程，只按保留时间清理，不参与淘汰
+            candidates = sorted(((workspace, last_used) for workspace, last_used in idle
+                                 if workspace.id not in removed and not workspace.orphan),
+                                key=lambda item: item[1])
+            for workspace, last_used in candidates:
+                if total <= self.max_bytes:
+                    break
+                if self.remove(workspace.id, 'budget', idle_since=last_used):
+                    removed.append(workspace.id)
+                    total -= workspace.size
+            if total > self.max_bytes:
+                logger.warning(f'工作目录共占用 {total} 字节，淘汰已结束任务的目录后仍超过上限 {self.max_bytes}')
+        return removed
+
+    def start(self):
+        """登记遗留目录并启动后台清理线程"""
+        if self._thread is not None:
+            return
+        self.adopt_orphans()
+        self._thread = threading.Thread(target=self._run, name='workspace-reaper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台清理线程"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f'清理工作目录失败: {str(e)}')
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def _collect_metrics(self):
+        registry = get_metrics_registry()
+        with self._lock:
+            workspaces = list(self._workspaces.values())
+        registry.gauge('workspaces', '现存的工作目录数').set(len(workspaces))
+        registry.gauge('workspace_bytes', '工作目录占用的字节数（最近一次清理检查时统计）').set(
+            sum(workspace.size for workspace in workspaces))
+        registry.gauge('workspace_budget_bytes', '工作目录占用总量上限，0表示不限制').set(self.max_bytes)
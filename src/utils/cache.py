@@ -0,0 +1,256 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from src.utils.metrics import CACHE_LOOKUPS
+from config.app_config import AppConfig
+
+# 持久化缓存删除过期条目的最短间隔（秒），读取时只跳过过期条目，不删除
+_PURGE_INTERVAL = 3600
+
+
+def make_cache_key(source_lang: str, target_lang: str, model: str, prompt_template: str, code: str) -> str:
+    """
+    计算转换结果的缓存键
+
+    Args:
+        source_lang: 源代码语言
+        target_lang: 目标代码语言
+        model: 模型名称
+        prompt_template: 提示模板
+        code: 源代码
+
+    Returns:
+        SHA-256 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for part in (source_lang, target_lang, model, prompt_template, code):
+        digest.update((part or '').encode('utf-8'))
+        # 分隔符，避免不同字段拼接后产生相同的输入
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """内存LRU缓存，同时限制条目数和总字节数"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """
+        初始化内存缓存
+
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 缓存值的最大总字节数
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存，命中时将条目移到最近使用端
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，未命中时返回None
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        """
+        写入缓存，超出限制时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.encode('utf-8'))
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted.encode('utf-8'))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        """当前缓存值的总字节数"""
+        return self._bytes
+
+
+class SQLiteCache:
+    """基于SQLite的持久化缓存，条目带过期时间"""
+
+    def __init__(self, path: str, ttl: int):
+        """
+        初始化持久化缓存
+
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 条目有效期（秒）
+        """
+        self.path = path
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS conversion_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS conversion_cache_expires ON conversion_cache (expires_at)')
+        self._last_purge = 0.0
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取未过期的缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，未命中或已过期时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM conversion_cache WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        """
+        写入缓存条目，距上次清理超过 _PURGE_INTERVAL 时顺便删除过期条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO conversion_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, now + self.ttl)
+            )
+        if now - self._last_purge >= _PURGE_INTERVAL:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """
+        删除所有过期条目
+
+        Returns:
+            删除的条目数
+        """
+        with self._lock, self._conn:
+            self._last_purge = time.time()
+            cursor = self._conn.execute('DELETE FROM conversion_cache WHERE expires_at <= ?', (self._last_purge,))
+        return cursor.rowcount
+
+
+class ConversionCache:
+    """两级转换结果缓存：内存LRU + 可选的SQLite持久层"""
+
+    def __init__(self, memory: LRUCache, persistent: Optional[SQLiteCache] = None):
+        """
+        初始化转换结果缓存
+
+        Args:
+            memory: 内存缓存层
+            persistent: 持久化缓存层，为None时只使用内存
+        """
+        self.memory = memory
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        # 多个转换线程共享同一缓存，计数器的读改写需要加锁
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        依次查询内存层和持久层，持久层命中时回填内存层
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值，未命中时返回None
+        """
+        value = self.memory.get(key)
+        result = 'memory_hit'
+        if value is None and self.persistent is not None:
+            value = self.persistent.get(key)
+            result = 'persistent_hit'
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            result = 'miss'
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_LOOKUPS.inc(result=result)
+        return value
+
+    def set(self, key: str, value: str):
+        """
+        同时写入内存层和持久层
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_conversion_cache() -> Optional[ConversionCache]:
+    """
+    获取按 AppConfig 配置创建的全局转换缓存
+
+    Returns:
+        全局缓存实例，缓存被禁用时返回None
+    """
+    global _default_cache
+    if not AppConfig.CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            persistent = None
+            if AppConfig.CACHE_DB_PATH:
+                persistent = SQLiteCache(AppConfig.CACHE_DB_PATH, AppConfig.CACHE_TTL)
+            _default_cache = ConversionCache(
+                LRUCache(AppConfig.CACHE_MAX_ENTRIES, AppConfig.CACHE_MAX_BYTES),
+                persistent
+            )
+        return _default_cache
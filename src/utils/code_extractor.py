@@ -0,0 +1,410 @@
+import ast
+import re
+import textwrap
+from typing import List, Optional, Tuple
+
+# 作为共享上下文的顶层语句前缀（导入、包声明、类型声明等）
+_CONTEXT_PREFIXES = ('#', 'import ', 'import{', 'package ', 'using ', 'typedef ', 'export * from', 'export {')
+_C_TYPE_DECL = re.compile(r'^(?:typedef\s+)?(?:struct|union|enum)\b[^;(]*\{')
+_REQUIRE_STMT = re.compile(r'^(?:const|let|var)\s+[\w{}\s,]+=\s*require\(')
+_NAME_PATTERNS = (
+    re.compile(r'\b(?:class|interface|struct|union|enum)\s+([A-Za-z_]\w*)'),
+    re.compile(r'\bfunction\s*\*?\s*([A-Za-z_$][\w$]*)'),
+    # 只匹配 JS 的变量声明（名称后接 = ; , :），不把 C 的 const 返回类型当作名称
+    re.compile(r'\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*[=;,:]'),
+    re.compile(r'([A-Za-z_]\w*)\s*\('),
+)
+_TRAILING_DECLARATOR = re.compile(r'[ \t\w,*\[\]]*;')
+# 可以拆分类体的类型声明
+_CLASS_DECL = re.compile(r'\b(?:class|interface|enum|record)\s+[A-Za-z_$]')
+# 合并分块结果时类成员的缩进
+_MEMBER_INDENT = '    '
+
+
+class CodeUnit:
+    """源文件中的一个顶层单元（函数、类、结构体、导入语句等）"""
+
+    CONTEXT = 'context'
+    DEFINITION = 'definition'
+
+    def __init__(self, kind: str, text: str, name: str = ''):
+        """
+        初始化代码单元
+
+        Args:
+            kind: 单元类型，CONTEXT 表示导入、类型声明等共享上下文，DEFINITION 表示普通定义
+            text: 单元源码，包含其前面的注释和空行
+            name: 单元名称，无法识别时为空
+        """
+        self.kind = kind
+        self.text = text
+        self.name = name
+
+    @property
+    def signature(self) -> str:
+        """单元的首个有效代码行，用作符号摘要"""
+        for line in self.text.splitlines():
+            stripped = line.split('//', 1)[0].strip()
+            if not stripped or stripped.startswith(('/*', '*', '@')):
+                continue
+            if stripped.startswith('#') and self.kind == self.DEFINITION:
+                continue
+            return stripped.rstrip('{').rstrip()
+        return ''
+
+
+class CodeChunk:
+    """分块转换的一个输入块"""
+
+    def __init__(self, code: str, context: str = '', enclosing: str = '', skeleton: bool = False):
+        """
+        初始化代码块
+
+        Args:
+            code: 本块的源码
+            context: 本块之外的共享上下文，仅供模型参考
+            enclosing: 拆分类体时所属类的声明（如 "public class Order"），为空表示顶层代码
+            skeleton: 是否为拆分类体时省略了全部成员的文件骨架，成员的转换结果插入其类体
+        """
+        self.code = code
+        self.context = context
+        self.enclosing = enclosing
+        self.skeleton = skeleton
+
+
+def extract_units(lang: str, code: str) -> Optional[List[CodeUnit]]:
+    """
+    将源文件拆分为顶层单元，各单元文本按顺序拼接后与原文件完全一致
+
+    Args:
+        lang: 代码语言
+        code: 源代码
+
+    Returns:
+        顶层单元列表，无法解析时返回None
+    """
+    if lang == 'python':
+        return _extract_python_units(code)
+    return _extract_brace_units(code)
+
+
+def split_into_chunks(lang: str, code: str, max_chars: int) -> List[CodeChunk]:
+    """
+    按顶层单元边界把源文件切分为不超过 max_chars 的块，单个超长单元独占一块
+
+    只有一个顶层类的文件（如Java）按类成员切分：第一块是省略了全部成员的文件骨架，
+    其余各块是类成员，转换后由 merge_class_members 插回骨架的类体。
+
+    Args:
+        lang: 代码语言
+        code: 源代码
+        max_chars: 每块的目标最大字符数
+
+    Returns:
+        按原顺序排列的代码块列表；无法拆分时只有一个块
+    """
+    units = extract_units(lang, code)
+    if not units:
+        return [CodeChunk(code)]
+
+    if lang != 'python' and len(code) > max_chars:
+        member_chunks = _split_class_members(units, max_chars)
+        if member_chunks:
+            return member_chunks
+
+    groups = _group_units(units, max_chars)
+    if len(groups) == 1:
+        return [CodeChunk(code)]
+
+    chunks = []
+    for group in groups:
+        # 共享上下文只包含本块之外的导入和类型声明
+        context = ''.join(unit.text for g in groups if g is not group
+                          for unit in g if unit.kind == CodeUnit.CONTEXT).strip()
+        if len(context) > max_chars:
+            context = ''
+        chunks.append(CodeChunk(''.join(unit.text for unit in group), context))
+    return chunks
+
+
+def merge_class_members(skeleton: str, members: List[str]) -> str:
+    """
+    把各成员块的转换结果插入骨架转换结果的类体，与 split_into_chunks 的类成员切分配合使用
+
+    花括号语言插在最后一个闭合括号之前；Python 等缩进语言去掉类体中的占位语句后追加在末尾
+
+    Args:
+        skeleton: 文件骨架的转换结果
+        members: 各成员块的转换结果，按原顺序排列
+
+    Returns:
+        合并后的代码
+    """
+    body = '\n\n'.join(textwrap.indent(textwrap.dedent(member).strip('\n'), _MEMBER_INDENT)
+                       for member in members if member.strip())
+    lines = skeleton.rstrip().splitlines()
+    for index in range(len(lines) - 1, -1, -1):
+        stripped = lines[index].strip()
+        if stripped.startswith('}'):
+            return '\n'.join(lines[:index] + [body] + lines[index:])
+        if stripped.endswith('{}'):
+            # 空类体写在同一行
+            opening = lines[index].rstrip()[:-1]
+            indent = lines[index][:len(lines[index]) - len(lines[index].lstrip())]
+            return '\n'.join(lines[:index] + [opening, body, indent + '}'] + lines[index + 1:])
+        if stripped and stripped not in ('pass', '...'):
+            break
+    while lines and lines[-1].strip() in ('pass', '...', ''):
+        lines.pop()
+    return '\n'.join(lines + [body])
+
+
+def _group_units(units: List[CodeUnit], max_chars: int) -> List[List[CodeUnit]]:
+    groups = []
+    current = []
+    size = 0
+    for unit in units:
+        if current and size + len(unit.text) > max_chars:
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(unit)
+        size += len(unit.text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _split_class_members(units: List[CodeUnit], max_chars: int) -> Optional[List[CodeChunk]]:
+    """文件中唯一的定义是一个类时，按类成员切分；无法切分时返回None"""
+    definitions = [unit for unit in units if unit.kind == CodeUnit.DEFINITION]
+    if len(definitions) != 1:
+        return None
+    target = definitions[0]
+    body = _strip_leading_comments(target.text)
+    match = _CLASS_DECL.search(body.split('{', 1)[0])
+    if not match:
+        return None
+    # 从类声明处开始查找类体，跳过前面的注释和注解
+    span = _class_body_span(target.text, len(target.text) - len(body) + match.start())
+    if span is None:
+        return None
+    open_brace, close_brace = span
+    members = _extract_brace_units(target.text[open_brace + 1:close_brace])
+    if not members:
+        return None
+    groups = _group_units(members, max_chars)
+    if len(groups) == 1:
+        return None
+
+    before = ''.join(unit.text for unit in units[:units.index(target)])
+    after = ''.join(unit.text for unit in units[units.index(target) + 1:])
+    skeleton = before + target.text[:open_brace + 1] + '\n' + target.text[close_brace:] + after
+    enclosing = target.signature
+    shared = ''.join(unit.text for unit in units if unit.kind == CodeUnit.CONTEXT).strip()
+
+    chunks = [CodeChunk(skeleton, enclosing=enclosing, skeleton=True)]
+    for group in groups:
+        # 共享上下文为文件的导入等，加上其他块中成员的签名，便于引用字段和方法
+        signatures = '\n'.join(unit.signature for g in groups if g is not group for unit in g if unit.signature)
+        context = '\n\n'.join(part for part in (shared, signatures) if part)
+        if len(context) > max_chars:
+            context = shared if len(shared) <= max_chars else ''
+        code = textwrap.dedent(''.join(unit.text for unit in group)).strip('\n') + '\n'
+        chunks.append(CodeChunk(code, context, enclosing))
+    return chunks
+
+
+def _class_body_span(text: str, start: int) -> Optional[Tuple[int, int]]:
+    """类定义文本中从 start 开始的类体的左右花括号位置，跳过注释和字符串"""
+    depth = 0
+    open_brace = None
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ''
+        if ch == '/' and nxt == '/':
+            end = text.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if ch == '/' and nxt == '*':
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch in ('"', "'", '`'):
+            i = _skip_string(text, i)
+            continue
+        if ch == '{':
+            if open_brace is None:
+                open_brace = i
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0 and open_brace is not None:
+                return open_brace, i
+        i += 1
+    return None
+
+
+def _extract_python_units(code: str) -> Optional[List[CodeUnit]]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    lines = code.splitlines(keepends=True)
+    units = []
+    prev_end = 0
+    for node in tree.body:
+        end = node.end_lineno
+        text = ''.join(lines[prev_end:end])
+        prev_end = end
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            units.append(CodeUnit(CodeUnit.CONTEXT, text))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            units.append(CodeUnit(CodeUnit.DEFINITION, text, node.name))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [t.id for t in targets if isinstance(t, ast.Name)]
+            # 模块级常量视为共享上下文
+            kind = CodeUnit.CONTEXT if names and all(n.isupper() for n in names) else CodeUnit.DEFINITION
+            units.append(CodeUnit(kind, text, names[0] if names else ''))
+        else:
+            units.append(CodeUnit(CodeUnit.DEFINITION, text))
+
+    trailing = ''.join(lines[prev_end:])
+    if trailing:
+        if units:
+            units[-1].text += trailing
+        else:
+            units.append(CodeUnit(CodeUnit.DEFINITION, trailing))
+    return units
+
+
+def _extract_brace_units(code: str) -> Optional[List[CodeUnit]]:
+    units = []
+    depth = 0
+    unit_start = 0
+    i = 0
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        nxt = code[i + 1] if i + 1 < n else ''
+
+        if ch == '/' and nxt == '/':
+            end = code.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if ch == '/' and nxt == '*':
+            end = code.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch in ('"', "'", '`'):
+            i = _skip_string(code, i)
+            continue
+        if ch == '#' and depth == 0 and not code[unit_start:i].strip():
+            # 预处理指令独立成单元，支持反斜杠续行
+            end = i
+            while True:
+                end = code.find('\n', end)
+                if end == -1 or code[end - 1] != '\\':
+                    break
+                end += 1
+            i = n if end == -1 else end + 1
+            units.append(_make_unit(code[unit_start:i]))
+            unit_start = i
+            continue
+
+        if ch in '{([':
+            depth += 1
+        elif ch in '})]':
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and ch == '}':
+                end = i + 1
+                match = _TRAILING_DECLARATOR.match(code, end)
+                if match:
+                    end = match.end()
+                i = _line_end(code, end)
+                units.append(_make_unit(code[unit_start:i]))
+                unit_start = i
+                continue
+        elif ch == ';' and depth == 0:
+            i = _line_end(code, i + 1)
+            units.append(_make_unit(code[unit_start:i]))
+            unit_start = i
+            continue
+        i += 1
+
+    if depth != 0:
+        return None
+    trailing = code[unit_start:]
+    if trailing:
+        if units and not trailing.strip():
+            units[-1].text += trailing
+        else:
+            units.append(_make_unit(trailing))
+    return units
+
+
+def _skip_string(code: str, start: int) -> int:
+    quote = code[start]
+    i = start + 1
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if ch == '\n' and quote != '`':
+            # 未闭合的普通字符串在行尾结束，避免误吞后续代码
+            return i
+        i += 1
+    return n
+
+
+def _line_end(code: str, pos: int) -> int:
+    """若 pos 之后到行尾只有空白或行注释，则把它们并入当前单元"""
+    newline = code.find('\n', pos)
+    if newline == -1:
+        rest = code[pos:]
+        return len(code) if not rest.strip() or rest.strip().startswith('//') else pos
+    rest = code[pos:newline].strip()
+    if not rest or rest.startswith('//'):
+        return newline + 1
+    return pos
+
+
+def _make_unit(text: str) -> CodeUnit:
+    body = _strip_leading_comments(text)
+    if body.startswith(_CONTEXT_PREFIXES) or _REQUIRE_STMT.match(body) \
+            or (_C_TYPE_DECL.match(body) and body.rstrip().endswith(';')):
+        kind = CodeUnit.CONTEXT
+    else:
+        kind = CodeUnit.DEFINITION
+    return CodeUnit(kind, text, _guess_name(body))
+
+
+def _strip_leading_comments(text: str) -> str:
+    body = text.lstrip()
+    while body.startswith(('//', '/*')):
+        if body.startswith('//'):
+            newline = body.find('\n')
+            body = '' if newline == -1 else body[newline + 1:].lstrip()
+        else:
+            end = body.find('*/')
+            body = '' if end == -1 else body[end + 2:].lstrip()
+    return body
+
+
+def _guess_name(body: str) -> str:
+    header = body.split('{', 1)[0]
+    for pattern in _NAME_PATTERNS:
+        match = pattern.search(header)
+        if match:
+            return match.group(1)
+    return ''
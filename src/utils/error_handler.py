@@ -0,0 +1,28 @@
+from typing import Optional
+
+
+class APIError(Exception):
+    """API调用失败"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        """
+        初始化API错误
+
+        Args:
+            message: 错误信息
+            status_code: HTTP状态码，非HTTP错误时为None
+            retry_after: 服务端通过 Retry-After 建议的等待秒数
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitError(APIError):
+    """API限流（HTTP 429）且重试次数已用尽"""
+    pass
+
+
+class DeadlineExceededError(APIError):
+    """请求在截止时间内未能完成"""
+    pass
@@ -0,0 +1,289 @@
+import os
+import posixpath
+import shutil
+import threading
+import zipfile
+from typing import BinaryIO, Iterator, List, Optional
+
+from src.utils.metrics import stage_timer
+
+# 流式拷贝和下载使用的块大小
+CHUNK_SIZE = 64 * 1024
+
+
+def normalize_member_name(name: str) -> Optional[str]:
+    """
+    规范化归档内的相对路径，拒绝绝对路径和越出根目录的路径
+
+    Args:
+        name: 原始路径
+
+    Returns:
+        使用'/'分隔的相对路径，不安全或为目录时返回None
+    """
+    name = name.replace('\\', '/')
+    if name.endswith('/'):
+        return None
+    normalized = posixpath.normpath(name.lstrip('/'))
+    if normalized in ('', '.') or normalized.startswith('../') or normalized == '..' or ':' in normalized.split('/')[0]:
+        return None
+    return normalized
+
+
+class DirectorySource:
+    """以目录为输入的项目源"""
+
+    def __init__(self, root: str):
+        """
+        初始化目录源
+
+        Args:
+            root: 项目根目录
+        """
+        self.root = root
+
+    def list_files(self) -> List[str]:
+        """
+        列出所有文件
+
+        Returns:
+            使用'/'分隔的相对路径列表
+        """
+        files = []
+        for current, _, names in os.walk(self.root):
+            for name in names:
+                rel = os.path.relpath(os.path.join(current, name), self.root)
+                files.append(rel.replace(os.sep, '/'))
+        return sorted(files)
+
+    def open(self, rel_path: str) -> BinaryIO:
+        """以二进制方式打开文件"""
+        return open(os.path.join(self.root, rel_path), 'rb')
+
+    def size(self, rel_path: str) -> int:
+        """文件字节数"""
+        return os.path.getsize(os.path.join(self.root, rel_path))
+
+    def read_text(self, rel_path: str) -> str:
+        """以UTF-8读取文件内容"""
+        with stage_timer('extract'), self.open(rel_path) as f:
+            return f.read().decode('utf-8')
+
+    def close(self):
+        pass
+
+
+class ZipSource:
+    """直接读取上传ZIP成员的项目源，无需解压到磁盘；多个ZIP按顺序合并，同名成员以后者为准"""
+
+    def __init__(self, zip_paths: List[str]):
+        """
+        初始化ZIP源
+
+        Args:
+            zip_paths: ZIP文件路径列表
+        """
+        self._archives = [zipfile.ZipFile(path, 'r') for path in zip_paths]
+        self._members = {}
+        for archive in self._archives:
+            for info in archive.infolist():
+                name = normalize_member_name(info.filename)
+                if name is not None:
+                    self._members[name] = (archive, info)
+
+    def list_files(self) -> List[str]:
+        """
+        列出所有文件
+
+        Returns:
+            使用'/'分隔的相对路径列表
+        """
+        return sorted(self._members)
+
+    def open(self, rel_path: str) -> BinaryIO:
+        """以二进制方式打开成员"""
+        archive, info = self._members[rel_path]
+        return archive.open(info, 'r')
+
+    def size(self, rel_path: str) -> int:
+        """成员解压后的字节数"""
+        return self._members[rel_path][1].file_size
+
+    def read_text(self, rel_path: str) -> str:
+        """以UTF-8读取成员内容"""
+        with stage_timer('extract'), self.open(rel_path) as f:
+            return f.read().decode('utf-8')
+
+    def close(self):
+        for archive in self._archives:
+            archive.close()
+
+
+class _AppendOnlyFile:
+    """只追加的文件包装：不提供 seek/tell，使 ZipFile 使用数据描述符而不回写本地文件头"""
+
+    def __init__(self, fp: BinaryIO, on_write):
+        self._fp = fp
+        self._on_write = on_write
+        self.discarding = False
+
+    def write(self, data) -> int:
+        if self.discarding:
+            # 中止后丢弃 ZipFile 关闭时写出的中央目录，使已下载的内容保持截断状态
+            return len(data)
+        written = self._fp.write(data)
+        self._fp.flush()
+        self._on_write(written)
+        return written
+
+    def flush(self):
+        if not self.discarding:
+            self._fp.flush()
+
+
+class StreamingZipWriter:
+    """按完成顺序追加写入的结果ZIP，已写入的字节可以在写入过程中被下载"""
+
+    def __init__(self, path: str):
+        """
+        初始化流式ZIP写入器
+
+        Args:
+            path: 结果ZIP路径
+        """
+        self.path = path
+        self.bytes_written = 0
+        self.closed = False
+        # 写入被中止（任务失败或取消），结果ZIP没有中央目录且已被删除
+        self.aborted = False
+        self._names = set()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._fp = open(path, 'wb')
+        self._sink = _AppendOnlyFile(self._fp, self._notify)
+        self._zip = zipfile.ZipFile(self._sink, 'w', zipfile.ZIP_DEFLATED)
+
+    def _notify(self, written: int):
+        with self._cond:
+            self.bytes_written += written
+            self._cond.notify_all()
+
+    def reserve_name(self, name: str) -> str:
+        """
+        预留归档内的文件名，与已有名称冲突时追加序号
+
+        Args:
+            name: 期望的文件名
+
+        Returns:
+            实际使用的文件名
+        """
+        with self._lock:
+            candidate = name
+            stem, ext = posixpath.splitext(name)
+            index = 1
+            while candidate in self._names:
+                candidate = f'{stem}_{index}{ext}'
+                index += 1
+            self._names.add(candidate)
+            return candidate
+
+    def write_text(self, name: str, text: str):
+        """
+        写入文本条目
+
+        Args:
+            name: 归档内文件名，应先通过 reserve_name 预留
+            text: 文件内容
+        """
+        data = text.encode('utf-8')
+        with stage_timer('zip'), self._lock:
+            self._names.add(name)
+            self._zip.writestr(name, data)
+
+    def write_stream(self, name: str, stream: BinaryIO):
+        """
+        分块拷贝二进制流为一个条目
+
+        Args:
+            name: 归档内文件名，应先通过 reserve_name 预留
+            stream: 输入流
+        """
+        with stage_timer('zip'), self._lock:
+            self._names.add(name)
+            with self._zip.open(name, 'w') as target:
+                shutil.copyfileobj(stream, target, CHUNK_SIZE)
+
+    def close(self):
+        """写入中央目录并关闭文件"""
+        with self._lock:
+            if self.closed:
+                return
+            self._zip.close()
+            self._fp.close()
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def abort(self):
+        """放弃写入并删除未完成的ZIP；不写中央目录，正在下载的客户端收到的是截断的ZIP"""
+        try:
+            with self._lock:
+                # 以文件是否已关闭判断，close 完成后才设置 closed
+                aborting = not self._fp.closed
+                if aborting:
+                    self._sink.discarding = True
+                    try:
+                        self._zip.close()
+                    finally:
+                        self._fp.close()
+            with self._cond:
+                if aborting:
+                    self.aborted = True
+                self.closed = True
+                self._cond.notify_all()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def wait(self, offset: int, timeout: float = 1.0) -> bool:
+        """
+        等待写入超过 offset 字节或写入结束
+
+        Args:
+            offset: 调用方已读取的字节数
+            timeout: 最长等待秒数
+
+        Returns:
+            是否还有可读数据或写入仍在进行
+        """
+        with self._cond:
+            if self.bytes_written <= offset and not self.closed:
+                self._cond.wait(timeout)
+            return self.bytes_written > offset or not self.closed
+
+    def iter_bytes(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        从头读取结果ZIP，追随写入进度直到写入结束
+
+        Args:
+            chunk_size: 每次读取的字节数
+
+        Returns:
+            ZIP内容块的迭代器
+
+        Raises:
+            IOError: 写入被中止时抛出，使下载连接异常结束而不是得到看似完整的文件
+        """
+        offset = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                data = f.read(chunk_size)
+                if data:
+                    offset += len(data)
+                    yield data
+                    continue
+                if not self.wait(offset):
+                    break
+        if self.aborted:
+            raise IOError(f'结果ZIP写入已中止: {self.path}')
@@ -0,0 +1,40 @@
+import threading
+from contextlib import contextmanager
+
+from config.app_config import AppConfig
+
+# 全局在途转换数限制，所有转换池、修复请求和分块转换共享，避免多个项目同时转换时压垮API
+_inflight_semaphore = threading.BoundedSemaphore(AppConfig.MAX_INFLIGHT_CONVERSIONS)
+# 当前线程是否持有在途名额
+_held = threading.local()
+
+
+@contextmanager
+def inflight_slot():
+    """占用一个在途名额直到退出；当前线程已持有名额时直接复用，不重复占用"""
+    if getattr(_held, 'value', False):
+        yield
+        return
+    with _inflight_semaphore:
+        _held.value = True
+        try:
+            yield
+        finally:
+            _held.value = False
+
+
+@contextmanager
+def released_slot():
+    """暂时归还当前线程持有的在途名额，退出时重新占用；用于等待分块转换等子请求完成，
+    避免持有名额的线程等待需要名额的子请求而互相阻塞
+    """
+    if not getattr(_held, 'value', False):
+        yield
+        return
+    _held.value = False
+    _inflight_semaphore.release()
+    try:
+        yield
+    finally:
+        _inflight_semaphore.acquire()
+        _held.value = True
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import sys
+import threading
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+from config.app_config import AppConfig
+
+# 标记为可采样的日志（逐文件、逐请求等高频日志）：logger.info('...', extra=SAMPLED)
+SAMPLED = {'sampled': True}
+
+# LogRecord 自带的属性，其余属性视为通过 extra 传入的结构化字段
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'sampled', '_sample_keep'
+}
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED_ATTRS}
+
+
+class JSONFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，通过 extra 传入的字段作为独立的键"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        data.update(_extra_fields(record))
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """文本格式，通过 extra 传入的字段以 key=value 的形式附加在消息之后"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            text += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """对标记为可采样的 WARNING 以下日志按调用位置抽样：每个位置每 N 条只保留第一条"""
+
+    def __init__(self, rate: float):
+        """
+        初始化采样过滤器
+
+        Args:
+            rate: 保留比例，1 表示全部保留，0 表示全部丢弃
+        """
+        super().__init__()
+        self.interval = 0 if rate <= 0 else max(1, round(1 / min(rate, 1.0)))
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, 'sampled', False):
+            return True
+        # 同一条日志经过多个处理器时只抽样一次
+        keep = getattr(record, '_sample_keep', None)
+        if keep is None:
+            keep = record._sample_keep = self._sample(record)
+        return keep
+
+    def _sample(self, record: logging.LogRecord) -> bool:
+        if self.interval == 0:
+            return False
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.interval:
+            return False
+        if self.interval > 1:
+            record.sample_interval = self.interval
+        return True
+
+
+def setup_logging(level: Optional[str] = None, log_format: Optional[str] = None,
+                  log_file: Optional[str] = None, sample_rate: Optional[float] = None):
+    """
+    配置根日志记录器，重复调用时替换之前的处理器
+
+    Args:
+        level: 日志级别，默认读取 AppConfig.LOG_LEVEL
+        log_format: text 或 json，默认读取 AppConfig.LOG_FORMAT
+        log_file: 日志文件路径，为空时只输出到标准输出，默认读取 AppConfig.LOG_FILE
+        sample_rate: 高频日志的保留比例，默认读取 AppConfig.LOG_SAMPLE_RATE
+    """
+    level = (level or AppConfig.LOG_LEVEL).upper()
+    log_format = log_format or AppConfig.LOG_FORMAT
+    log_file = AppConfig.LOG_FILE if log_file is None else log_file
+    sample_rate = AppConfig.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    formatter = JSONFormatter() if log_format == 'json' else KeyValueFormatter(_TEXT_FORMAT)
+    sampling = SamplingFilter(sample_rate)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        handlers.append(RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(sampling)
+        root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
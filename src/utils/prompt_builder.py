@@ -0,0 +1,222 @@
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.app_config import AppConfig
+from config.prompt_config import PromptConfig
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录，相对路径的模板文件从这里查找
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+# 模板文件中语言对小节的标题，如 “## c -> python”，* 匹配任意语言
+_PAIR_HEADING = re.compile(r'^##\s*([\w*+#-]+)\s*->\s*([\w*+#-]+)\s*$')
+_OTHER_HEADING = re.compile(r'^#{1,2}\s')
+
+
+def parse_pair_templates(text: str) -> Dict[Tuple[str, str], str]:
+    """
+    解析 docs/prompt_template.md 格式的语言对规则：每个 “## 源语言 -> 目标语言” 标题下的内容为该语言对的规则，
+    语言可以写为 * 表示任意语言，第一个语言对标题之前的内容（说明文字）忽略
+
+    Args:
+        text: 模板文件内容
+
+    Returns:
+        (源语言, 目标语言) 到规则文本的映射，语言名称为小写
+    """
+    templates = {}
+    pair = None
+    lines = []
+
+    def flush():
+        body = '\n'.join(lines).strip()
+        if pair is not None and body:
+            templates[pair] = (templates[pair] + '\n' + body) if pair in templates else body
+
+    in_fence = False
+    for line in text.splitlines():
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        match = None if in_fence else _PAIR_HEADING.match(line.strip())
+        if match:
+            flush()
+            pair = (match.group(1).lower(), match.group(2).lower())
+            lines = []
+        elif not in_fence and _OTHER_HEADING.match(line):
+            # 其他一、二级标题结束当前小节
+            flush()
+            pair = None
+            lines = []
+        else:
+            lines.append(line)
+    flush()
+    return templates
+
+
+def load_pair_templates(path: str) -> Dict[Tuple[str, str], str]:
+    """
+    读取语言对规则文件，文件不存在或为空时返回空映射
+
+    Args:
+        path: 模板文件路径，相对路径从项目根目录查找
+
+    Returns:
+        (源语言, 目标语言) 到规则文本的映射
+    """
+    if not path:
+        return {}
+    if not os.path.isabs(path):
+        path = os.path.join(_PROJECT_ROOT, path)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        templates = parse_pair_templates(f.read())
+    if templates:
+        logger.info(f'已加载 {len(templates)} 组语言对提示规则: {path}')
+    return templates
+
+
+class PromptBuilder:
+    """转换提示构建器
+
+    提示按“通用转换要求 → 源语言提示 → 语言对规则 → 依赖等上下文 → 原代码”排列，
+    同一语言对的请求共享完全相同的前缀，便于服务端的前缀缓存命中。前缀按语言对只渲染一次，
+    之后每次请求只做字符串拼接。
+    """
+
+    def __init__(self, pair_templates: Optional[Dict[Tuple[str, str], str]] = None):
+        """
+        初始化提示构建器
+
+        Args:
+            pair_templates: (源语言, 目标语言) 到规则文本的映射，语言可以为 *；
+                            默认合并 PromptConfig.PAIR_PROMPTS 和 AppConfig.PROMPT_TEMPLATE_PATH 指向的文件
+        """
+        if pair_templates is None:
+            pair_templates = dict(PromptConfig.PAIR_PROMPTS)
+            pair_templates.update(load_pair_templates(AppConfig.PROMPT_TEMPLATE_PATH))
+        self.pair_templates = {(source.lower(), target.lower()): text.strip()
+                               for (source, target), text in pair_templates.items() if text.strip()}
+        self._prefixes: Dict[Tuple[str, str, str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def pair_rules(self, source_lang: str, target_lang: str) -> str:
+        """
+        语言对规则，依次合并 * -> 目标语言、源语言 -> *、源语言 -> 目标语言 三级规则
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+
+        Returns:
+            规则文本，没有规则时返回空字符串
+        """
+        source_lang, target_lang = source_lang.lower(), target_lang.lower()
+        keys = (('*', target_lang), (source_lang, '*'), (source_lang, target_lang))
+        return '\n'.join(self.pair_templates[key] for key in keys if key in self.pair_templates)
+
+    def prefix(self, source_lang: str, target_lang: str, language_hints: str = '', batch: bool = False) -> str:
+        """
+        提示中不随代码变化的前缀，按语言对和源语言提示缓存
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            language_hints: 转换器的源语言提示（SPECIFIC_PROMPT）
+            batch: 是否为批量转换提示
+
+        Returns:
+            前缀文本
+        """
+        key = (source_lang, target_lang, language_hints, 'batch' if batch else 'single')
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            template = PromptConfig.BATCH_PROMPT if batch else PromptConfig.BASE_PROMPT
+            parts = [template.format(source_lang=source_lang, target_lang=target_lang)]
+            if language_hints:
+                parts.append(language_hints)
+            rules = self.pair_rules(source_lang, target_lang)
+            if rules:
+                parts.append(PromptConfig.PAIR_RULES_PROMPT.format(rules=rules))
+            prefix = '\n'.join(parts)
+            with self._lock:
+                prefix = self._prefixes.setdefault(key, prefix)
+        return prefix
+
+    def build(self, source_lang: str, target_lang: str, code: str, context: str = '',
+              language_hints: str = '') -> str:
+        """
+        构建转换提示
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 源代码
+            context: 放在原代码之前的上下文说明（依赖符号摘要、分块转换时的共享声明等）
+            language_hints: 转换器的源语言提示（SPECIFIC_PROMPT）
+
+        Returns:
+            提示文本
+        """
+        prompt = self.prefix(source_lang, target_lang, language_hints)
+        if context:
+            prompt += '\n' + context
+        return prompt + PromptConfig.CODE_PROMPT + code
+
+    def build_delta(self, source_lang: str, target_lang: str, reference_output: str, diff: str,
+                    context: str = '', language_hints: str = '') -> str:
+        """
+        构建参照相似文件的转换提示：前缀与普通转换相同，原代码部分替换为参考文件的转换结果和源代码差异
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            reference_output: 参考文件的转换结果
+            diff: 参考文件与原代码的 unified diff
+            context: 依赖符号摘要等上下文说明
+            language_hints: 转换器的源语言提示（SPECIFIC_PROMPT）
+
+        Returns:
+            提示文本
+        """
+        prompt = self.prefix(source_lang, target_lang, language_hints)
+        if context:
+            prompt += '\n' + context
+        prompt += '\n' + PromptConfig.DELTA_PROMPT.format(target_lang=target_lang, reference_output=reference_output)
+        return prompt + PromptConfig.DELTA_CODE_PROMPT + diff
+
+    def build_batch(self, source_lang: str, target_lang: str, snippets: str, language_hints: str = '') -> str:
+        """
+        构建批量转换提示
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            snippets: 带编号分隔行的多段代码
+            language_hints: 转换器的源语言提示（SPECIFIC_PROMPT）
+
+        Returns:
+            提示文本
+        """
+        return self.prefix(source_lang, target_lang, language_hints, batch=True) + PromptConfig.CODE_PROMPT + snippets
+
+
+_default_builder = None
+_default_builder_lock = threading.Lock()
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """
+    获取按配置创建的全局提示构建器
+
+    Returns:
+        全局提示构建器
+    """
+    global _default_builder
+    with _default_builder_lock:
+        if _default_builder is None:
+            _default_builder = PromptBuilder()
+        return _default_builder
@@ -0,0 +1,207 @@
+import math
+import threading
+from typing import Dict, Optional, Tuple
+
+from config.api_config import APIConfig
+
+# 转换后代码相对源代码的token数比例初始值，实际比例会随请求结果逐步修正
+DEFAULT_EXPANSION_RATIOS = {
+    ('c', 'python'): 0.7,
+    ('c', 'java'): 1.1,
+    ('c', 'js'): 0.9,
+    ('python', 'c'): 1.8,
+    ('python', 'java'): 1.6,
+    ('python', 'js'): 1.2,
+    ('java', 'c'): 1.3,
+    ('java', 'python'): 0.6,
+    ('java', 'js'): 0.8,
+    ('js', 'c'): 1.6,
+    ('js', 'python'): 0.9,
+    ('js', 'java'): 1.4,
+}
+# 修正比例时新观测值的权重
+_EMA_WEIGHT = 0.2
+# 估算值之外固定预留的token数（代码块标记、少量注释等）
+_BASE_OVERHEAD_TOKENS = 64
+# 输入太短时固定开销占主导，不用于修正比例
+_MIN_LEARNING_INPUT_TOKENS = 50
+# 比例的合理范围，避免个别异常响应把比例带偏
+_RATIO_BOUNDS = (0.2, 5.0)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数：ASCII字符约3.5个一个token，其他字符（中文等）约一个一个token
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return int(ascii_chars / 3.5 + (len(text) - ascii_chars)) + 1
+
+
+class _PairStats:
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        self.requests = 0
+        self.input_tokens = 0
+        self.estimated_tokens = 0
+        self.budget_tokens = 0
+        self.actual_tokens = 0
+        self.abs_error = 0
+        self.truncated = 0
+        self.continuations = 0
+
+    def to_dict(self) -> Dict:
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'ratio': round(self.ratio, 3),
+            'input_tokens': self.input_tokens,
+            'estimated_tokens': self.estimated_tokens,
+            'budget_tokens': self.budget_tokens,
+            'actual_tokens': self.actual_tokens,
+            'mean_abs_error': round(self.abs_error / requests, 1),
+            # 预留的 max_tokens 中实际用到的比例
+            'budget_utilization': round(self.actual_tokens / self.budget_tokens, 3) if self.budget_tokens else None,
+            'truncated': self.truncated,
+            'continuations': self.continuations
+        }
+
+
+class TokenBudget:
+    """单个请求的输出token预算，请求结束后通过 record 回报实际用量"""
+
+    def __init__(self, estimator: 'TokenEstimator', pair: Tuple[str, str],
+                 input_tokens: int, estimated_tokens: int, max_tokens: int):
+        """
+        初始化token预算
+
+        Args:
+            estimator: 所属的估算器
+            pair: (源代码语言, 目标代码语言)
+            input_tokens: 源代码的估算token数
+            estimated_tokens: 预计的输出token数
+            max_tokens: 请求使用的 max_tokens
+        """
+        self.estimator = estimator
+        self.pair = pair
+        self.input_tokens = input_tokens
+        self.estimated_tokens = estimated_tokens
+        self.max_tokens = max_tokens
+
+    def record(self, actual_tokens: int, truncated: bool = False, continuations: int = 0):
+        """
+        回报实际输出用量
+
+        Args:
+            actual_tokens: 实际输出的token数（含续写）
+            truncated: 首次请求是否因长度被截断
+            continuations: 续写请求次数
+        """
+        self.estimator.record(self, actual_tokens, truncated, continuations)
+
+
+class TokenEstimator:
+    """按输入长度和语言对估算输出 max_tokens，并统计估算值与实际用量"""
+
+    def __init__(self, min_tokens: Optional[int] = None, max_tokens: Optional[int] = None,
+                 margin: Optional[float] = None):
+        """
+        初始化估算器
+
+        Args:
+            min_tokens: max_tokens 下限，默认读取 APIConfig.MIN_OUTPUT_TOKENS
+            max_tokens: max_tokens 上限（模型的最大输出长度），默认读取 APIConfig.MAX_OUTPUT_TOKENS
+            margin: 估算值之上预留的比例，默认读取 APIConfig.OUTPUT_TOKEN_MARGIN
+        """
+        self.min_tokens = min_tokens or APIConfig.MIN_OUTPUT_TOKENS
+        self.max_tokens = max_tokens or APIConfig.MAX_OUTPUT_TOKENS
+        self.margin = APIConfig.OUTPUT_TOKEN_MARGIN if margin is None else margin
+        self._pairs: Dict[Tuple[str, str], _PairStats] = {}
+        self._lock = threading.Lock()
+
+    def _pair_stats(self, pair: Tuple[str, str]) -> _PairStats:
+        stats = self._pairs.get(pair)
+        if stats is None:
+            stats = self._pairs[pair] = _PairStats(DEFAULT_EXPANSION_RATIOS.get(pair, 1.0))
+        return stats
+
+    def budget(self, source_lang: str, target_lang: str, code: str) -> TokenBudget:
+        """
+        估算一次转换请求的输出token预算
+
+        Args:
+            source_lang: 源代码语言
+            target_lang: 目标代码语言
+            code: 待转换（或待修复）的代码
+
+        Returns:
+            token预算
+        """
+        pair = (source_lang, target_lang)
+        input_tokens = estimate_tokens(code)
+        with self._lock:
+            ratio = self._pair_stats(pair).ratio
+        estimated = int(input_tokens * ratio) + _BASE_OVERHEAD_TOKENS
+        max_tokens = math.ceil(estimated * (1 + self.margin))
+        max_tokens = max(self.min_tokens, min(self.max_tokens, max_tokens))
+        return TokenBudget(self, pair, input_tokens, estimated, max_tokens)
+
+    def record(self, budget: TokenBudget, actual_tokens: int, truncated: bool = False, continuations: int = 0):
+        """
+        记录实际用量并修正该语言对的比例
+
+        Args:
+            budget: 请求使用的预算
+            actual_tokens: 实际输出的token数（含续写）
+            truncated: 首次请求是否因长度被截断
+            continuations: 续写请求次数
+        """
+        with self._lock:
+            stats = self._pair_stats(budget.pair)
+            stats.requests += 1
+            stats.input_tokens += budget.input_tokens
+            stats.estimated_tokens += budget.estimated_tokens
+            stats.budget_tokens += budget.max_tokens
+            stats.actual_tokens += actual_tokens
+            stats.abs_error += abs(actual_tokens - budget.estimated_tokens)
+            stats.truncated += int(truncated)
+            stats.continuations += continuations
+            if budget.input_tokens >= _MIN_LEARNING_INPUT_TOKENS and actual_tokens > 0:
+                observed = max(actual_tokens - _BASE_OVERHEAD_TOKENS, 0) / budget.input_tokens
+                observed = min(max(observed, _RATIO_BOUNDS[0]), _RATIO_BOUNDS[1])
+                stats.ratio += _EMA_WEIGHT * (observed - stats.ratio)
+
+    def stats(self) -> Dict:
+        """
+        估算值与实际用量统计
+
+        Returns:
+            按 "源语言->目标语言" 分组的统计
+        """
+        with self._lock:
+            return {f'{source}->{target}': stats.to_dict() for (source, target), stats in self._pairs.items()}
+
+
+_default_estimator = None
+_default_estimator_lock = threading.Lock()
+
+
+def get_token_estimator() -> TokenEstimator:
+    """
+    获取全局共享的token估算器
+
+    Returns:
+        全局估算器实例
+    """
+    global _default_estimator
+    with _default_estimator_lock:
+        if _default_estimator is None:
+            _default_estimator = TokenEstimator()
+        return _default_estimator
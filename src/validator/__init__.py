@@ -0,0 +1,9 @@
+from src.validator.base_validator import BaseValidator, ValidationResult
+from src.validator.python_validator import PythonValidator
+from src.validator.c_validator import CValidator
+from src.validator.java_validator import JavaValidator
+from src.validator.js_validator import JSValidator
+from src.validator.validator_pool import ValidatorPool, get_validator, get_validator_pool, validate_code
+
+__all__ = ["BaseValidator", "ValidationResult", "PythonValidator", "CValidator", "JavaValidator", "JSValidator",
+           "ValidatorPool", "get_validator", "get_validator_pool", "validate_code"]
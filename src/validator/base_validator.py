@@ -0,0 +1,162 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+_CLOSING = {')': '(', ']': '[', '}': '{'}
+
+
+class ValidationResult:
+    """代码验证结果"""
+
+    def __init__(self, valid: bool, errors: Optional[List[str]] = None, checker: str = '', skipped: bool = False):
+        """
+        初始化验证结果
+
+        Args:
+            valid: 是否通过验证
+            errors: 错误信息列表
+            checker: 实际使用的检查方式，如 'ast'、'cc'、'delimiters'
+            skipped: 是否因超时、缺少依赖等原因未能完成检查（此时 valid 为True）
+        """
+        self.valid = valid
+        self.errors = errors or []
+        self.checker = checker
+        self.skipped = skipped
+
+    @property
+    def message(self) -> str:
+        """合并后的错误信息"""
+        return '\n'.join(self.errors)
+
+    def to_dict(self) -> Dict:
+        return {
+            'valid': self.valid,
+            'errors': self.errors,
+            'checker': self.checker,
+            'skipped': self.skipped
+        }
+
+
+class BaseValidator(ABC):
+    """代码验证器基础抽象类"""
+
+    # 验证器对应的语言
+    LANGUAGE = ''
+
+    @abstractmethod
+    def validate(self, code: str, timeout: float) -> ValidationResult:
+        """
+        验证代码语法
+
+        Args:
+            code: 待验证的代码
+            timeout: 外部检查工具的最长运行秒数
+
+        Returns:
+            验证结果
+        """
+        pass
+
+    @staticmethod
+    def find_tool(name: str) -> Optional[str]:
+        """
+        查找外部检查工具
+
+        Args:
+            name: 可执行文件名或路径
+
+        Returns:
+            可执行文件的完整路径，不存在时返回None
+        """
+        return shutil.which(name) if name else None
+
+    @staticmethod
+    def run_tool(args: List[str], code: str, file_name: str, timeout: float) -> subprocess.CompletedProcess:
+        """
+        将代码写入临时目录后运行外部检查工具
+
+        Args:
+            args: 命令参数，其中的 '{file}' 会被替换为代码文件路径
+            code: 代码
+            file_name: 临时代码文件名（部分工具依赖扩展名或类名判断）
+            timeout: 最长运行秒数
+
+        Returns:
+            进程运行结果
+
+        Raises:
+            subprocess.TimeoutExpired: 运行超时时抛出
+        """
+        with tempfile.TemporaryDirectory(prefix='validate_') as work_dir:
+            path = os.path.join(work_dir, file_name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            return subprocess.run(
+                [arg.replace('{file}', path) for arg in args],
+                cwd=work_dir,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                errors='replace',
+                timeout=timeout
+            )
+
+    @staticmethod
+    def check_delimiters(code: str) -> ValidationResult:
+        """
+        没有可用的编译器时的后备检查：括号是否配对，跳过字符串和注释
+
+        Args:
+            code: C风格语法的代码
+
+        Returns:
+            验证结果
+        """
+        stack = []
+        line = 1
+        i = 0
+        n = len(code)
+        while i < n:
+            ch = code[i]
+            nxt = code[i + 1] if i + 1 < n else ''
+            if ch == '\n':
+                line += 1
+            elif ch == '/' and nxt == '/':
+                end = code.find('\n', i)
+                i = n if end == -1 else end
+                continue
+            elif ch == '/' and nxt == '*':
+                end = code.find('*/', i + 2)
+                if end == -1:
+                    return ValidationResult(False, [f'第{line}行: 块注释未闭合'], 'delimiters')
+                line += code.count('\n', i, end)
+                i = end + 2
+                continue
+            elif ch in ('"', "'", '`'):
+                j = i + 1
+                while j < n and code[j] != ch:
+                    if code[j] == '\\':
+                        j += 1
+                    elif code[j] == '\n':
+                        if ch != '`':
+                            return ValidationResult(False, [f'第{line}行: 字符串未闭合'], 'delimiters')
+                        line += 1
+                    j += 1
+                if j >= n:
+                    return ValidationResult(False, [f'第{line}行: 字符串未闭合'], 'delimiters')
+                i = j + 1
+                continue
+            elif ch in '([{':
+                stack.append((ch, line))
+            elif ch in _CLOSING:
+                if not stack or stack[-1][0] != _CLOSING[ch]:
+                    return ValidationResult(False, [f"第{line}行: 多余或不匹配的 '{ch}'"], 'delimiters')
+                stack.pop()
+            i += 1
+        if stack:
+            opener, opened_at = stack[-1]
+            return ValidationResult(False, [f"第{opened_at}行: '{opener}' 未闭合"], 'delimiters')
+        return ValidationResult(True, checker='delimiters')
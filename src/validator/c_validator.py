@@ -0,0 +1,47 @@
+import re
+import subprocess
+
+from src.validator.base_validator import BaseValidator, ValidationResult
+from config.app_config import AppConfig
+
+# 编译器诊断行：文件:行:列: [fatal ]error: 信息
+_DIAGNOSTIC = re.compile(r'^[^:\n]+:(\d+):(?:\d+:)?\s*(fatal error|error):\s*(.*)$', re.MULTILINE)
+_MISSING_HEADER = re.compile(r'No such file or directory|file not found')
+# 返回的最大错误条数
+_MAX_ERRORS = 20
+
+
+class CValidator(BaseValidator):
+    """C代码验证器，使用本地编译器的 -fsyntax-only 检查语法，没有编译器时只检查括号配对"""
+
+    LANGUAGE = 'c'
+
+    def validate(self, code: str, timeout: float) -> ValidationResult:
+        """
+        验证C代码语法
+
+        Args:
+            code: 待验证的代码
+            timeout: 编译器的最长运行秒数
+
+        Returns:
+            验证结果
+        """
+        compiler = self.find_tool(AppConfig.C_COMPILER)
+        if compiler is None:
+            return self.check_delimiters(code)
+
+        try:
+            completed = self.run_tool([compiler, '-fsyntax-only', '-w', '-x', 'c', '{file}'],
+                                      code, 'converted.c', timeout)
+        except subprocess.TimeoutExpired:
+            return ValidationResult(True, ['语法检查超时'], 'cc', skipped=True)
+
+        if completed.returncode == 0:
+            return ValidationResult(True, checker='cc')
+
+        errors = [f'第{line}行: {message}' for line, kind, message in _DIAGNOSTIC.findall(completed.stderr)]
+        if any(_MISSING_HEADER.search(error) for error in errors):
+            # 单独检查一个文件时找不到项目内的头文件，退回到括号配对检查
+            return self.check_delimiters(code)
+        return ValidationResult(False, errors[:_MAX_ERRORS] or [completed.stderr.strip()], 'cc')
@@ -0,0 +1,52 @@
+import re
+import subprocess
+
+from src.validator.base_validator import BaseValidator, ValidationResult
+from config.app_config import AppConfig
+
+_PUBLIC_TYPE = re.compile(r'\bpublic\s+(?:(?:abstract|final|sealed|static)\s+)*(?:class|interface|enum|record|@interface)\s+(\w+)')
+_DIAGNOSTIC = re.compile(r'^[^:\n]+\.java:(\d+):\s*error:\s*(.*)$', re.MULTILINE)
+# 单独编译一个文件时由缺少项目内其他类引起的错误，不属于语法问题
+_MISSING_DEPENDENCY = re.compile(r'cannot find symbol|package \S+ does not exist|static import only from classes')
+# 返回的最大错误条数
+_MAX_ERRORS = 20
+
+
+class JavaValidator(BaseValidator):
+    """Java代码验证器，使用本地 javac 编译检查，没有JDK时只检查括号配对"""
+
+    LANGUAGE = 'java'
+
+    def validate(self, code: str, timeout: float) -> ValidationResult:
+        """
+        验证Java代码语法
+
+        Args:
+            code: 待验证的代码
+            timeout: javac的最长运行秒数
+
+        Returns:
+            验证结果
+        """
+        javac = self.find_tool(AppConfig.JAVAC_EXECUTABLE)
+        if javac is None:
+            return self.check_delimiters(code)
+
+        # 公共类必须位于同名文件中
+        match = _PUBLIC_TYPE.search(code)
+        file_name = f'{match.group(1)}.java' if match else 'Converted.java'
+        try:
+            completed = self.run_tool([javac, '-proc:none', '-implicit:none', '-nowarn', '-d', '.', '{file}'],
+                                      code, file_name, timeout)
+        except subprocess.TimeoutExpired:
+            return ValidationResult(True, ['语法检查超时'], 'javac', skipped=True)
+
+        if completed.returncode == 0:
+            return ValidationResult(True, checker='javac')
+
+        errors = [f'第{line}行: {message}' for line, message in _DIAGNOSTIC.findall(completed.stdout + completed.stderr)]
+        syntax_errors = [error for error in errors if not _MISSING_DEPENDENCY.search(error)]
+        if errors and not syntax_errors:
+            # 只缺少项目内其他类时退回到括号配对检查
+            return self.check_delimiters(code)
+        return ValidationResult(False, syntax_errors[:_MAX_ERRORS] or [completed.stderr.strip()], 'javac')
@@ -0,0 +1,50 @@
+import re
+import subprocess
+
+from src.validator.base_validator import BaseValidator, ValidationResult
+from config.app_config import AppConfig
+
+# 使用ES模块语法的代码需要以 .mjs 检查
+_ES_MODULE = re.compile(r'^\s*(?:import\s+[\w*{"\']|import\s*\{|export\s)', re.MULTILINE)
+# JSX标签：'<' 后紧跟大写组件名或常见HTML标签
+_JSX = re.compile(r'(?:return|=>|=|\()\s*<[A-Za-z][\w.]*[\s/>]')
+# node --check 报错时输出的行号
+_NODE_LOCATION = re.compile(r'^\S+:(\d+)\s*$', re.MULTILINE)
+_NODE_MESSAGE = re.compile(r'^(SyntaxError: .*)$', re.MULTILINE)
+
+
+class JSValidator(BaseValidator):
+    """JavaScript代码验证器，使用 node --check 检查语法，没有Node.js或代码包含JSX时只检查括号配对"""
+
+    LANGUAGE = 'js'
+
+    def validate(self, code: str, timeout: float) -> ValidationResult:
+        """
+        验证JavaScript代码语法
+
+        Args:
+            code: 待验证的代码
+            timeout: Node.js的最长运行秒数
+
+        Returns:
+            验证结果
+        """
+        node = self.find_tool(AppConfig.NODE_EXECUTABLE)
+        if node is None or _JSX.search(code):
+            return self.check_delimiters(code)
+
+        file_name = 'converted.mjs' if _ES_MODULE.search(code) else 'converted.js'
+        try:
+            completed = self.run_tool([node, '--check', '{file}'], code, file_name, timeout)
+        except subprocess.TimeoutExpired:
+            return ValidationResult(True, ['语法检查超时'], 'node', skipped=True)
+
+        if completed.returncode == 0:
+            return ValidationResult(True, checker='node')
+
+        location = _NODE_LOCATION.search(completed.stderr)
+        message = _NODE_MESSAGE.search(completed.stderr)
+        error = message.group(1) if message else completed.stderr.strip()
+        if location:
+            error = f'第{location.group(1)}行: {error}'
+        return ValidationResult(False, [error], 'node')
@@ -0,0 +1,28 @@
+from src.validator.base_validator import BaseValidator, ValidationResult
+
+
+class PythonValidator(BaseValidator):
+    """Python代码验证器，使用内置编译器检查语法"""
+
+    LANGUAGE = 'python'
+
+    def validate(self, code: str, timeout: float) -> ValidationResult:
+        """
+        验证Python代码语法
+
+        Args:
+            code: 待验证的代码
+            timeout: 未使用，语法检查在当前进程内完成
+
+        Returns:
+            验证结果
+        """
+        try:
+            # compile 比 ast.parse 多检查 return 在函数外等编译期错误
+            compile(code, '<converted>', 'exec', dont_inherit=True)
+        except SyntaxError as e:
+            return ValidationResult(False, [f'第{e.lineno}行: {e.msg}'], 'compile')
+        except ValueError as e:
+            # 源码中包含空字符等
+            return ValidationResult(False, [str(e)], 'compile')
+        return ValidationResult(True, checker='compile')
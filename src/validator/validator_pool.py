@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from typing import Dict, List, Optional, Tuple, Type
+
+from src.validator.base_validator import BaseValidator, ValidationResult
+from src.validator.c_validator import CValidator
+from src.validator.java_validator import JavaValidator
+from src.validator.js_validator import JSValidator
+from src.validator.python_validator import PythonValidator
+from src.utils.metrics import observe_stage
+from config.app_config import AppConfig
+
+_VALIDATORS: Dict[str, Type[BaseValidator]] = {
+    'python': PythonValidator,
+    'c': CValidator,
+    'java': JavaValidator,
+    'js': JSValidator
+}
+# 等待结果时在检查超时之外额外预留的秒数（进程调度、启动解释器等）
+_RESULT_GRACE = 5.0
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_validator(lang: str) -> Optional[BaseValidator]:
+    """
+    获取语言对应的验证器
+
+    Args:
+        lang: 代码语言
+
+    Returns:
+        验证器实例，不支持的语言返回None
+    """
+    validator_class = _VALIDATORS.get(lang)
+    return validator_class() if validator_class else None
+
+
+def validate_code(lang: str, code: str, timeout: Optional[float] = None) -> ValidationResult:
+    """
+    在当前进程中验证代码
+
+    Args:
+        lang: 代码语言
+        code: 待验证的代码
+        timeout: 外部检查工具的最长运行秒数，默认读取 AppConfig.VALIDATION_TIMEOUT
+
+    Returns:
+        验证结果，不支持的语言视为跳过
+    """
+    if not code or not code.strip():
+        return ValidationResult(False, ['代码为空'])
+    validator = get_validator(lang)
+    if validator is None:
+        return ValidationResult(True, checker='none', skipped=True)
+    return validator.validate(code, timeout or AppConfig.VALIDATION_TIMEOUT)
+
+
+class ValidatorPool:
+    """在独立进程中并行验证代码，避免语法检查占用GIL或阻塞请求线程"""
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        初始化验证进程池
+
+        Args:
+            max_workers: 进程数，默认读取 AppConfig.VALIDATION_WORKERS，为0时使用CPU核数
+            timeout: 单个文件的检查超时秒数，默认读取 AppConfig.VALIDATION_TIMEOUT
+        """
+        self.max_workers = max_workers or AppConfig.VALIDATION_WORKERS or os.cpu_count() or 1
+        self.timeout = timeout or AppConfig.VALIDATION_TIMEOUT
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Web服务是多线程的，使用spawn避免fork时复制其他线程持有的锁
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def submit(self, lang: str, code: str) -> Future:
+        """
+        提交验证任务，立即返回
+
+        Args:
+            lang: 代码语言
+            code: 待验证的代码
+
+        Returns:
+            结果为 ValidationResult 的Future，应通过 result 方法获取
+        """
+        future = self._get_executor().submit(validate_code, lang, code, self.timeout)
+        # 耗时包含在进程池中排队的时间
+        submitted_at = time.perf_counter()
+        future.add_done_callback(lambda _: observe_stage('validate', time.perf_counter() - submitted_at))
+        return future
+
+    def result(self, future: Future, timeout: Optional[float] = None) -> ValidationResult:
+        """
+        获取验证结果；超时或进程异常时视为跳过，不阻塞转换流程
+
+        Args:
+            future: submit 返回的Future
+            timeout: 最长等待秒数，默认为检查超时加上预留时间
+
+        Returns:
+            验证结果
+        """
+        try:
+            return future.result(timeout=timeout or self.timeout + _RESULT_GRACE)
+        except TimeoutError:
+            future.cancel()
+            return ValidationResult(True, ['语法检查超时'], skipped=True)
+        except Exception as e:
+            self._reset_if_broken()
+            return ValidationResult(True, [f'语法检查失败: {str(e)}'], skipped=True)
+
+    def validate(self, lang: str, code: str) -> ValidationResult:
+        """
+        验证单段代码，阻塞到结果返回或超时
+
+        Args:
+            lang: 代码语言
+            code: 待验证的代码
+
+        Returns:
+            验证结果
+        """
+        return self.result(self.submit(lang, code))
+
+    def validate_many(self, items: List[Tuple[str, str]]) -> List[ValidationResult]:
+        """
+        并行验证多段代码
+
+        Args:
+            items: (代码语言, 代码) 列表
+
+        Returns:
+            与输入顺序一致的验证结果列表
+        """
+        futures = [self.submit(lang, code) for lang, code in items]
+        return [self.result(future) for future in futures]
+
+    def _reset_if_broken(self):
+        with self._lock:
+            # 工作进程异常退出后进程池不可再用，下次提交时重建
+            if self._executor is not None and getattr(self._executor, '_broken', False):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def get_validator_pool() -> ValidatorPool:
+    """
+    获取按 AppConfig 配置创建的全局验证进程池
+
+    Returns:
+        全局验证进程池
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ValidatorPool()
+        return _default_pool
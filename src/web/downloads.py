@@ -0,0 +1,102 @@
+import os
+import secrets
+import threading
+import time
+from typing import Dict, Optional
+
+
+class DownloadArtifact:
+    """可下载的任务结果文件"""
+
+    def __init__(self, token: str, job_id: str, path: str, download_name: str):
+        """
+        初始化下载记录
+
+        Args:
+            token: 下载令牌
+            job_id: 所属任务ID
+            path: 文件路径，只在服务端使用，不出现在URL中
+            download_name: 下载时的文件名
+        """
+        self.token = token
+        self.job_id = job_id
+        self.path = path
+        self.download_name = download_name
+        self.created_at = time.time()
+
+    @property
+    def available(self) -> bool:
+        """文件是否仍然存在"""
+        return os.path.isfile(self.path)
+
+
+class DownloadRegistry:
+    """任务结果的下载令牌：令牌随机生成、不含路径信息，按任务登记；
+    任务的工作目录被清理时由调用方撤销该任务的令牌，在此之前可以重复和断点续传下载
+    """
+
+    def __init__(self):
+        self._artifacts: Dict[str, DownloadArtifact] = {}
+        self._by_job: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def issue(self, job_id: str, path: str, download_name: str) -> DownloadArtifact:
+        """
+        为任务的结果文件签发下载令牌
+
+        Args:
+            job_id: 任务ID
+            path: 结果文件路径
+            download_name: 下载时的文件名
+
+        Returns:
+            下载记录
+        """
+        artifact = DownloadArtifact(secrets.token_urlsafe(24), job_id, path, download_name)
+        with self._lock:
+            self._artifacts[artifact.token] = artifact
+            self._by_job.setdefault(job_id, set()).add(artifact.token)
+        return artifact
+
+    def resolve(self, token: str) -> Optional[DownloadArtifact]:
+        """
+        查找令牌对应的下载记录
+
+        Args:
+            token: 下载令牌
+
+        Returns:
+            下载记录，令牌无效或已撤销时返回None
+        """
+        with self._lock:
+            return self._artifacts.get(token)
+
+    def for_job(self, job_id: str) -> Optional[DownloadArtifact]:
+        """
+        任务最近签发的下载记录
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            下载记录，任务没有可下载的结果时返回None
+        """
+        with self._lock:
+            artifacts = [self._artifacts[token] for token in self._by_job.get(job_id, ())]
+        return max(artifacts, key=lambda artifact: artifact.created_at, default=None)
+
+    def revoke_job(self, job_id: str) -> int:
+        """
+        撤销任务的所有下载令牌
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            撤销的令牌数
+        """
+        with self._lock:
+            tokens = self._by_job.pop(job_id, set())
+            for token in tokens:
+                self._artifacts.pop(token, None)
+        return len(tokens)
@@ -1,11 +1,11 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory, Response
+from flask import Flask, render_template, request, jsonify, send_file, redirect, Response
 import sys
 import os
 import logging
-import tempfile
-import zipfile
 import shutil
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 from werkzeug.utils import secure_filename
+import zipfile
 import time
 import threading
 import json  # 添加json模块导入
@@ -13,24 +13,41 @@ import json  # 添加json模块导入
 # 将项目根目录添加到 Python 路径
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.api_client.deepseek_client import DeepSeekAPIClient
+from src.api_client.registry import ClientRegistry, build_api_client
 from src.converter.general_converter import GeneralConverter
 from src.converter.c_converter import CConverter
 from src.converter.python_converter import PythonConverter
-from config.api_config import APIConfig
+from src.pipeline.worker_pool import ConversionPool
+from src.pipeline.job_queue import Job, JobCancelled, JobQueue, JobStatus
+from src.utils.file_operate import DirectorySource, StreamingZipWriter, ZipSource, normalize_member_name
+from src.pipeline.file_index import ProjectIndex
+from src.pipeline.dependency_graph import DependencyGraph, summarize_symbols
+from src.pipeline.repair import RepairStage
+from src.pipeline.batch import BatchConverter, BatchItem
+from src.pipeline.progress import ProgressTracker, get_progress_bus
+from src.pipeline.manifest import get_project_manifest, make_project_key
+from src.pipeline.workspace import WorkspaceManager
+from src.pipeline.similarity import SimilarityMethod, SimilarityReuser, get_similarity_store
+from src.web.downloads import DownloadRegistry
+from src.web.upload import UploadQuota, configure_upload_limits
+from src.validator.validator_pool import get_validator_pool
+from src.utils.token_estimator import get_token_estimator
+from src.utils.logger import SAMPLED, setup_logging
+from src.utils.metrics import FILES, get_metrics_registry, observe_stage, stage_timer
+from config.app_config import AppConfig
 
-# 设置日志
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', stream=sys.stdout)
+# 设置日志，级别读取 AppConfig.LOG_LEVEL
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# 上传配额在接收请求体时逐块检查，大文件写入磁盘临时文件
+configure_upload_limits(app)
+# 由前端服务器（Apache mod_xsendfile、lighttpd等）直接发送下载文件
+app.config['USE_X_SENDFILE'] = AppConfig.USE_X_SENDFILE
 
-# 初始化 API 客户端
-api_client = DeepSeekAPIClient(
-    api_key=APIConfig.DEEPSEEK_API_KEY,
-    api_base=APIConfig.DEEPSEEK_API_BASE,
-    model=APIConfig.DEEPSEEK_MODEL
-)
+# 初始化 API 客户端（配置了 API_BACKENDS 时为多后端注册表）
+api_client = build_api_client()
 
 # 初始化转换器
 converter_map = {
@@ -44,16 +61,53 @@ converter_map = {
 def get_converter(lang: str) -> GeneralConverter:
     return converter_map.get(lang, converter_map['default'])
 
-# 用于存储转换进度的字典
-progress_dict = {}
+def _collect_queue_metrics():
+    registry = get_metrics_registry()
+    jobs = registry.gauge('jobs', '各状态的后台任务数', ['status'])
+    for status, count in job_queue.status_counts().items():
+        jobs.set(count, status=status)
+    if isinstance(api_client, ClientRegistry):
+        outstanding = registry.gauge('backend_outstanding_requests', '各API后端的在途请求数', ['backend'])
+        for backend in api_client.stats()['backends']:
+            outstanding.set(backend['outstanding'], backend=backend['name'])
+
+# 项目转换进度总线：状态变化时推送给订阅者，配置 PROGRESS_DB_PATH 时在多个服务进程间共享
+progress_bus = get_progress_bus()
+
+# 项目转换后台任务队列
+job_queue = JobQueue()
+# 避免同一任务被并发续转
+resume_lock = threading.Lock()
+get_metrics_registry().add_collector(_collect_queue_metrics)
+
+def _job_in_use(job_id: str) -> bool:
+    job = job_queue.get(job_id)
+    return job is not None and not job.finished
+
+def _forget_job(job_id: str):
+    job_queue.discard(job_id)
+    progress_bus.discard(job_id)
+    download_registry.revoke_job(job_id)
+
+# 任务结果的下载令牌，工作目录清理前可以重复下载和断点续传
+download_registry = DownloadRegistry()
+
+# 项目转换工作目录：任务结束后超过保留时间或总占用超出上限时由后台线程清理，任务和进度记录一并删除
+workspace_manager = WorkspaceManager(in_use=_job_in_use, on_remove=_forget_job)
+workspace_manager.start()
 
 # 支持的代码文件扩展名
-supported_extensions = {
-    'c': ['.c', '.h'],
-    'python': ['.py'],
-    'java': ['.java'],
-    'js': ['.js', '.jsx']
-}
+supported_extensions = AppConfig.SUPPORTED_EXTENSIONS
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """上传超出配额时返回JSON格式的413"""
+    error = e.description
+    if error == RequestEntityTooLarge.description:
+        # 请求体长度超过 MAX_CONTENT_LENGTH 时在读取前即被拒绝
+        error = f'上传文件总大小超过上限 {AppConfig.UPLOAD_MAX_BYTES} 字节'
+    logger.warning(f'上传超出配额: {error}')
+    return jsonify({'success': False, 'error': error}), 413
 
 @app.route('/')
 def index():
@@ -95,35 +149,108 @@ def convert_code():
             'error': str(e)
         }), 500
 
+@app.route('/api/convert-batch', methods=['POST'])
+def convert_batch():
+    """批量代码转换 API，小段代码打包进共享提示并发转换，返回每段代码的结果或错误"""
+    data = request.get_json(silent=True) or {}
+    raw_items = data.get('items')
+    if not isinstance(raw_items, list) or not raw_items:
+        return jsonify({'success': False, 'error': 'items 必须是非空列表'}), 400
+    if len(raw_items) > AppConfig.BATCH_MAX_ITEMS:
+        return jsonify({'success': False, 'error': f'单次最多转换 {AppConfig.BATCH_MAX_ITEMS} 段代码'}), 400
+    
+    items = []
+    seen_ids = set()
+    for position, raw in enumerate(raw_items):
+        if not isinstance(raw, dict):
+            return jsonify({'success': False, 'error': f'第 {position + 1} 项格式错误'}), 400
+        item_id = raw.get('id')
+        source_lang = raw.get('source_lang')
+        target_lang = raw.get('target_lang')
+        code = raw.get('code')
+        if item_id is None or not all([source_lang, target_lang, code]):
+            return jsonify({'success': False, 'error': f'第 {position + 1} 项缺少必要参数'}), 400
+        if not isinstance(item_id, (str, int)) or item_id in seen_ids:
+            return jsonify({'success': False, 'error': f'第 {position + 1} 项的 id 无效或重复'}), 400
+        seen_ids.add(item_id)
+        items.append(BatchItem(item_id, source_lang, target_lang, code))
+    
+    batch_converter = BatchConverter(get_converter)
+    results = batch_converter.convert(items)
+    logger.info(f'批量转换完成: {batch_converter.stats}')
+    
+    return jsonify({
+        'success': True,
+        'results': [result.to_dict() for result in results],
+        'stats': batch_converter.stats
+    })
+
+@app.route('/api/convert-stream', methods=['POST'])
+def convert_code_stream():
+    """代码转换流式 API，以SSE逐段推送转换结果"""
+    data = request.get_json(silent=True) or {}
+    source_lang = data.get('source_lang')
+    target_lang = data.get('target_lang')
+    code = data.get('code')
+    
+    if not all([source_lang, target_lang, code]):
+        return jsonify({'error': '缺少必要参数'}), 400
+    
+    # 获取适合的转换器
+    converter = get_converter(source_lang)
+    
+    def generate():
+        parts = []
+        try:
+            for delta in converter.convert_stream(source_lang, target_lang, code):
+                parts.append(delta)
+                yield f'data: {json.dumps({"delta": delta}, ensure_ascii=False)}\n\n'
+            # 最后发送完整结果，客户端可用它替换拼接内容
+            yield f'data: {json.dumps({"done": True, "result": "".join(parts).strip()}, ensure_ascii=False)}\n\n'
+        except Exception as e:
+            logger.error(f'流式转换失败: {str(e)}')
+            yield f'data: {json.dumps({"error": str(e)}, ensure_ascii=False)}\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/convert-project', methods=['POST'])
 def convert_project():
-    """项目代码转换 API"""
+    """项目代码转换 API，保存上传文件后提交后台任务并立即返回任务ID"""
+    # 上传耗时从解析请求体开始计算
+    upload_started = time.perf_counter()
     try:
-        logger.info('收到转换请求！')
-        logger.info(f'请求表单数据: {request.form}')
-        logger.info(f'请求文件数据: {request.files}')
-        
         source_lang = request.form.get('source_lang')
         target_lang = request.form.get('target_lang')
         upload_type = request.form.get('type')  # 获取上传类型：'folder' 或 'zip'
-        is_folder = upload_type == 'folder'  # 判断是否是文件夹上传
+        # 项目名称：同名项目再次上传时只转换内容变化的文件，默认取上传的文件夹名或ZIP文件名
+        project_name = request.form.get('project', '').strip()
+        # 文件筛选选项：包含/排除模式（逗号或换行分隔），是否遵循 .gitignore
+        index_options = {
+            'include': _split_patterns(request.form.get('include', '')),
+            'exclude': _split_patterns(request.form.get('exclude', '')),
+            'use_gitignore': request.form.get('use_gitignore', 'true').lower() != 'false'
+        }
         
-        logger.info(f'转换参数: source_lang={source_lang}, target_lang={target_lang}, upload_type={upload_type}, is_folder={is_folder}')
+        logger.info('收到项目转换请求', extra={'source_lang': source_lang, 'target_lang': target_lang,
+                                                'upload_type': upload_type})
         
         if not source_lang or not target_lang:
             logger.error('缺少必要参数')
             return jsonify({'success': False, 'error': '缺少必要参数'}), 400
         
-        # 创建持久的临时目录
-        temp_dir = tempfile.mkdtemp(prefix='project_convert_')
+        # 创建任务工作目录，任务提交前不会被清理
+        workspace = workspace_manager.create()
+        temp_dir = workspace.path
         
-        # 生成唯一的进度ID
-        progress_id = os.path.basename(temp_dir)
-        progress_dict[progress_id] = {'current': 0, 'total': 0, 'current_file': '', 'status': 'preparing'}
+        # 生成唯一的进度ID，同时作为任务ID
+        progress_id = workspace.id
         
+        saved = False
         try:
             extract_dir = os.path.join(temp_dir, 'extracted')
             os.makedirs(extract_dir, exist_ok=True)
+            zip_paths = []
             
             if upload_type == 'folder':
                 # 处理文件夹上传
@@ -144,14 +271,17 @@ def convert_project():
                     if file.filename == '':
                         continue
                     
-                    logger.info(f'收到文件: {file.filename}')
-                    
                     # 使用file.filename获取文件的原始名称
                     original_filename = file.filename
-                    # 构建相对路径
-                    relative_path = original_filename
+                    # 构建相对路径，拒绝越出目录的路径
+                    relative_path = normalize_member_name(original_filename)
+                    if relative_path is None:
+                        logger.error(f'忽略不安全的文件路径: {original_filename}')
+                        continue
+                    if not project_name and '/' in relative_path:
+                        project_name = relative_path.split('/', 1)[0]
                     file_path = os.path.join(extract_dir, relative_path)
-                    logger.info(f'保存文件: {relative_path} 到 {file_path}')
+                    logger.debug('保存文件: %s', relative_path, extra=SAMPLED)
                     # 创建父目录
                     os.makedirs(os.path.dirname(file_path), exist_ok=True)
                     # 保存文件
@@ -179,140 +309,62 @@ def convert_project():
                         logger.error(f'文件 {file.filename} 不是有效的ZIP文件')
                         continue
                     
-                    # 保存ZIP文件
-                    zip_path = os.path.join(temp_dir, file.filename)
+                    # 保存ZIP文件，后台任务直接读取其中的成员，不再解压
+                    zip_path = os.path.join(temp_dir, secure_filename(file.filename) or 'upload.zip')
+                    if not project_name:
+                        project_name = os.path.splitext(os.path.basename(zip_path))[0]
                     logger.info(f'保存ZIP文件: {file.filename} 到 {zip_path}')
                     file.save(zip_path)
-                    
-                    # 解压缩ZIP文件到extract_dir
-                    logger.info(f'解压缩ZIP文件到: {extract_dir}')
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(extract_dir)
-                        
-                    # 记录解压缩后的目录结构
-                    logger.info(f'解压缩后extract_dir内容: {os.listdir(extract_dir)}')
-                    for root, dirs, files in os.walk(extract_dir):
-                        for name in files:
-                            logger.info(f'  - {os.path.join(root, name)}')
-            
-            # 查找所有需要转换的文件
-            all_files = []
-            logger.info(f'开始查找需要转换的文件，extract_dir={extract_dir}')
-            logger.info(f'支持的扩展名: {supported_extensions.get(source_lang, [])}')
-            
-            # 检查extract_dir是否存在
-            if not os.path.exists(extract_dir):
-                logger.error(f'extract_dir不存在: {extract_dir}')
-            else:
-                # 先列出extract_dir目录下的所有文件
-                try:
-                    dir_contents = os.listdir(extract_dir)
-                    logger.info(f'extract_dir目录内容: {dir_contents}')
-                except Exception as e:
-                    logger.error(f'无法读取extract_dir目录: {e}')
-            
-            # 遍历目录查找需要转换的文件
-            try:
-                for root, _, files in os.walk(extract_dir):
-                    logger.info(f'遍历目录: {root}, 文件列表: {files}')
-                    for file_name in files:
-                        # 检查文件扩展名
-                        file_ext = os.path.splitext(file_name)[1].lower()
-                        logger.info(f'检查文件: {file_name}, 扩展名: {file_ext}')
-                        if file_ext in supported_extensions.get(source_lang, []):
-                            file_path = os.path.join(root, file_name)
-                            all_files.append(file_path)
-                            logger.info(f'添加文件到转换列表: {file_path}')
-            except Exception as e:
-                logger.error(f'遍历目录时出错: {e}')
-                import traceback
-                traceback.print_exc()
-            
-            logger.info(f'找到需要转换的文件: {all_files}')
-            # 更新总文件数
-            progress_dict[progress_id]['total'] = len(all_files)
-            progress_dict[progress_id]['status'] = 'converting'
-            
-            # 转换代码文件
-            converted_files = []
-            
-            for index, file_path in enumerate(all_files):
-                file_name = os.path.basename(file_path)
-                
-                # 更新当前转换文件
-                progress_dict[progress_id]['current_file'] = file_name
-                progress_dict[progress_id]['current_file_status'] = 'converting'
-                progress_dict[progress_id]['current'] = index + 1
+                    zip_paths.append(zip_path)
                 
-                try:
-                    # 读取文件内容
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        code = f.read()
-                    
-                    # 转换代码
-                    # 获取适合的转换器
-                    file_converter = get_converter(source_lang)
-                    converted_code = file_converter.convert(source_lang, target_lang, code)
-                    
-                    # 获取目标文件扩展名
-                    target_ext = supported_extensions.get(target_lang, [''])[0]
-                    
-                    # 重命名文件
-                    target_file_name = os.path.splitext(file_name)[0] + target_ext
-                    target_file_path = os.path.join(os.path.dirname(file_path), target_file_name)
-                    
-                    # 写入转换后的代码
-                    with open(target_file_path, 'w', encoding='utf-8') as f:
-                        f.write(converted_code)
-                    
-                    # 如果扩展名不同，删除原文件
-                    if os.path.splitext(file_name)[1].lower() != target_ext:
-                        os.remove(file_path)
-                    
-                    # 更新进度，添加更详细的信息
-                    progress_dict[progress_id]['current_file_status'] = 'completed'
-                    
-                    # 记录转换后的文件
-                    relative_path = os.path.relpath(target_file_path, extract_dir)
-                    converted_files.append(relative_path)
-                    
-                except Exception as e:
-                    # 记录转换错误
-                    progress_dict[progress_id]['error'] = str(e)
-                    progress_dict[progress_id]['status'] = 'error'
-                    # 清理临时目录
-                    shutil.rmtree(extract_dir, ignore_errors=True)
-                    return jsonify({'success': False, 'error': f'转换文件 {file_name} 时出错: {str(e)}'})
-            
-            # 压缩转换后的文件
-            result_zip_path = os.path.join(temp_dir, 'converted_project.zip')
-            
-            with zipfile.ZipFile(result_zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
-                for root, _, files in os.walk(extract_dir):
-                    for file_name in files:
-                        file_path = os.path.join(root, file_name)
-                        arcname = os.path.relpath(file_path, extract_dir)
-                        zip_ref.write(file_path, arcname)
+                # 按解压后的成员检查配额，所有ZIP的成员合计
+                archive_quota = UploadQuota()
+                for zip_path in zip_paths:
+                    try:
+                        archive_quota.check_zip(zip_path)
+                    except zipfile.BadZipFile:
+                        logger.error(f'无法读取ZIP文件: {os.path.basename(zip_path)}')
+                        return jsonify({'success': False, 'error': f'无法读取ZIP文件: {os.path.basename(zip_path)}'}), 400
             
-            # 更新进度为完成
-            progress_dict[progress_id]['status'] = 'completed'
-            
-            # 返回转换结果
-            return jsonify({
-                'success': True,
-                'files': converted_files,
-                'download_url': f'/download/{os.path.basename(result_zip_path)}?temp_dir={temp_dir}',
-                'progress_id': progress_id
-            })
-            
-        except Exception as e:
-            # 更新进度为错误
-            if progress_id in progress_dict:
-                progress_dict[progress_id]['status'] = 'error'
-            # 清理临时目录
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            raise e
+            saved = True
+        finally:
+            # 请求无效或上传失败时删除工作目录
+            if not saved:
+                workspace_manager.remove(progress_id)
+        
+        observe_stage('upload', time.perf_counter() - upload_started)
+        
+        # 上传完成后再发布进度，订阅者从 preparing 状态开始接收
+        tracker = ProgressTracker(progress_bus, progress_id)
+        tracker.set_status('preparing')
+        
+        # 提交后台任务，转换参数保存在任务中供续转使用
+        conversion = {
+            'extract_dir': extract_dir,
+            'zip_paths': zip_paths,
+            'source_lang': source_lang,
+            'target_lang': target_lang,
+            'index_options': index_options,
+            'project': project_name
+        }
+        try:
+            job = job_queue.submit(run_project_conversion, temp_dir, job_id=progress_id,
+                                   metadata={'temp_dir': temp_dir, 'progress': tracker, 'conversion': conversion},
+                                   **conversion)
+        finally:
+            # 之后由任务状态判断工作目录是否仍在使用
+            workspace_manager.release(progress_id)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'progress_id': progress_id
+        }), 202
             
+    except HTTPException:
+        # 上传超出配额等请求错误交给对应的错误处理函数
+        raise
     except Exception as e:
         logger.error(f'项目转换失败: {str(e)}')
         return jsonify({
@@ -320,63 +372,455 @@ def convert_project():
             'error': str(e)
         }), 500
 
-@app.route('/api/progress/<progress_id>')
-def progress_stream(progress_id):
-    """进度流 SSE 端点"""
-    def generate():
-        while True:
-            if progress_id not in progress_dict:
-                yield f'data: {{"error": "进度ID不存在"}}\n\n'
-                break
+def _split_patterns(value: str) -> list:
+    """将逗号或换行分隔的模式字符串拆分为列表"""
+    return [p.strip() for p in value.replace(',', '\n').splitlines() if p.strip()]
+
+def _drain_repair_stage(repair_stage, manifest):
+    """任务中止时等待已转换文件的验证结束，使其结果记入清单，续转时不再重复转换"""
+    if repair_stage is None or manifest is None:
+        return
+    # 不再发起新的修复，正在进行的验证结束即作为最终结果
+    repair_stage.cancel()
+    repair_stage.wait(timeout=AppConfig.VALIDATION_TIMEOUT)
+
+def run_project_conversion(job: Job, temp_dir: str, extract_dir: str, zip_paths: list,
+                           source_lang: str, target_lang: str, index_options: dict = None,
+                           project: str = '') -> dict:
+    """
+    后台执行项目转换：直接读取上传的ZIP成员或文件夹文件，转换结果和原样保留的文件在完成时即写入结果ZIP；
+    每个文件的最终结果记录到项目清单，清单中输入未变化的文件直接复用，不再调用API
+    
+    Args:
+        job: 当前任务
+        temp_dir: 任务临时目录
+        extract_dir: 文件夹上传时的源文件目录
+        zip_paths: 上传的ZIP文件路径列表，非空时直接从ZIP读取
+        source_lang: 源代码语言
+        target_lang: 目标代码语言
+        index_options: 传给 ProjectIndex.build 的文件筛选选项
+        project: 项目名称，为空时不使用项目清单
+        
+    Returns:
+        转换结果，包括转换后的文件列表、索引统计、增量转换统计和下载地址
+    """
+    progress = job.metadata.get('progress') or ProgressTracker(progress_bus, job.id)
+    manifest = get_project_manifest() if project else None
+    project_key = make_project_key(project, source_lang, target_lang)
+    # 直接复用清单结果的文件
+    reused_files = set()
+    source = None
+    writer = None
+    repair_stage = None
+    
+    try:
+        source = ZipSource(zip_paths) if zip_paths else DirectorySource(extract_dir)
+        
+        # 建立文件索引：筛选、跳过二进制/超大/生成文件，并对相同内容去重
+        with stage_timer('discovery'):
+            index = ProjectIndex.build(source, source_lang, **(index_options or {}))
+        all_files = [entry.path for entry in index.unique_entries]
+        # 非源码文件和被跳过的源码文件原样保留
+        passthrough_files = index.passthrough + sorted(index.skipped)
+        
+        for rel_path, reason in index.skipped.items():
+            logger.debug('跳过文件 %s: %s', rel_path, reason, extra=SAMPLED)
+        logger.info('项目索引完成', extra=index.summary())
+        FILES.inc(len(index.skipped), status='skipped')
+        FILES.inc(len(index.passthrough), status='passthrough')
+        
+        # 按导入关系分层：每层只依赖之前各层的文件，层内并行转换
+        graph = None
+        waves = [all_files]
+        if AppConfig.DEPENDENCY_ORDERING:
+            with stage_timer('discovery'):
+                graph = DependencyGraph.build(source, all_files, source_lang,
+                                              aliases={entry.path: entry.duplicate_of for entry in index.duplicates})
+            waves = graph.waves()
+            logger.info(f'依赖分层: {len(waves)} 层, 每层文件数 {[len(wave) for wave in waves]}')
+        # 更新总文件数
+        progress.set_status('converting', total=len(all_files))
+        
+        # 结果ZIP边转换边写入，下载可以在转换完成前开始
+        writer = StreamingZipWriter(os.path.join(temp_dir, 'converted_project.zip'))
+        job.metadata['result_writer'] = writer
+        
+        # 先写入不需要转换的文件
+        for rel_path in passthrough_files:
+            job.check_cancelled()
+            with source.open(rel_path) as f:
+                writer.write_stream(writer.reserve_name(rel_path), f)
+        
+        # 转换代码文件
+        file_converter = get_converter(source_lang)
+        # 获取目标文件扩展名
+        target_ext = supported_extensions.get(target_lang, [''])[0]
+        # 有重复文件的转换结果需要保留，供重复文件复用
+        duplicate_sources = {entry.duplicate_of for entry in index.duplicates}
+        duplicate_results = {}
+        # 被其他文件依赖的文件在转换后生成符号摘要，附加到依赖它的文件的提示中
+        summary_sources = graph.depended_on() if graph is not None else set()
+        symbol_summaries = {}
+        # 转换结果先验证，未通过的文件带上错误信息修复，与后续文件的转换并行进行
+        if AppConfig.VALIDATION_ENABLED:
+            repair_stage = RepairStage(file_converter, source_lang, target_lang, get_validator_pool())
+        # 结构相同或相似的文件分组，每组只有代表文件完整发送给模型
+        reuser = None
+        if AppConfig.SIMILARITY_ENABLED:
+            # 跨任务的相似文件库只在指定了项目时使用，且只复用同一项目的结果
+            reuser = SimilarityReuser(file_converter, source_lang, target_lang,
+                                      get_similarity_store() if project else None, project_key)
+            with stage_timer('discovery'):
+                reuser.plan(waves, source.read_text)
+        
+        def dependency_context(rel_path):
+            if graph is None:
+                return ''
+            parts = []
+            total = 0
+            for dep in sorted(graph.dependencies[rel_path]):
+                # 循环依赖中同层的文件还没有摘要
+                summary = symbol_summaries.get(dep)
+                if not summary:
+                    continue
+                if total + len(summary) > AppConfig.DEPENDENCY_CONTEXT_MAX_CHARS:
+                    break
+                parts.append(summary)
+                total += len(summary) + 1
+            return '\n'.join(parts)
+        
+        def convert_file(rel_path):
+            # 读取文件内容
+            code = source.read_text(rel_path)
             
-            progress = progress_dict[progress_id]
+            # 源代码和依赖摘要都未变化时直接复用清单中的结果
+            dependencies = dependency_context(rel_path)
+            fingerprint = file_converter.fingerprint(source_lang, target_lang, code, dependencies)
+            entry = manifest.lookup(project_key, rel_path, fingerprint) if manifest is not None else None
             
-            # 发送进度信息
-            yield f'data: {json.dumps(progress)}\n\n'
+            # 转换代码
+            if entry is not None:
+                converted_code = entry.output
+                reused_files.add(rel_path)
+            elif reuser is not None:
+                converted_code = reuser.convert(rel_path, code, dependencies)
+            else:
+                converted_code = file_converter.convert(source_lang, target_lang, code, dependencies)
             
-            # 如果转换完成或出错，停止流
-            if progress['status'] in ['completed', 'error']:
-                # 从进度字典中移除
-                time.sleep(1)  # 给客户端足够的时间接收完成消息
-                if progress_id in progress_dict:
-                    del progress_dict[progress_id]
-                break
+            # 重命名文件
+            target_rel_path = writer.reserve_name(os.path.splitext(rel_path)[0] + target_ext)
+            if rel_path in summary_sources:
+                # 复用时沿用上次的摘要，保证依赖本文件的文件指纹不变
+                if entry is not None and entry.summary is not None:
+                    symbol_summaries[rel_path] = entry.summary
+                else:
+                    symbol_summaries[rel_path] = summarize_symbols(target_lang, target_rel_path, converted_code,
+                                                                   AppConfig.SYMBOL_SUMMARY_MAX_CHARS)
             
-            time.sleep(0.5)  # 每500毫秒发送一次更新
-    
-    return Response(generate(), mimetype='text/event-stream')
-
-@app.route('/download/<filename>')
-def download_file(filename):
-    """下载转换后的项目文件"""
-    try:
-        temp_dir = request.args.get('temp_dir')
-        if not temp_dir or not os.path.exists(temp_dir):
-            return jsonify({'error': '文件不存在或已过期'}), 404
+            def write_result(final_code, record=True):
+                # 写入结果ZIP
+                writer.write_text(target_rel_path, final_code)
+                if rel_path in duplicate_sources:
+                    duplicate_results[rel_path] = final_code
+                if record and manifest is not None:
+                    manifest.record(project_key, rel_path, fingerprint, final_code,
+                                    symbol_summaries.get(rel_path), job.id)
+                if record and reuser is not None:
+                    reuser.remember(rel_path, code, final_code)
+            
+            def on_checked(outcome):
+                if outcome.rounds and outcome.valid:
+                    # 修复后的结果覆盖缓存，避免再次转换时得到同样的错误结果
+                    file_converter.update_cache(source_lang, target_lang, code, outcome.code, dependencies)
+                # 未通过检查的结果不记入清单，下次转换时重新转换
+                write_result(outcome.code, record=outcome.valid)
+            
+            if entry is not None:
+                # 清单中的结果已经检查过
+                write_result(converted_code, record=False)
+            elif repair_stage is not None:
+                repair_stage.submit(target_rel_path, code, converted_code, on_checked)
+            else:
+                write_result(converted_code)
+            
+            # 记录转换后的文件
+            return target_rel_path
+        
+        def on_file_start(rel_path):
+            # 更新当前转换文件
+            progress.file_started(rel_path)
+        
+        def on_file_finish(task_result):
+            # 记录文件耗时，current 表示已完成的文件数
+            progress.file_finished(task_result.item, task_result.ok)
+            if not task_result.ok:
+                FILES.inc(status='failed')
+            elif task_result.item in reused_files:
+                FILES.inc(status='reused')
+            else:
+                # clone 和 delta 分别为替换名称得到和按差异转换的文件
+                method = reuser.method(task_result.item) if reuser is not None else None
+                FILES.inc(status=method or SimilarityMethod.CONVERTED)
+        
+        pool = ConversionPool()
+        results = []
+        # 每层先转换代表文件，同组的其他文件在其后参照代表文件的结果
+        batches = [batch for wave in waves for batch in (reuser.split_wave(wave) if reuser is not None else [wave])]
+        for batch in batches:
+            batch_results = pool.run(batch, convert_file,
+                                     on_start=on_file_start, on_finish=on_file_finish,
+                                     should_stop=lambda: job.cancelled)
+            results.extend(batch_results)
+            job.check_cancelled()
+            if any(not r.ok for r in batch_results):
+                break
+        
+        failed = next((r for r in results if not r.ok), None)
+        if failed is not None:
+            file_name = os.path.basename(failed.item)
+            raise Exception(f'转换文件 {file_name} 时出错: {str(failed.error)}')
+        
+        converted_files = [r.result for r in results]
+        
+        # 等待剩余的验证和修复完成，未通过检查的文件不影响任务完成
+        validation = None
+        if repair_stage is not None:
+            progress.set_status('validating')
+            while not repair_stage.wait(timeout=0.5):
+                job.check_cancelled()
+            if repair_stage.errors:
+                raise repair_stage.errors[0]
+            validation = repair_stage.summary()
+            for target_rel_path, errors in validation['errors'].items():
+                logger.warning(f'转换结果未通过语法检查 {target_rel_path}: {errors}')
         
-        # 发送文件
-        response = send_from_directory(temp_dir, filename, as_attachment=True)
+        # 内容相同的文件直接复用首个文件的转换结果
+        for entry in index.duplicates:
+            target_rel_path = writer.reserve_name(os.path.splitext(entry.path)[0] + target_ext)
+            writer.write_text(target_rel_path, duplicate_results[entry.duplicate_of])
+            converted_files.append(target_rel_path)
+        FILES.inc(len(index.duplicates), status='duplicate')
         
-        # 发送文件后清理临时目录
-        @response.call_on_close
-        def cleanup():
-            try:
-                shutil.rmtree(temp_dir, ignore_errors=True)
-            except Exception as e:
-                logger.error(f'清理临时目录失败: {str(e)}')
+        # 写入中央目录，完成结果ZIP
+        writer.close()
         
-        return response
+        # 删除项目中已不存在的文件的记录
+        if manifest is not None:
+            manifest.prune(project_key, all_files)
+        incremental = {
+            'project': project or None,
+            'reused': len(reused_files),
+            'converted': len(results) - len(reused_files)
+        }
+        logger.info('项目转换完成', extra=incremental)
+        if reuser is not None:
+            logger.info('相似文件复用', extra=reuser.stats)
         
+        # 签发结果下载令牌，工作目录清理前一直有效
+        artifact = download_registry.issue(job.id, writer.path, 'converted_project.zip')
+        
+        # 更新进度为完成
+        progress.set_status('completed')
+        
+        # 返回转换结果
+        return {
+            'files': converted_files,
+            'index': index.summary(),
+            'validation': validation,
+            'incremental': incremental,
+            'similarity': reuser.stats if reuser is not None else None,
+            'download_url': f'/api/downloads/{artifact.token}'
+        }
+        
+    except JobCancelled:
+        progress.set_status('cancelled')
+        _drain_repair_stage(repair_stage, manifest)
+        if writer is not None:
+            writer.abort()
+        # 记录了清单时保留上传的文件，任务可以续转
+        if manifest is None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
     except Exception as e:
-        logger.error(f'下载文件失败: {str(e)}')
-        # 尝试清理临时目录
+        logger.error(f'项目转换失败: {str(e)}')
+        # 更新进度为错误
+        progress.set_status('error', error=str(e))
+        _drain_repair_stage(repair_stage, manifest)
+        if writer is not None:
+            writer.abort()
+        # 清理临时目录，记录了清单时保留上传的文件，任务可以续转
+        if manifest is None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    finally:
+        if source is not None:
+            source.close()
+        if repair_stage is not None:
+            repair_stage.shutdown()
+
+@app.route('/api/stats/tokens')
+def token_stats():
+    """按语言对统计输出token的估算值与实际用量"""
+    return jsonify(get_token_estimator().stats())
+
+@app.route('/api/stats/backends')
+def backend_stats():
+    """各API后端的路由与健康统计"""
+    if not isinstance(api_client, ClientRegistry):
+        return jsonify({'strategy': None, 'backends': []})
+    return jsonify(api_client.stats())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus 文本格式的指标：各阶段耗时、API请求与重试、token用量、缓存命中等"""
+    return Response(get_metrics_registry().render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """查询后台任务状态"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    
+    data = job.to_dict()
+    data['progress'] = progress_bus.state(job_id)
+    return jsonify({'success': True, **data})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消后台任务"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    
+    if not job_queue.cancel(job_id):
+        return jsonify({'success': False, 'error': f'任务已结束，状态: {job.status}'}), 409
+    # 排队中的任务不会再运行，由这里发布取消状态；运行中的任务在停止时自行发布
+    if job.status == JobStatus.CANCELLED and job.metadata.get('progress') is not None:
+        job.metadata['progress'].set_status('cancelled')
+    
+    return jsonify({'success': True, **job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """续转失败或已取消的项目转换任务：清单中已完成且输入未变化的文件直接复用，只转换其余文件"""
+    with resume_lock:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': '任务不存在'}), 404
+        if job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+            return jsonify({'success': False, 'error': f'只能续转失败或已取消的任务，当前状态: {job.status}'}), 409
+        
+        conversion = job.metadata.get('conversion')
+        temp_dir = job.metadata.get('temp_dir')
+        if conversion is None or not temp_dir or not os.path.isdir(temp_dir):
+            return jsonify({'success': False, 'error': '任务的上传文件已清理，无法续转'}), 410
+        # 提交期间持有工作目录，避免清理线程在任务重新开始前删除它
+        if not workspace_manager.hold(job.id):
+            return jsonify({'success': False, 'error': '任务的上传文件已清理，无法续转'}), 410
+        
         try:
-            temp_dir = request.args.get('temp_dir')
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
-        except:
-            pass
-        return jsonify({'error': '下载失败'}), 500
+            tracker = ProgressTracker(progress_bus, job.id)
+            tracker.set_status('preparing')
+            # 以相同的任务ID重新提交，进度和下载地址保持不变
+            job = job_queue.submit(run_project_conversion, temp_dir, job_id=job.id,
+                                   metadata={'temp_dir': temp_dir, 'progress': tracker, 'conversion': conversion},
+                                   **conversion)
+        finally:
+            workspace_manager.release(job_id)
+    
+    return jsonify({'success': True, **job.to_dict(), 'progress_id': job.id}), 202
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """获取已完成任务的转换结果"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+    
+    if job.status == JobStatus.FAILED:
+        return jsonify({'success': False, 'status': job.status, 'error': job.error})
+    if job.status != JobStatus.COMPLETED:
+        return jsonify({'success': False, 'status': job.status, 'error': '任务尚未完成'}), 409
+    
+    return jsonify({'success': True, 'job_id': job.id, 'status': job.status, **job.result})
+
+@app.route('/api/jobs/<job_id>/download')
+def download_job_result(job_id):
+    """下载任务结果ZIP；任务仍在运行时边写入边下载，完成后与下载令牌相同，支持断点续传"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if job.status in (JobStatus.FAILED, JobStatus.CANCELLED):
+        return jsonify({'error': f'任务未成功完成，状态: {job.status}'}), 410
+    
+    artifact = download_registry.for_job(job_id)
+    if artifact is not None:
+        return _send_artifact(artifact)
+    
+    writer = job.metadata.get('result_writer')
+    if writer is None or writer.closed:
+        return jsonify({'error': '结果尚未生成'}), 409
+    # 结果ZIP仍在写入，追随写入进度流式下载
+    return Response(writer.iter_bytes(), mimetype='application/zip',
+                    headers={'Content-Disposition': 'attachment; filename=converted_project.zip'})
+
+@app.route('/api/downloads/<token>')
+def download_artifact(token):
+    """按下载令牌下载任务结果，支持 Range 断点续传和 ETag 条件请求"""
+    artifact = download_registry.resolve(token)
+    if artifact is None:
+        return jsonify({'error': '下载链接无效或已过期'}), 404
+    return _send_artifact(artifact)
+
+def _send_artifact(artifact):
+    if not artifact.available:
+        return jsonify({'error': '文件不存在或已过期'}), 410
+    # 下载后重新开始计算工作目录的保留时间
+    workspace_manager.touch(artifact.job_id)
+    # conditional 处理 Range、If-Range 和 If-None-Match；文件经 wsgi.file_wrapper 发送，
+    # 服务器支持时（如gunicorn）使用 sendfile 零拷贝
+    response = send_file(artifact.path, mimetype='application/zip', as_attachment=True,
+                         download_name=artifact.download_name, conditional=True, etag=True, max_age=0)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/progress/<progress_id>')
+def progress_stream(progress_id):
+    """
+    进度流 SSE 端点：只在进度变化时推送，空闲时发送心跳注释；
+    事件带序号，断线重连时浏览器通过 Last-Event-ID 只接收之后的变化
+    """
+    try:
+        after = int(request.headers.get('Last-Event-ID', '0'))
+    except ValueError:
+        after = 0
+    
+    def generate():
+        if progress_bus.get(progress_id) is None:
+            yield f'data: {json.dumps({"error": "进度ID不存在"}, ensure_ascii=False)}\n\n'
+            return
+        # 告知浏览器断线后的重连间隔（毫秒）
+        yield 'retry: 2000\n\n'
+        for event in progress_bus.subscribe(progress_id, after):
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            seq, state = event
+            yield f'id: {seq}\ndata: {json.dumps(state, ensure_ascii=False)}\n\n'
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/download/<filename>')
+def download_file(filename):
+    """旧版下载地址，重定向到任务的下载令牌地址；只接受本服务创建的工作目录"""
+    workspace_id = os.path.basename(os.path.normpath(request.args.get('temp_dir', '')))
+    workspace = workspace_manager.get(workspace_id)
+    artifact = download_registry.for_job(workspace_id) if workspace is not None else None
+    if artifact is None or os.path.basename(artifact.path) != filename:
+        return jsonify({'error': '文件不存在或已过期'}), 404
+    return redirect(f'/api/downloads/{artifact.token}')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
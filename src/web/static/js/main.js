@@ -106,8 +106,8 @@ convertBtn.addEventListener('click', async function() {
     status.className = 'status';
 
     try {
-        // 调用真实后端接口
-        const res = await fetch('/api/convert', {
+        // 调用流式后端接口，边生成边显示
+        const res = await fetch('/api/convert-stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -116,12 +116,40 @@ convertBtn.addEventListener('click', async function() {
                 code: sourceCode
             })
         });
-        const data = await res.json();
-        if (!data.success) throw new Error(data.error || '转换失败');
-        const mockResult = data.result;
+        if (!res.ok || !res.body) {
+            const data = await res.json().catch(() => ({}));
+            throw new Error(data.error || '转换失败');
+        }
+
+        targetCodeDisplay.textContent = '';
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // 按SSE事件分隔符拆分
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            for (const event of events) {
+                if (!event.startsWith('data: ')) continue;
+                const data = JSON.parse(event.slice(6));
+                if (data.error) throw new Error(data.error);
+                if (data.done) {
+                    result = data.result;
+                } else {
+                    result += data.delta;
+                }
+                targetCodeDisplay.textContent = result;
+            }
+            updateTargetLineNumbers();
+        }
 
         // 展示结果
-        targetCodeDisplay.textContent = mockResult;
+        targetCodeDisplay.textContent = result;
         if (typeof hljs !== 'undefined') {
             hljs.highlightElement(targetCodeDisplay);
         }
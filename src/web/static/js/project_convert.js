@@ -26,6 +26,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     let selectedFile = null;
     let conversionResult = null;
+    let currentJobId = null;
     let eventSource = null;
 
     // 文件选择处理
@@ -179,6 +180,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const formData = new FormData();
         formData.append('source_lang', sourceLang);
         formData.append('target_lang', targetLang);
+        formData.append('exclude', document.getElementById('exclude-patterns').value);
         
         // 检查是否是文件夹上传
         // 修复：当selectedFile是单个File对象时，selectedFile.length会导致错误
@@ -226,13 +228,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error(data.error || '转换失败');
             }
             
-            // 获取进度ID并开始监听进度
+            // 转换在后台任务中进行，记录任务ID并开始监听进度
+            currentJobId = data.job_id;
+            conversionResult = null;
             if (data.progress_id) {
                 startProgressTracking(data.progress_id);
             }
             
-            conversionResult = data;
-            
         } catch (err) {
             showStatus('转换失败：' + err.message, 'error');
             loading.style.display = 'none';
@@ -246,6 +248,12 @@ document.addEventListener('DOMContentLoaded', function() {
         selectedFile = null;
         conversionResult = null;
         
+        // 取消仍在运行的后台任务
+        if (currentJobId) {
+            fetch(`/api/jobs/${currentJobId}/cancel`, { method: 'POST' }).catch(() => {});
+            currentJobId = null;
+        }
+        
         // 关闭事件源
         if (eventSource) {
             eventSource.close();
@@ -375,28 +383,27 @@ document.addEventListener('DOMContentLoaded', function() {
                 
                 // 更新当前转换文件
                 if (data.current_file) {
-                    currentFileName.textContent = data.current_file;
+                    let text = data.current_file;
+                    if (data.status === 'converting' && data.eta_seconds != null) {
+                        text += `（预计剩余 ${formatDuration(data.eta_seconds)}）`;
+                    }
+                    currentFileName.textContent = text;
                 }
                 
                 // 如果转换完成
                 if (data.status === 'completed') {
                     loading.style.display = 'none';
                     
-                    // 显示转换文件列表
-                    displayConvertedFiles(conversionResult.files);
-                    
-                    // 显示下载按钮
-                    downloadBtn.style.display = 'inline-block';
-                    
-                    showStatus(`项目转换成功！共转换${conversionResult.files.length}个文件`, 'success');
-                    
                     // 关闭事件源
                     eventSource.close();
                     eventSource = null;
+                    
+                    // 获取任务结果
+                    fetchJobResult(currentJobId);
                 }
                 
-                // 如果转换出错
-                if (data.status === 'error') {
+                // 如果转换出错或被取消
+                if (data.status === 'error' || data.status === 'cancelled') {
                     loading.style.display = 'none';
                     showStatus('转换过程中出现错误', 'error');
                     
@@ -411,11 +418,49 @@ document.addEventListener('DOMContentLoaded', function() {
         };
         
         eventSource.onerror = function() {
-            eventSource.close();
-            eventSource = null;
+            // 连接中断时浏览器会带上最后收到的事件序号自动重连，只在无法重连时关闭
+            if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+                eventSource = null;
+            }
         };
     }
 
+    // 将秒数格式化为“x分y秒”
+    function formatDuration(seconds) {
+        seconds = Math.max(0, Math.round(seconds));
+        const minutes = Math.floor(seconds / 60);
+        return minutes > 0 ? `${minutes}分${seconds % 60}秒` : `${seconds}秒`;
+    }
+
+    // 获取后台任务结果
+    async function fetchJobResult(jobId) {
+        try {
+            const res = await fetch(`/api/jobs/${jobId}/result`);
+            const data = await res.json();
+            if (!data.success) {
+                throw new Error(data.error || '获取转换结果失败');
+            }
+            
+            conversionResult = data;
+            currentJobId = null;
+            
+            // 显示转换文件列表
+            displayConvertedFiles(conversionResult.files);
+            
+            // 显示下载按钮
+            downloadBtn.style.display = 'inline-block';
+            
+            const invalid = conversionResult.validation ? conversionResult.validation.invalid : 0;
+            if (invalid > 0) {
+                showStatus(`项目转换完成，共转换${conversionResult.files.length}个文件，其中${invalid}个文件未通过语法检查`, 'warning');
+            } else {
+                showStatus(`项目转换成功！共转换${conversionResult.files.length}个文件`, 'success');
+            }
+        } catch (err) {
+            showStatus('转换失败：' + err.message, 'error');
+        }
+    }
+
     // 显示转换文件列表
     function displayConvertedFiles(files) {
         convertedFiles.innerHTML = '';
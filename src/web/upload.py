@@ -0,0 +1,124 @@
+import zipfile
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config.app_config import AppConfig
+
+
+class UploadQuota:
+    """单次上传的配额：总字节数、文件数和单个文件大小，在请求体读取过程中逐块累计"""
+
+    def __init__(self, max_bytes: Optional[int] = None, max_files: Optional[int] = None,
+                 max_file_bytes: Optional[int] = None):
+        """
+        初始化上传配额
+
+        Args:
+            max_bytes: 上传文件的总字节数上限，默认读取 AppConfig.UPLOAD_MAX_BYTES
+            max_files: 文件数上限，默认读取 AppConfig.UPLOAD_MAX_FILES
+            max_file_bytes: 单个文件的字节数上限，默认读取 AppConfig.UPLOAD_MAX_FILE_BYTES
+        """
+        self.max_bytes = max_bytes or AppConfig.UPLOAD_MAX_BYTES
+        self.max_files = max_files or AppConfig.UPLOAD_MAX_FILES
+        self.max_file_bytes = max_file_bytes or AppConfig.UPLOAD_MAX_FILE_BYTES
+        self.total_bytes = 0
+        self.files = 0
+
+    def add_file(self, filename: Optional[str] = None):
+        """
+        登记一个新文件
+
+        Raises:
+            RequestEntityTooLarge: 文件数超过上限时抛出
+        """
+        self.files += 1
+        if self.files > self.max_files:
+            raise RequestEntityTooLarge(f'上传文件数超过上限 {self.max_files}')
+
+    def add_bytes(self, size: int, file_size: int, filename: Optional[str] = None):
+        """
+        累计已接收的字节数
+
+        Args:
+            size: 本次接收的字节数
+            file_size: 当前文件累计的字节数（含本次）
+            filename: 当前文件名
+
+        Raises:
+            RequestEntityTooLarge: 单个文件或总大小超过上限时抛出
+        """
+        self.total_bytes += size
+        if file_size > self.max_file_bytes:
+            raise RequestEntityTooLarge(f'文件 {filename or ""} 超过单个文件大小上限 {self.max_file_bytes} 字节')
+        if self.total_bytes > self.max_bytes:
+            raise RequestEntityTooLarge(f'上传文件总大小超过上限 {self.max_bytes} 字节')
+
+    def check_zip(self, zip_path: str):
+        """
+        按解压后的大小检查ZIP文件中的成员，成员计入本配额，防止压缩炸弹；
+        只读取中央目录，不解压
+
+        Args:
+            zip_path: ZIP文件路径
+
+        Raises:
+            RequestEntityTooLarge: 成员数、单个成员或解压后的总大小超过上限时抛出
+        """
+        with zipfile.ZipFile(zip_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                self.add_file(info.filename)
+                self.add_bytes(info.file_size, info.file_size, info.filename)
+
+
+class _QuotaSpooledFile(SpooledTemporaryFile):
+    """写入时检查配额的临时文件，超过内存阈值后转存到磁盘"""
+
+    def __init__(self, quota: UploadQuota, filename: Optional[str], max_size: int):
+        super().__init__(max_size=max_size, mode='w+b')
+        self._quota = quota
+        self._filename = filename
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        self._size += len(data)
+        self._quota.add_bytes(len(data), self._size, self._filename)
+        return super().write(data)
+
+
+class QuotaRequest(Request):
+    """上传文件边接收边检查配额的请求类：超出配额时立即中止读取请求体并返回413，
+    每个文件超过 AppConfig.UPLOAD_SPOOL_BYTES 后写入磁盘临时文件，不常驻内存
+    """
+
+    @property
+    def upload_quota(self) -> UploadQuota:
+        """本次请求的上传配额"""
+        quota = getattr(self, '_upload_quota', None)
+        if quota is None:
+            quota = self._upload_quota = UploadQuota()
+        return quota
+
+    def _get_file_stream(self, total_content_length: Optional[int], content_type: Optional[str],
+                         filename: Optional[str] = None, content_length: Optional[int] = None) -> IO[bytes]:
+        quota = self.upload_quota
+        quota.add_file(filename)
+        return _QuotaSpooledFile(quota, filename, AppConfig.UPLOAD_SPOOL_BYTES)
+
+
+def configure_upload_limits(app):
+    """
+    为应用设置请求体大小和表单分段数上限，与上传配额一致
+
+    Args:
+        app: Flask应用
+    """
+    app.request_class = QuotaRequest
+    # 请求体除文件内容外还包含每个分段的头部，预留每个文件 1KB 的余量
+    app.config['MAX_CONTENT_LENGTH'] = AppConfig.UPLOAD_MAX_BYTES + AppConfig.UPLOAD_MAX_FILES * 1024
+    # 表单字段（语言、筛选选项等）另外预留
+    app.config['MAX_FORM_PARTS'] = AppConfig.UPLOAD_MAX_FILES + 100
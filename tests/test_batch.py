@@ -0,0 +1,80 @@
+import re
+
+from src.converter.python_converter import PythonConverter
+from src.pipeline.batch import BatchConverter, BatchItem, split_sections
+from src.utils.error_handler import APIError
+
+
+def test_split_sections():
+    response = '说明文字\n### BEGIN S1\nconsole.log(1);\n### END S1\n  ### BEGIN S2  \nlet a = 2;\n\nlet b = 3;\n### END S2\n'
+    assert split_sections(response) == {'S1': 'console.log(1);\n', 'S2': 'let a = 2;\n\nlet b = 3;\n'}
+
+
+def test_split_sections_ignores_unclosed_and_mismatched_markers():
+    response = '### BEGIN S1\na\n### END S2\n### BEGIN S3\nc\n### END S3\n### BEGIN S4\nd\n'
+    assert split_sections(response) == {'S3': 'c\n'}
+
+
+def test_split_sections_keeps_first_duplicate():
+    response = '### BEGIN S1\nfirst\n### END S1\n### BEGIN S1\nsecond\n### END S1'
+    assert split_sections(response) == {'S1': 'first\n'}
+
+
+class FakeClient:
+    """按提示中的代码段返回结果，可指定漏掉的段"""
+
+    model = 'fake'
+
+    def __init__(self, drop=(), fail_packed=False, fail_code=None):
+        self.drop = set(drop)
+        self.fail_packed = fail_packed
+        self.fail_code = fail_code
+        self.prompts = []
+
+    def generate_response(self, prompt, *args, **kwargs):
+        self.prompts.append(prompt)
+        if self.fail_code is not None and prompt.endswith(self.fail_code):
+            raise APIError('API调用失败: bad request', 400)
+        if self.fail_packed and '### BEGIN' in prompt:
+            raise APIError('API调用失败: bad request', 400)
+        sections = re.findall(r'^### BEGIN (S\d+)\n(.*?)\n### END \1$', prompt, re.MULTILINE | re.DOTALL)
+        if not sections:
+            return 'single:' + prompt.rsplit('\n', 1)[-1]
+        return '\n'.join(f'### BEGIN {marker}\nconverted:{body}\n### END {marker}'
+                         for marker, body in sections if marker not in self.drop)
+
+
+def make_batch(client):
+    converter = PythonConverter(client)
+    converter.cache = None
+    return BatchConverter(lambda lang: converter, token_budget=1000, max_items_per_prompt=10, max_workers=2)
+
+
+def test_batch_packs_items_and_keeps_order():
+    client = FakeClient()
+    batch = make_batch(client)
+    items = [BatchItem(i, 'python', 'js', f'x = {i}') for i in range(3)]
+    results = batch.convert(items)
+    assert [result.to_dict() for result in results] == [
+        {'id': i, 'success': True, 'result': f'converted:x = {i}'} for i in range(3)
+    ]
+    assert len(client.prompts) == 1
+    assert batch.stats['prompts'] == 1 and batch.stats['fallbacks'] == 0
+
+
+def test_batch_falls_back_for_missing_sections():
+    client = FakeClient(drop={'S2'})
+    batch = make_batch(client)
+    results = batch.convert([BatchItem(i, 'python', 'js', f'x = {i}') for i in range(3)])
+    assert [result.result for result in results] == ['converted:x = 0', 'single:x = 1', 'converted:x = 2']
+    assert batch.stats['fallbacks'] == 1 and len(client.prompts) == 2
+
+
+def test_batch_falls_back_per_item_when_packed_prompt_fails():
+    client = FakeClient(fail_packed=True, fail_code='x = 1')
+    batch = make_batch(client)
+    results = batch.convert([BatchItem(i, 'python', 'js', f'x = {i}') for i in range(3)])
+    # 打包请求失败后逐段转换，只有本身出错的代码段失败
+    assert [result.result for result in results] == ['single:x = 0', None, 'single:x = 2']
+    assert 'bad request' in results[1].error
+    assert batch.stats['fallbacks'] == 3 and len(client.prompts) == 4
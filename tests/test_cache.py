@@ -0,0 +1,57 @@
+import time
+
+from src.utils.cache import LRUCache, SQLiteCache, make_cache_key
+
+
+def test_cache_key_is_stable():
+    args = ('python', 'js', 'model', 'prompt', 'print(1)')
+    assert make_cache_key(*args) == make_cache_key(*args)
+    assert len(make_cache_key(*args)) == 64
+
+
+def test_cache_key_changes_with_every_field():
+    base = ['python', 'js', 'model', 'prompt', 'print(1)']
+    keys = {make_cache_key(*base)}
+    for index in range(len(base)):
+        changed = list(base)
+        changed[index] += 'x'
+        keys.add(make_cache_key(*changed))
+    assert len(keys) == len(base) + 1
+
+
+def test_cache_key_separates_fields():
+    # 字段拼接后相同的输入不应得到相同的键
+    assert make_cache_key('py', 'thonjs', 'm', 'p', 'c') != make_cache_key('python', 'js', 'm', 'p', 'c')
+    assert make_cache_key('python', 'js', 'm', '', 'c') == make_cache_key('python', 'js', 'm', None, 'c')
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, max_bytes=1024)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    cache.get('a')
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1' and cache.get('c') == '3'
+
+
+def test_lru_limits_total_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=4)
+    cache.set('a', 'xx')
+    cache.set('b', 'yyy')
+    assert cache.get('a') is None
+    assert cache.size_bytes == 3
+    cache.set('c', 'toolarge')
+    assert cache.get('c') is None
+
+
+def test_sqlite_cache_purges_expired_rows_on_open(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path, ttl=0)
+    cache.set('a', '1')
+    assert cache.get('a') is None
+    time.sleep(0.01)
+    reopened = SQLiteCache(path, ttl=60)
+    assert reopened._conn.execute('SELECT COUNT(*) FROM conversion_cache').fetchone()[0] == 0
+    reopened.set('b', '2')
+    assert reopened.get('b') == '2'
@@ -0,0 +1,178 @@
+import pytest
+
+from config.app_config import AppConfig
+from src.api_client.custom_client import MockAPIClient
+from src.converter.general_converter import GeneralConverter
+from src.utils.code_extractor import CodeUnit, extract_units, merge_class_members, split_into_chunks
+
+PYTHON_CODE = '''import os
+from typing import List
+
+MAX_SIZE = 10
+
+
+# 辅助函数
+def helper(x):
+    return x + 1
+
+
+class Box:
+    def __init__(self, items: List[int]):
+        self.items = items
+
+    def total(self):
+        return sum(self.items)
+
+print(helper(MAX_SIZE))
+'''
+
+C_CODE = '''#include <stdio.h>
+#define SQUARE(x) \\
+    ((x) * (x))
+
+typedef struct {
+    int x;
+    int y;
+} Point;
+
+/* 返回 "}" 也不影响切分 */
+static const char *brace(void) { return "}"; }
+
+int add(int a, int b) {
+    // 注释里的 { 不计入
+    return a + b;
+}
+
+int values[] = {1, 2, 3};
+'''
+
+JS_CODE = '''const fs = require('fs');
+import { join } from 'path';
+
+export function render(name) {
+    return `<div>${name}</div>`;
+}
+
+class Widget {
+    draw() { return '{'; }
+}
+'''
+
+
+@pytest.mark.parametrize('lang, code', [('python', PYTHON_CODE), ('c', C_CODE), ('js', JS_CODE), ('java', JS_CODE)])
+def test_units_round_trip(lang, code):
+    units = extract_units(lang, code)
+    assert units
+    assert ''.join(unit.text for unit in units) == code
+
+
+def test_python_units_kinds_and_names():
+    units = extract_units('python', PYTHON_CODE)
+    assert [(unit.kind, unit.name) for unit in units] == [
+        (CodeUnit.CONTEXT, ''),
+        (CodeUnit.CONTEXT, ''),
+        (CodeUnit.CONTEXT, 'MAX_SIZE'),
+        (CodeUnit.DEFINITION, 'helper'),
+        (CodeUnit.DEFINITION, 'Box'),
+        (CodeUnit.DEFINITION, ''),
+    ]
+    # 定义前的注释归入该定义
+    assert units[3].text.lstrip().startswith('# 辅助函数')
+
+
+def test_brace_units_ignore_braces_in_strings_and_comments():
+    units = extract_units('c', C_CODE)
+    names = [unit.name for unit in units if unit.kind == CodeUnit.DEFINITION]
+    assert 'brace' in names and 'add' in names
+    assert any(unit.text.startswith('#define SQUARE') for unit in units)
+
+
+def test_unparsable_code_returns_none():
+    assert extract_units('python', 'def broken(:\n') is None
+    assert extract_units('c', 'int f() { return 1; ') is None
+
+
+def test_chunks_preserve_order_and_share_context():
+    chunks = split_into_chunks('python', PYTHON_CODE, max_chars=80)
+    assert len(chunks) > 1
+    assert ''.join(chunk.code for chunk in chunks) == PYTHON_CODE
+    # 不含导入的块带上其他块中的导入作为上下文
+    later = [chunk for chunk in chunks if 'import os' not in chunk.code]
+    assert later and all('import os' in chunk.context for chunk in later)
+
+
+def test_small_or_unparsable_code_is_single_chunk():
+    assert [chunk.code for chunk in split_into_chunks('python', PYTHON_CODE, 10000)] == [PYTHON_CODE]
+    assert [chunk.code for chunk in split_into_chunks('python', 'def broken(:\n', 10)] == ['def broken(:\n']
+
+
+JAVA_CLASS = '''package com.shop;
+
+import java.util.List;
+
+/** 订单 {不是类体} */
+@Entity
+public class Order extends Base {
+    private final List<Item> items;
+    private String note = "}";
+
+    public Order(List<Item> items) {
+        this.items = items;
+    }
+
+    // 合计
+    public int total() {
+        int sum = 0;
+        for (Item item : items) {
+            sum += item.price();
+        }
+        return sum;
+    }
+
+    @Override
+    public String toString() {
+        return "Order{" + items + "}";
+    }
+}
+'''
+
+
+def test_lone_class_is_split_by_members():
+    chunks = split_into_chunks('java', JAVA_CLASS, max_chars=200)
+    skeleton, members = chunks[0], chunks[1:]
+    assert skeleton.skeleton
+    assert skeleton.code == ('package com.shop;\n\nimport java.util.List;\n\n/** 订单 {不是类体} */\n@Entity\n'
+                             'public class Order extends Base {\n}\n')
+    assert len(members) > 1
+    assert all(chunk.enclosing == 'public class Order extends Base' and not chunk.skeleton for chunk in members)
+    # 成员块去掉类体缩进，按原顺序覆盖全部成员
+    assert members[0].code.startswith('private final List<Item> items;')
+    assert 'return "Order{" + items + "}";' in members[-1].code
+    # 上下文包含导入和其他块中成员的签名
+    assert 'import java.util.List;' in members[-1].context
+    assert 'public Order(List<Item> items)' in members[-1].context
+
+
+def test_class_split_not_used_for_small_or_multi_definition_files():
+    assert len(split_into_chunks('java', JAVA_CLASS, max_chars=10000)) == 1
+    two_classes = JAVA_CLASS + '\nclass Other {\n    int x;\n}\n'
+    assert not any(chunk.skeleton for chunk in split_into_chunks('java', two_classes, max_chars=200))
+
+
+def test_merge_class_members():
+    members = ['int a;', 'void f() {\n    a++;\n}']
+    assert merge_class_members('public class A {\n}', members) == \
+        'public class A {\n    int a;\n\n    void f() {\n        a++;\n    }\n}'
+    assert merge_class_members('class A {}', ['int a;']) == 'class A {\n    int a;\n}'
+    assert merge_class_members('import os\n\n\nclass A(Base):\n    pass', ['def f(self):\n    return 1']) == \
+        'import os\n\n\nclass A(Base):\n    def f(self):\n        return 1'
+
+
+def test_chunked_conversion_reassembles_class(monkeypatch):
+    monkeypatch.setattr(AppConfig, 'CHUNK_THRESHOLD_CHARS', 100)
+    monkeypatch.setattr(AppConfig, 'CHUNK_MAX_CHARS', 200)
+    client = MockAPIClient()
+    converter = GeneralConverter(client)
+    converter.cache = None
+    assert converter.convert('java', 'java', JAVA_CLASS) == JAVA_CLASS.strip()
+    assert client.calls == len(split_into_chunks('java', JAVA_CLASS, 200))
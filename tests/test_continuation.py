@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from config.api_config import APIConfig
+from config.prompt_config import PromptConfig
+from src.api_client.openai_client import OpenAIClient
+from src.api_client.retry import RetryScheduler, TokenBucket
+from src.utils.token_estimator import TokenEstimator
+
+
+class FakeCompletions:
+    """按顺序返回预设 (内容, finish_reason) 的 chat.completions 接口，记录每次请求"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        content, finish_reason = self.replies.pop(0)
+        if kwargs['stream']:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(
+                finish_reason=finish_reason, delta=SimpleNamespace(content=content))])])
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=len(content))
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(
+            finish_reason=finish_reason, message=SimpleNamespace(content=content))])
+
+
+def make_client(replies):
+    client = OpenAIClient('key', 'http://127.0.0.1:1/v1', 'fake', RetryScheduler(0, 5.0, TokenBucket(0, 1)))
+    completions = FakeCompletions(replies)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_truncated_output_is_continued():
+    client, completions = make_client([('def f():\n', 'length'), ('    return 1\n', 'stop')])
+    estimator = TokenEstimator(min_tokens=16, max_tokens=4096)
+    budget = estimator.budget('python', 'python', 'x = 1')
+    assert client.generate_response('prompt', budget) == 'def f():\n    return 1'
+
+    first, second = completions.requests
+    assert first['max_tokens'] == budget.max_tokens
+    # 续写请求带上已输出内容和续写提示，并改用最大输出长度
+    assert second['max_tokens'] == APIConfig.MAX_OUTPUT_TOKENS
+    assert second['messages'][-2] == {'role': 'assistant', 'content': 'def f():\n'}
+    assert second['messages'][-1] == {'role': 'user', 'content': PromptConfig.CONTINUE_PROMPT}
+    stats = estimator.stats()['python->python']
+    assert (stats['truncated'], stats['continuations']) == (1, 1)
+
+
+def test_continuations_are_capped():
+    replies = [(f'part{index} ', 'length') for index in range(APIConfig.MAX_CONTINUATIONS + 1)]
+    client, completions = make_client(replies)
+    text = client.generate_response('prompt')
+    assert len(completions.requests) == APIConfig.MAX_CONTINUATIONS + 1
+    assert text.endswith(f'part{APIConfig.MAX_CONTINUATIONS}')
+
+
+def test_complete_output_is_not_continued():
+    client, completions = make_client([('done', 'stop')])
+    assert client.generate_response('prompt') == 'done'
+    assert len(completions.requests) == 1
+
+
+def test_stream_continues_truncated_output():
+    client, completions = make_client([('abc', 'length'), ('def', 'stop')])
+    assert ''.join(client.generate_response_stream('prompt')) == 'abcdef'
+    assert completions.requests[1]['messages'][-2]['content'] == 'abc'
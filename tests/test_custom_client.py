@@ -0,0 +1,53 @@
+from config.prompt_config import PromptConfig
+from src.api_client.custom_client import MockAPIClient, apply_unified_diff, extract_prompt_code
+from src.pipeline.similarity import source_diff
+from src.utils.prompt_builder import PromptBuilder
+
+# 类体中带缩进空行的 Python 代码，旧的空行启发式会在第一个方法后截断
+CLASS_CODE = '''class Account:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def deposit(self, amount):
+        self.balance += amount
+
+    def withdraw(self, amount):
+        self.balance -= amount'''
+
+
+def test_extract_conversion_prompt_keeps_indented_blank_lines():
+    prompt = PromptBuilder().build('python', 'java', CLASS_CODE, context='注意：这是上下文说明')
+    assert extract_prompt_code(prompt) == CLASS_CODE
+
+
+def test_extract_repair_prompt_returns_converted_code():
+    prompt = PromptConfig.ERROR_FIX_PROMPT.format(
+        source_lang='python', target_lang='python', original_code='x = 1',
+        converted_code=CLASS_CODE, error_message='line 3:\n    \n  缩进错误')
+    assert extract_prompt_code(prompt) == CLASS_CODE
+
+
+def test_extract_delta_prompt_applies_diff_to_reference():
+    reference = CLASS_CODE
+    code = CLASS_CODE.replace('Account', 'Wallet').replace('withdraw', 'spend') + '\n'
+    prompt = PromptBuilder().build_delta('python', 'java', reference, source_diff(reference + '\n', code))
+    extracted = extract_prompt_code(prompt)
+    assert extracted == code.strip()
+    assert PromptConfig.DELTA_CODE_PROMPT.strip() not in extracted
+
+
+def test_extract_delta_prompt_falls_back_to_reference():
+    prompt = PromptBuilder().build_delta('python', 'java', CLASS_CODE, '@@ -1,1 +1,1 @@\n-不存在的行\n+x\n')
+    assert extract_prompt_code(prompt) == CLASS_CODE
+
+
+def test_apply_unified_diff_rejects_mismatch():
+    assert apply_unified_diff('a\nb\n', '@@ -1,2 +1,2 @@\n a\n-c\n+d\n') is None
+    assert apply_unified_diff('a\nb\nc', '@@ -2,1 +2,1 @@\n-b\n+B\n') == 'a\nB\nc'
+
+
+def test_mock_client_echoes_code():
+    client = MockAPIClient()
+    reply = client.generate_response(PromptBuilder().build('python', 'java', CLASS_CODE))
+    assert reply == f'```\n{CLASS_CODE}\n```'
+    assert client.calls == 1
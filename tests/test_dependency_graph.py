@@ -0,0 +1,98 @@
+from src.pipeline.dependency_graph import DependencyGraph, summarize_symbols
+
+
+class MemorySource:
+    """测试用的内存项目源"""
+
+    def __init__(self, files):
+        self.files = files
+
+    def read_text(self, path):
+        return self.files[path]
+
+
+def make_graph(edges, paths=None):
+    graph = DependencyGraph(paths or sorted(set(edges) | {dep for deps in edges.values() for dep in deps}))
+    for path, deps in edges.items():
+        graph._add(path, deps)
+    return graph
+
+
+def test_waves_follow_dependencies():
+    graph = make_graph({'app': ['service', 'util'], 'service': ['model'], 'model': [], 'util': []})
+    assert graph.waves() == [['model', 'util'], ['service'], ['app']]
+
+
+def test_waves_put_cycles_in_one_wave():
+    graph = make_graph({'a': ['b'], 'b': ['a'], 'c': ['a'], 'd': []})
+    waves = graph.waves()
+    assert waves == [['a', 'b', 'd'], ['c']]
+
+
+def test_waves_keep_input_order_within_wave():
+    graph = make_graph({'z': [], 'y': [], 'x': []}, paths=['z', 'y', 'x'])
+    assert graph.waves() == [['z', 'y', 'x']]
+
+
+def test_waves_ignore_self_and_unknown_dependencies():
+    graph = make_graph({'a': ['a', 'missing']}, paths=['a'])
+    assert graph.dependencies == {'a': set()}
+    assert graph.waves() == [['a']]
+
+
+def test_waves_empty_graph():
+    assert DependencyGraph([]).waves() == []
+
+
+def test_long_chain_does_not_recurse():
+    paths = [f'm{i}' for i in range(3000)]
+    graph = make_graph({path: [paths[i + 1]] for i, path in enumerate(paths[:-1])}, paths=paths)
+    waves = graph.waves()
+    assert len(waves) == 3000 and waves[0] == ['m2999'] and waves[-1] == ['m0']
+
+
+def test_build_resolves_python_imports():
+    files = {
+        'pkg/__init__.py': '',
+        'pkg/models.py': 'class User:\n    pass\n',
+        'pkg/service.py': 'from .models import User\nimport os\n',
+        'main.py': 'from pkg.service import *\nimport pkg.models\n',
+    }
+    graph = DependencyGraph.build(MemorySource(files), sorted(files), 'python')
+    assert graph.dependencies['pkg/service.py'] == {'pkg/models.py'}
+    assert graph.dependencies['main.py'] == {'pkg/service.py', 'pkg/models.py'}
+    assert graph.waves()[-1] == ['main.py']
+
+
+def test_build_resolves_c_includes_and_js_imports():
+    c_files = {'src/a.c': '#include "a.h"\n#include <stdio.h>\n', 'src/a.h': 'int a(void);\n'}
+    graph = DependencyGraph.build(MemorySource(c_files), sorted(c_files), 'c')
+    assert graph.dependencies['src/a.c'] == {'src/a.h'}
+
+    js_files = {'lib/index.js': "export * from './util';\n", 'lib/util.js': "const x = require('fs');\n"}
+    graph = DependencyGraph.build(MemorySource(js_files), sorted(js_files), 'js')
+    assert graph.dependencies['lib/index.js'] == {'lib/util.js'}
+
+
+def test_build_resolves_java_same_package_by_identifier():
+    files = {
+        'com/app/Order.java': 'package com.app;\n\npublic class Order {\n    private Customer customer;\n'
+                              '    private $Money total;\n}\n',
+        'com/app/Customer.java': 'package com.app;\n\npublic class Customer {\n    // CustomerId 不是同包类\n}\n',
+        'com/app/$Money.java': 'package com.app;\n\npublic class $Money {}\n',
+        'com/app/Invoice.java': 'package com.app;\n\npublic class Invoice {\n    String label = "OrderLine";\n}\n',
+        'com/other/Customer.java': 'package com.other;\n\nimport com.app.Order;\n\npublic class Customer {}\n',
+    }
+    graph = DependencyGraph.build(MemorySource(files), sorted(files), 'java')
+    assert graph.dependencies['com/app/Order.java'] == {'com/app/Customer.java', 'com/app/$Money.java'}
+    # 标识符按完整单词匹配，OrderLine 不会命中 Order，也不依赖自身
+    assert graph.dependencies['com/app/Invoice.java'] == set()
+    assert graph.dependencies['com/app/Customer.java'] == set()
+    assert graph.dependencies['com/other/Customer.java'] == {'com/app/Order.java'}
+
+
+def test_summarize_symbols_lists_definitions():
+    code = 'import os\n\nclass Repo:\n    def get(self, key):\n        pass\n\n    def _hidden(self):\n        pass\n\n' \
+           'def main():\n    pass\n'
+    summary = summarize_symbols('python', 'repo.py', code, 1000)
+    assert summary.splitlines() == ['repo.py:', '  class Repo:', '    def get(self, key):', '  def main():']
@@ -0,0 +1,93 @@
+import importlib
+import os
+
+import pytest
+
+from config.app_config import AppConfig
+from src.web.downloads import DownloadRegistry
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def result_file(tmp_path):
+    path = tmp_path / 'result.zip'
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def test_issue_and_resolve(result_file):
+    registry = DownloadRegistry()
+    first = registry.issue('job', result_file, 'converted.zip')
+    second = registry.issue('job', result_file, 'converted.zip')
+    assert first.token != second.token
+    assert result_file not in first.token
+    assert registry.resolve(first.token) is first
+    assert registry.resolve('unknown') is None
+    assert registry.for_job('job') in (first, second)
+    assert registry.for_job('other') is None
+
+
+def test_revoke_expires_all_job_tokens(result_file):
+    registry = DownloadRegistry()
+    tokens = [registry.issue('job', result_file, 'a.zip').token for _ in range(2)]
+    kept = registry.issue('other', result_file, 'b.zip')
+    assert registry.revoke_job('job') == 2
+    assert all(registry.resolve(token) is None for token in tokens)
+    assert registry.for_job('job') is None
+    assert registry.resolve(kept.token) is kept
+    assert registry.revoke_job('job') == 0
+
+
+def test_artifact_unavailable_after_file_removed(result_file):
+    artifact = DownloadRegistry().issue('job', result_file, 'a.zip')
+    assert artifact.available
+    os.remove(result_file)
+    assert not artifact.available
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    # 工作目录放在临时目录中，清理线程不会触及系统临时目录中的其他目录
+    workspace_root = AppConfig.WORKSPACE_ROOT
+    AppConfig.WORKSPACE_ROOT = str(tmp_path_factory.mktemp('workspaces'))
+    try:
+        module = importlib.import_module('src.web.server')
+    finally:
+        AppConfig.WORKSPACE_ROOT = workspace_root
+    module.app.config['USE_X_SENDFILE'] = False
+    return module
+
+
+def test_download_supports_range_and_etag(server, result_file):
+    artifact = server.download_registry.issue('job-range', result_file, 'converted.zip')
+    client = server.app.test_client()
+    url = f'/api/downloads/{artifact.token}'
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.data == CONTENT
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert 'converted.zip' in full.headers['Content-Disposition']
+    etag = full.headers['ETag']
+
+    partial = client.get(url, headers={'Range': 'bytes=100-199'})
+    assert partial.status_code == 206
+    assert partial.data == CONTENT[100:200]
+    assert partial.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    # If-Range 与当前 ETag 一致时续传，不一致时返回完整文件
+    assert client.get(url, headers={'Range': 'bytes=10-', 'If-Range': etag}).data == CONTENT[10:]
+    assert client.get(url, headers={'Range': 'bytes=10-', 'If-Range': '"stale"'}).status_code == 200
+    full.close()
+    partial.close()
+
+
+def test_download_of_revoked_or_removed_result(server, result_file):
+    client = server.app.test_client()
+    artifact = server.download_registry.issue('job-gone', result_file, 'converted.zip')
+    os.remove(result_file)
+    assert client.get(f'/api/downloads/{artifact.token}').status_code == 410
+    server.download_registry.revoke_job('job-gone')
+    assert client.get(f'/api/downloads/{artifact.token}').status_code == 404
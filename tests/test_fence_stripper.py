@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from src.api_client.custom_client import MockAPIClient
+from src.converter.base_converter import MarkdownFenceStripper
+from src.converter.python_converter import PythonConverter
+
+RESPONSES = [
+    '```python\ndef f():\n    return 1\n```',
+    '\n\n```java\nclass A {\n    String s = "`";\n}\n```\n说明文字不应输出',
+    '```\nint x = `y`;\n```',
+    '```js\n\n\nconst a = 1;```',
+    '```const a = 1;```',
+    'def plain():\n    pass\n',
+    '  ``not a fence``\n',
+]
+
+
+def stream(chunks):
+    stripper = MarkdownFenceStripper()
+    return ''.join(stripper.feed(chunk) for chunk in chunks) + stripper.finish()
+
+
+@pytest.fixture(scope='module')
+def converter():
+    return PythonConverter(MockAPIClient())
+
+
+@pytest.mark.parametrize('response', RESPONSES)
+def test_every_split_point_matches_format_code(converter, response):
+    expected = converter.format_code('python', response)
+    assert stream([response]).strip() == expected
+    for cut in range(len(response) + 1):
+        assert stream([response[:cut], response[cut:]]).strip() == expected
+
+
+@pytest.mark.parametrize('response', RESPONSES)
+def test_single_character_chunks(converter, response):
+    assert stream(list(response)).strip() == converter.format_code('python', response)
+
+
+def test_random_chunking(converter):
+    rng = random.Random(7)
+    for response in RESPONSES:
+        expected = converter.format_code('python', response)
+        for _ in range(50):
+            cuts = sorted(rng.sample(range(1, len(response)), min(4, len(response) - 1)))
+            chunks = [response[start:end] for start, end in zip([0] + cuts, cuts + [len(response)])]
+            assert stream(chunks).strip() == expected
+
+
+def test_unterminated_fence_drops_language_line():
+    # 输出被截断时没有结束标记，语言标记行同样不输出
+    response = '```python\nunterminated = True\n'
+    for cut in range(len(response) + 1):
+        assert stream([response[:cut], response[cut:]]) == 'unterminated = True\n'
+
+
+def test_output_stops_at_closing_fence():
+    stripper = MarkdownFenceStripper()
+    assert stripper.feed('```py') == ''
+    assert stripper.feed('thon\nx = 1\n`') == 'x = 1\n'
+    assert stripper.feed('``\nmore') == ''
+    assert stripper.feed('text') == ''
+    assert stripper.finish() == ''
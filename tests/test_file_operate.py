@@ -0,0 +1,87 @@
+import io
+import threading
+import zipfile
+
+import pytest
+
+from src.utils.file_operate import StreamingZipWriter, ZipSource, normalize_member_name
+
+
+def test_normalize_member_name():
+    assert normalize_member_name('a\\b/../c.py') == 'a/c.py'
+    assert normalize_member_name('/abs/x.py') == 'abs/x.py'
+    for unsafe in ('../x.py', '..', 'dir/', 'C:/x.py', ''):
+        assert normalize_member_name(unsafe) is None
+
+
+def test_streaming_zip_round_trip(tmp_path):
+    writer = StreamingZipWriter(str(tmp_path / 'out.zip'))
+    writer.write_text(writer.reserve_name('a.py'), 'print(1)')
+    assert writer.reserve_name('a.py') == 'a_1.py'
+    writer.write_stream('bin/data', io.BytesIO(b'\0' * 100))
+    stream = writer.iter_bytes()
+    writer.close()
+    data = b''.join(stream)
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.read('a.py') == b'print(1)'
+        assert archive.read('bin/data') == b'\0' * 100
+
+
+def test_streaming_zip_follows_writes(tmp_path):
+    writer = StreamingZipWriter(str(tmp_path / 'out.zip'))
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.extend(writer.iter_bytes(chunk_size=16)))
+    reader.start()
+    for index in range(5):
+        writer.write_text(f'f{index}.txt', 'x' * 200)
+    writer.close()
+    reader.join(5)
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+        assert len(archive.namelist()) == 5
+
+
+def test_aborted_stream_is_truncated(tmp_path):
+    path = str(tmp_path / 'out.zip')
+    writer = StreamingZipWriter(path)
+    writer.write_text('a.txt', 'a' * 1000)
+    stream = writer.iter_bytes()
+    received = [next(stream)]
+    writer.write_text('b.txt', 'b' * 1000)
+    writer.abort()
+    with pytest.raises(IOError):
+        for chunk in stream:
+            received.append(chunk)
+    assert writer.aborted and not (tmp_path / 'out.zip').exists()
+    # 没有中央目录，客户端无法把中止任务的结果当作完整的ZIP
+    with pytest.raises(zipfile.BadZipFile):
+        zipfile.ZipFile(io.BytesIO(b''.join(received)))
+
+
+def test_abort_after_close_keeps_stream_complete(tmp_path):
+    writer = StreamingZipWriter(str(tmp_path / 'out.zip'))
+    writer.write_text('a.txt', 'a')
+    stream = writer.iter_bytes()
+    first = next(stream)
+    writer.close()
+    rest = b''.join(stream)
+    writer.abort()
+    assert not writer.aborted
+    with zipfile.ZipFile(io.BytesIO(first + rest)) as archive:
+        assert archive.read('a.txt') == b'a'
+
+
+def test_zip_source_merges_archives(tmp_path):
+    paths = []
+    for index, members in enumerate(({'a.py': 'old', '../evil.py': 'x'}, {'a.py': 'new', 'b/c.py': 'c'})):
+        path = tmp_path / f'{index}.zip'
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name, text in members.items():
+                archive.writestr(name, text)
+        paths.append(str(path))
+    source = ZipSource(paths)
+    try:
+        assert source.list_files() == ['a.py', 'b/c.py']
+        assert source.read_text('a.py') == 'new'
+        assert source.size('b/c.py') == 1
+    finally:
+        source.close()
@@ -0,0 +1,92 @@
+import threading
+
+from src.pipeline.job_queue import JobQueue, JobStatus
+
+
+def wait_finished(job, timeout=5.0):
+    job._future.exception(timeout)
+    return job
+
+
+def test_job_runs_to_completion():
+    queue = JobQueue(1)
+    job = wait_finished(queue.submit(lambda job, a, b=0: a + b, 1, b=2, metadata={'kind': 'test'}))
+    assert job.status == JobStatus.COMPLETED
+    assert job.result == 3
+    assert job.metadata == {'kind': 'test'}
+    assert job.started_at is not None and job.finished_at >= job.started_at
+    assert queue.get(job.id) is job
+
+
+def test_job_failure_records_error():
+    def fail(job):
+        raise RuntimeError('boom')
+
+    job = wait_finished(JobQueue(1).submit(fail))
+    assert job.status == JobStatus.FAILED
+    assert job.error == 'boom'
+
+
+def test_status_moves_from_queued_to_running():
+    queue = JobQueue(1)
+    gate = threading.Event()
+    running = threading.Event()
+
+    def blocked(job):
+        running.set()
+        gate.wait(5)
+
+    first = queue.submit(blocked)
+    running.wait(5)
+    second = queue.submit(lambda job: None)
+    assert first.status == JobStatus.RUNNING
+    assert second.status == JobStatus.QUEUED
+    assert queue.status_counts()[JobStatus.QUEUED] == 1
+    gate.set()
+    wait_finished(first)
+    wait_finished(second)
+    assert queue.status_counts()[JobStatus.COMPLETED] == 2
+
+
+def test_cancel_queued_job():
+    queue = JobQueue(1)
+    gate = threading.Event()
+    first = queue.submit(lambda job: gate.wait(5))
+    queued = queue.submit(lambda job: 'never')
+    assert queue.cancel(queued.id)
+    assert queued.status == JobStatus.CANCELLED
+    assert queued.result is None
+    gate.set()
+    wait_finished(first)
+    assert first.status == JobStatus.COMPLETED
+
+
+def test_cancel_running_job_stops_at_checkpoint():
+    queue = JobQueue(1)
+    running = threading.Event()
+
+    def work(job):
+        running.set()
+        job.cancel_event.wait(5)
+        job.check_cancelled()
+        return 'unreachable'
+
+    job = queue.submit(work)
+    running.wait(5)
+    assert queue.cancel(job.id)
+    wait_finished(job)
+    assert job.status == JobStatus.CANCELLED
+    # 已结束的任务不能再取消，可以删除记录
+    assert not queue.cancel(job.id)
+    assert queue.discard(job.id)
+    assert queue.get(job.id) is None
+
+
+def test_discard_keeps_unfinished_jobs():
+    queue = JobQueue(1)
+    gate = threading.Event()
+    job = queue.submit(lambda job: gate.wait(5))
+    assert not queue.discard(job.id)
+    gate.set()
+    wait_finished(job)
+    assert queue.discard(job.id)
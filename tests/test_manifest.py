@@ -0,0 +1,52 @@
+from src.api_client.custom_client import MockAPIClient
+from src.converter.python_converter import PythonConverter
+from src.pipeline.manifest import ProjectManifest, make_project_key
+
+CODE = 'def add(a, b):\n    return a + b\n'
+
+
+def test_project_key_separates_projects_and_pairs():
+    key = make_project_key('shop', 'python', 'java')
+    assert key == make_project_key('shop', 'python', 'java')
+    assert key != make_project_key('shop', 'python', 'js')
+    assert make_project_key('ab', 'c', 'java') != make_project_key('a', 'bc', 'java')
+
+
+def test_unchanged_fingerprint_reuses_record(tmp_path):
+    manifest = ProjectManifest(str(tmp_path / 'manifest.db'))
+    converter = PythonConverter(MockAPIClient())
+    key = make_project_key('shop', 'python', 'java')
+    fingerprint = converter.fingerprint('python', 'java', CODE)
+    manifest.record(key, 'src/util.py', fingerprint, 'converted', summary='add(a, b)', job_id='job-1')
+
+    # 重新打开清单（如服务重启后续转）时，输入未变化的文件直接复用结果
+    reopened = ProjectManifest(manifest.path)
+    entry = reopened.lookup(key, 'src/util.py', converter.fingerprint('python', 'java', CODE))
+    assert entry is not None
+    assert (entry.output, entry.summary) == ('converted', 'add(a, b)')
+
+
+def test_changed_inputs_miss(tmp_path):
+    manifest = ProjectManifest(str(tmp_path / 'manifest.db'))
+    converter = PythonConverter(MockAPIClient())
+    key = make_project_key('shop', 'python', 'java')
+    manifest.record(key, 'src/util.py', converter.fingerprint('python', 'java', CODE), 'converted')
+
+    edited = converter.fingerprint('python', 'java', CODE + '\n# edited\n')
+    dependency_changed = converter.fingerprint('python', 'java', CODE, dependencies='class Money')
+    assert manifest.lookup(key, 'src/util.py', edited) is None
+    assert manifest.lookup(key, 'src/util.py', dependency_changed) is None
+    assert manifest.lookup(make_project_key('other', 'python', 'java'), 'src/util.py',
+                           converter.fingerprint('python', 'java', CODE)) is None
+
+
+def test_record_overwrites_and_prune_drops_removed_files(tmp_path):
+    manifest = ProjectManifest(str(tmp_path / 'manifest.db'))
+    key = make_project_key('shop', 'python', 'java')
+    manifest.record(key, 'a.py', 'f1', 'old')
+    manifest.record(key, 'a.py', 'f2', 'new')
+    manifest.record(key, 'b.py', 'f3', 'b')
+    assert manifest.lookup(key, 'a.py', 'f1') is None
+    assert manifest.lookup(key, 'a.py', 'f2').output == 'new'
+    assert manifest.prune(key, ['a.py']) == 1
+    assert manifest.count(key) == 1
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from src.pipeline.progress import MemoryProgressBus, ProgressTracker, SQLiteProgressBus
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def bus(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryProgressBus(ttl=0)
+    return SQLiteProgressBus(str(tmp_path / 'progress.db'), ttl=0, poll_interval=0.02)
+
+
+def publish_later(bus, job_id, states, delay=0.02):
+    def run():
+        for state in states:
+            time.sleep(delay)
+            bus.publish(job_id, state)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_subscribe_receives_changes_until_terminal(bus):
+    bus.publish('job', {'status': 'preparing'})
+    thread = publish_later(bus, 'job', [{'status': 'converting', 'current': 1},
+                                        {'status': 'completed', 'current': 2}])
+    events = [event for event in bus.subscribe('job', heartbeat=1.0) if event is not None]
+    thread.join()
+    assert [seq for seq, _ in events] == [1, 2, 3]
+    assert events[-1][1] == {'status': 'completed', 'current': 2}
+
+
+def test_resubscribe_after_terminal_returns_immediately(bus):
+    bus.publish('job', {'status': 'converting'})
+    seq = bus.publish('job', {'status': 'error', 'error': 'boom'})
+    started = time.monotonic()
+    assert list(bus.subscribe('job', after=seq, heartbeat=1.0)) == []
+    assert time.monotonic() - started < 0.5
+    # 从中途重连只收到之后的状态
+    assert list(bus.subscribe('job', after=seq - 1, heartbeat=1.0)) == [(seq, {'status': 'error', 'error': 'boom'})]
+
+
+def test_heartbeat_when_nothing_changes(bus):
+    bus.publish('job', {'status': 'converting'})
+    events = bus.subscribe('job', after=1, heartbeat=0.05)
+    assert next(events) is None
+    bus.publish('job', {'status': 'cancelled'})
+    assert next(events) == (2, {'status': 'cancelled'})
+    assert list(events) == []
+
+
+def test_discard_ends_subscription(bus):
+    bus.publish('job', {'status': 'converting'})
+    events = bus.subscribe('job', after=1, heartbeat=5.0)
+    threading.Timer(0.05, bus.discard, args=('job',)).start()
+    assert list(events) == []
+    assert bus.get('job') is None
+    assert list(bus.subscribe('missing')) == []
+
+
+def test_published_state_is_a_snapshot():
+    bus = MemoryProgressBus(ttl=0)
+    state = {'status': 'converting', 'in_progress': ['a.py']}
+    bus.publish('job', state)
+    state['in_progress'].append('b.py')
+    assert bus.state('job')['in_progress'] == ['a.py']
+
+
+def test_sqlite_bus_sees_other_process_publishes(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    subscriber = SQLiteProgressBus(path, ttl=0, poll_interval=0.02)
+    publisher = SQLiteProgressBus(path, ttl=0)
+    publisher.publish('job', {'status': 'converting'})
+    thread = publish_later(publisher, 'job', [{'status': 'completed'}])
+    events = [event for event in subscriber.subscribe('job', heartbeat=1.0) if event is not None]
+    thread.join()
+    assert events == [(1, {'status': 'converting'}), (2, {'status': 'completed'})]
+
+
+def test_expired_terminal_progress_is_purged(bus):
+    bus.ttl = 0.01
+    bus.publish('done', {'status': 'completed'})
+    bus.publish('running', {'status': 'converting'})
+    time.sleep(0.02)
+    bus.publish('other', {'status': 'converting'})
+    assert bus.get('done') is None
+    assert bus.get('running') is not None
+
+
+def test_tracker_publishes_terminal_state(bus):
+    tracker = ProgressTracker(bus, 'job', min_interval=60)
+    tracker.set_status('converting', total=2)
+    tracker.file_started('src/a.py')
+    tracker.file_finished('src/a.py')
+    # 未到最小间隔的逐文件事件不发布
+    assert bus.state('job')['current'] == 0
+    tracker.file_started('src/b.py')
+    tracker.file_finished('src/b.py', ok=False)
+    state = bus.state('job')
+    assert (state['current'], state['failed']) == (2, 1)
+    tracker.set_status('completed')
+    state = bus.state('job')
+    assert state['status'] == 'completed' and state['eta_seconds'] == 0 and state['in_progress'] == []
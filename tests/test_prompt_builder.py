@@ -0,0 +1,64 @@
+from config.prompt_config import PromptConfig
+from src.utils.prompt_builder import PromptBuilder, load_pair_templates, parse_pair_templates
+
+TEMPLATE = '''# 语言对规则
+
+这里的说明文字会被忽略。
+
+## C -> Python
+- 指针改写为引用
+- 结构体改写为 dataclass
+
+## * -> js
+- 使用 const/let
+
+```markdown
+## python -> c
+代码块中的标题不是小节
+```
+
+# 其他内容
+不属于任何语言对
+
+## c -> python
+- 宏改写为常量
+'''
+
+
+def test_parse_pair_templates():
+    templates = parse_pair_templates(TEMPLATE)
+    assert set(templates) == {('c', 'python'), ('*', 'js')}
+    assert templates[('c', 'python')] == '- 指针改写为引用\n- 结构体改写为 dataclass\n- 宏改写为常量'
+    assert '## python -> c' in templates[('*', 'js')]
+    assert '不属于任何语言对' not in ''.join(templates.values())
+
+
+def test_parse_pair_templates_skips_empty_sections():
+    assert parse_pair_templates('## c -> js\n\n## js -> c\n- rule\n') == {('js', 'c'): '- rule'}
+    assert parse_pair_templates('') == {}
+
+
+def test_load_pair_templates_missing_file(tmp_path):
+    assert load_pair_templates('') == {}
+    assert load_pair_templates(str(tmp_path / 'missing.md')) == {}
+    path = tmp_path / 'rules.md'
+    path.write_text('## java -> python\n- rule\n', encoding='utf-8')
+    assert load_pair_templates(str(path)) == {('java', 'python'): '- rule'}
+
+
+def test_pair_rules_merge_wildcards():
+    builder = PromptBuilder({('*', 'js'): 'any', ('c', '*'): 'from c', ('c', 'js'): 'c to js', ('java', 'js'): ''})
+    assert builder.pair_rules('C', 'JS') == 'any\nfrom c\nc to js'
+    assert builder.pair_rules('java', 'js') == 'any'
+    assert builder.pair_rules('python', 'c') == ''
+
+
+def test_prompt_shares_prefix_and_ends_with_code():
+    builder = PromptBuilder({('c', 'python'): '- rule'})
+    first = builder.build('c', 'python', 'int a;', context='ctx')
+    second = builder.build('c', 'python', 'int b;')
+    prefix = builder.prefix('c', 'python')
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert '- rule' in prefix
+    assert first.endswith(PromptConfig.CODE_PROMPT + 'int a;')
+    assert first.index('ctx') > len(prefix)
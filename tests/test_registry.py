@@ -0,0 +1,160 @@
+import time
+
+import pytest
+
+from src.api_client.base_client import BaseAPIClient
+from src.api_client.registry import (LEAST_OUTSTANDING, WEIGHTED_ROUND_ROBIN, Backend, CircuitBreaker,
+                                     ClientRegistry)
+from src.utils.error_handler import APIError
+
+
+class ScriptedClient(BaseAPIClient):
+    """按顺序返回预设结果的客户端，结果为异常时抛出"""
+
+    def __init__(self, api_key='', api_base='', model='scripted', results=None):
+        self.model = model
+        self.results = list(results or [])
+        self.calls = 0
+
+    def generate_response(self, prompt, budget=None):
+        self.calls += 1
+        result = self.results.pop(0) if self.results else 'ok'
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def code_conversion(self, source_lang, target_lang, code):
+        return self.generate_response(code)
+
+
+def make_backend(name, results=None, weight=1.0, threshold=2, reset_timeout=60.0):
+    return Backend(name, ScriptedClient(model=name, results=results), weight,
+                   CircuitBreaker(threshold, reset_timeout))
+
+
+def test_breaker_trips_and_recovers_after_probe():
+    breaker = CircuitBreaker(2, 10.0)
+    breaker.on_failure(0.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.on_failure(1.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available(5.0)
+
+    assert breaker.available(11.0)
+    breaker.on_dispatch(11.0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # 半开状态只放行一个探测请求
+    assert not breaker.available(11.0)
+    breaker.on_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker(1, 10.0)
+    breaker.on_failure(0.0)
+    breaker.on_dispatch(10.0)
+    breaker.on_failure(10.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available(15.0)
+
+
+def test_failover_to_next_backend_on_server_error():
+    first = make_backend('a', [APIError('down', 503)])
+    second = make_backend('b', ['from b'])
+    registry = ClientRegistry([first, second], LEAST_OUTSTANDING)
+    assert registry.generate_response('p') == 'from b'
+    assert (first.failures, second.successes) == (1, 1)
+    assert first.outstanding == second.outstanding == 0
+
+
+def test_all_backends_failing_raises_last_error():
+    registry = ClientRegistry([make_backend('a', [APIError('a down', 503)]),
+                               make_backend('b', [APIError('b down', 502)])], LEAST_OUTSTANDING)
+    with pytest.raises(APIError, match='b down'):
+        registry.generate_response('p')
+
+
+def test_request_error_does_not_fail_over_or_touch_breaker():
+    first = make_backend('a', [APIError('bad request', 400)], threshold=1)
+    second = make_backend('b')
+    registry = ClientRegistry([first, second], LEAST_OUTSTANDING)
+    # 熔断已冷却结束，下一个请求作为半开探测发出
+    first.breaker.on_failure(time.monotonic() - 120)
+
+    with pytest.raises(APIError, match='bad request'):
+        registry.generate_response('p')
+    assert second.client.calls == 0
+    # 请求本身的错误既不关闭也不重新打开熔断器，只释放探测名额
+    assert first.breaker.state == CircuitBreaker.HALF_OPEN
+    assert first.breaker.available(time.monotonic())
+    assert first.failures == 0
+
+
+def test_tripped_backend_is_skipped():
+    first = make_backend('a', [APIError('down', 503)], threshold=1)
+    second = make_backend('b')
+    registry = ClientRegistry([first, second], WEIGHTED_ROUND_ROBIN)
+    assert registry.generate_response('p') == 'ok'
+    assert first.breaker.state == CircuitBreaker.OPEN
+    for _ in range(4):
+        registry.generate_response('p')
+    assert first.client.calls == 1
+    assert second.client.calls == 5
+
+
+def test_breaker_recovers_through_registry():
+    backend = make_backend('a', [APIError('down', 503)], threshold=1, reset_timeout=0.05)
+    registry = ClientRegistry([backend, make_backend('b')], LEAST_OUTSTANDING)
+    registry.generate_response('p')
+    assert backend.breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    # 冷却结束后 a 重新可用，作为探测请求成功后恢复
+    backend.effective_weight = backend.weight
+    registry.backends[1].outstanding = 5
+    assert registry.generate_response('p') == 'ok'
+    assert backend.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_weighted_round_robin_follows_weights():
+    heavy = make_backend('heavy', weight=3)
+    light = make_backend('light', weight=1)
+    registry = ClientRegistry([heavy, light], WEIGHTED_ROUND_ROBIN)
+    order = []
+    for _ in range(8):
+        backend = registry._acquire(set())
+        order.append(backend.name)
+        registry._release(backend, time.monotonic())
+    assert order.count('heavy') == 6 and order.count('light') == 2
+    # 平滑加权轮询不会连续把全部请求压到同一个后端
+    assert order[:4] == ['heavy', 'heavy', 'light', 'heavy']
+
+
+def test_least_outstanding_prefers_idle_backend():
+    busy = make_backend('busy')
+    idle = make_backend('idle')
+    registry = ClientRegistry([busy, idle], LEAST_OUTSTANDING)
+    busy.outstanding = 2
+    assert registry._acquire(set()) is idle
+    assert registry._acquire(set()) is idle
+    assert idle.outstanding == 2
+    # 在途数相同时按延迟滑动平均选择
+    busy.ewma_latency, idle.ewma_latency = 0.1, 0.5
+    assert registry._acquire(set()) is busy
+
+
+def test_least_outstanding_scales_by_weight():
+    big = make_backend('big', weight=4)
+    small = make_backend('small', weight=1)
+    registry = ClientRegistry([big, small], LEAST_OUTSTANDING)
+    picks = [registry._acquire(set()).name for _ in range(5)]
+    assert picks.count('big') == 4 and picks.count('small') == 1
+
+
+def test_rate_limited_backend_cools_down():
+    limited = make_backend('a', [APIError('slow down', 429, 30.0)], threshold=5)
+    other = make_backend('b')
+    registry = ClientRegistry([limited, other], LEAST_OUTSTANDING)
+    assert registry.generate_response('p') == 'ok'
+    assert not limited.available(time.monotonic())
+    assert registry._acquire(set()) is other
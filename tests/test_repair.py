@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import Future
+
+from src.pipeline.repair import RepairStage
+from src.validator.base_validator import ValidationResult
+
+
+class FakeValidatorPool:
+    """同步验证：代码中包含 'ok' 即视为通过"""
+
+    def __init__(self):
+        self.checked = []
+
+    def submit(self, lang, code):
+        self.checked.append(code)
+        future = Future()
+        future.set_result(ValidationResult('ok' in code, [] if 'ok' in code else [f'bad: {code}'], 'fake'))
+        return future
+
+    def result(self, future, timeout=None):
+        return future.result(timeout)
+
+
+class FakeConverter:
+    """按顺序返回预设修复结果的转换器，记录每次修复请求"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def repair(self, source_lang, target_lang, original_code, converted_code, error_message):
+        with self.lock:
+            self.calls.append((converted_code, error_message))
+            reply = self.replies.pop(0) if self.replies else converted_code
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def run_stage(replies, code, max_rounds):
+    converter = FakeConverter(replies)
+    pool = FakeValidatorPool()
+    stage = RepairStage(converter, 'python', 'python', pool, max_rounds=max_rounds, max_workers=2)
+    outcomes = []
+    stage.submit('a.py', 'source', code, on_done=outcomes.append)
+    assert stage.wait(5)
+    stage.shutdown()
+    return stage, converter, outcomes[0]
+
+
+def test_valid_code_is_not_repaired():
+    stage, converter, outcome = run_stage([], 'ok', 3)
+    assert outcome.valid and outcome.rounds == 0
+    assert converter.calls == []
+
+
+def test_repair_until_valid():
+    stage, converter, outcome = run_stage(['still bad', 'ok now'], 'bad', 3)
+    assert outcome.valid
+    assert outcome.rounds == 2
+    assert outcome.code == 'ok now'
+    # 每轮修复带上上一轮的代码和验证错误
+    assert converter.calls == [('bad', 'bad: bad'), ('still bad', 'bad: still bad')]
+    assert stage.summary()['repaired'] == 1
+
+
+def test_rounds_are_capped():
+    stage, converter, outcome = run_stage(['bad 1', 'bad 2', 'bad 3', 'ok'], 'bad 0', 2)
+    assert not outcome.valid
+    assert outcome.rounds == 2
+    assert len(converter.calls) == 2
+    assert outcome.code == 'bad 2'
+    summary = stage.summary()
+    assert (summary['invalid'], summary['repair_calls']) == (1, 2)
+
+
+def test_zero_rounds_only_validates():
+    stage, converter, outcome = run_stage(['ok'], 'bad', 0)
+    assert not outcome.valid and outcome.rounds == 0
+    assert converter.calls == []
+
+
+def test_failed_repair_keeps_previous_code():
+    stage, converter, outcome = run_stage([RuntimeError('api down')], 'bad', 3)
+    assert outcome.code == 'bad'
+    assert outcome.rounds == 1
+    assert stage.errors == []
@@ -0,0 +1,124 @@
+import email.utils
+import time
+
+import pytest
+
+from src.api_client.retry import RetryScheduler, TokenBucket, classify_error, parse_retry_after
+from src.utils.error_handler import APIError, DeadlineExceededError, RateLimitError
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeHTTPError(Exception):
+    """带状态码和响应头的请求异常，与 openai.APIStatusError 的属性一致"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+def flaky(errors, result='ok'):
+    """依次抛出 errors 中的异常，之后返回 result"""
+    calls = []
+
+    def func(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return func, calls
+
+
+def make_scheduler(max_retries=3, timeout=5.0, deadline=None, rate=0.0):
+    return RetryScheduler(max_retries, timeout, TokenBucket(rate, 1), deadline=deadline, base_delay=0.001,
+                          max_delay=1.0)
+
+
+def test_parse_retry_after_formats():
+    assert parse_retry_after({'retry-after': '2'}) == 2.0
+    assert parse_retry_after({'retry-after-ms': '250', 'retry-after': '9'}) == 0.25
+    assert parse_retry_after({'retry-after': 'soon'}) is None
+    assert parse_retry_after({}) is None
+    future = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < parse_retry_after({'retry-after': future}) <= 30
+
+
+def test_classify_error():
+    assert classify_error(FakeHTTPError(503, {'retry-after': '1'})) == (True, 503, 1.0)
+    assert classify_error(FakeHTTPError(400)) == (False, 400, None)
+    assert classify_error(ValueError('no status')) == (False, None, None)
+
+
+def test_retries_until_success():
+    func, calls = flaky([FakeHTTPError(503), FakeHTTPError(502)])
+    assert make_scheduler().call(func) == 'ok'
+    assert len(calls) == 3
+
+
+def test_non_retryable_error_raises_immediately():
+    func, calls = flaky([FakeHTTPError(401)])
+    with pytest.raises(APIError) as info:
+        make_scheduler().call(func)
+    assert info.value.status_code == 401
+    assert len(calls) == 1
+
+
+def test_retry_after_is_honoured():
+    func, calls = flaky([FakeHTTPError(503, {'retry-after-ms': '150'})])
+    started = time.monotonic()
+    make_scheduler().call(func)
+    assert time.monotonic() - started >= 0.15
+
+
+def test_retry_after_beyond_deadline_gives_up():
+    func, calls = flaky([FakeHTTPError(503, {'retry-after': '0.5'})])
+    with pytest.raises(DeadlineExceededError):
+        make_scheduler(deadline=0.2).call(func)
+    assert len(calls) == 1
+
+
+def test_attempt_timeout_shrinks_to_deadline():
+    func, calls = flaky([])
+    make_scheduler(timeout=10.0, deadline=2.0).call(func)
+    assert calls[0] <= 2.0
+
+
+def test_rate_limit_pauses_shared_bucket():
+    bucket = TokenBucket(0, 1)
+    scheduler = RetryScheduler(0, 5.0, bucket)
+    func, _ = flaky([FakeHTTPError(429, {'retry-after': '0.3'})])
+    with pytest.raises(RateLimitError) as info:
+        scheduler.call(func)
+    assert info.value.retry_after == 0.3
+    # 共享同一令牌桶的其他请求也要等待 Retry-After
+    assert 0.2 < bucket.reserve() <= 0.3
+
+
+def test_rate_limit_retry_waits_for_pause():
+    bucket = TokenBucket(0, 1)
+    scheduler = RetryScheduler(2, 5.0, bucket)
+    func, calls = flaky([FakeHTTPError(429, {'retry-after-ms': '100'})])
+    started = time.monotonic()
+    assert scheduler.call(func) == 'ok'
+    assert len(calls) == 2
+    assert time.monotonic() - started >= 0.1
+
+
+def test_token_bucket_queues_callers():
+    bucket = TokenBucket(10, 2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.05 < waits[2] <= 0.1
+    assert 0.15 < waits[3] <= 0.2
+
+
+def test_slot_wait_beyond_deadline_raises():
+    bucket = TokenBucket(0, 1)
+    bucket.pause(5)
+    with pytest.raises(DeadlineExceededError):
+        RetryScheduler(1, 1.0, bucket, deadline=1.0).call(lambda timeout: 'ok')
@@ -0,0 +1,177 @@
+from src.pipeline.similarity import (SimilarityMethod, SimilarityReuser, SimilarityStore, align_reference,
+                                     fingerprint_code, similarity, source_diff, substitute_clone, tokenize)
+
+DAO = '''class UserDao:
+    TABLE = "users"
+
+    def find_user(self, user_id):
+        # see find_user
+        row = self.db.query(self.TABLE, user_id)
+        if row is None:
+            raise KeyError(user_id)
+        return User(**row)
+
+    def save_user(self, user):
+        return self.db.insert(self.TABLE, user.__dict__)
+'''
+
+DAO_OUTPUT = '''class UserDao {
+    static TABLE = "users";
+
+    // see find_user
+    find_user(user_id) {
+        const row = this.db.query(UserDao.TABLE, user_id);
+        if (row === null) {
+            throw new Error(user_id);
+        }
+        return new User(row);
+    }
+
+    save_user(user) {
+        return this.db.insert(UserDao.TABLE, user);
+    }
+}
+'''
+
+
+def rename(text, old, new):
+    return text.replace(old.capitalize(), new.capitalize()).replace(old, new)
+
+
+def test_tokenize_kinds():
+    tokens = tokenize('x = "a#b"  # note\ny = 0x1F', 'python')
+    assert [(token.kind, token.text) for token in tokens] == [
+        ('id', 'x'), ('op', '='), ('str', '"a#b"'), ('comment', '# note'), ('id', 'y'), ('op', '='), ('num', '0x1F')
+    ]
+
+
+def test_clone_renames_identifiers_and_comments():
+    code = rename(DAO, 'user', 'order').replace('"orders"', '"users"')
+    output = substitute_clone(DAO, DAO_OUTPUT, code, 'python', 'js')
+    assert output == rename(DAO_OUTPUT, 'user', 'order').replace('"orders"', '"users"')
+
+
+def test_clone_round_trip():
+    code = rename(DAO, 'user', 'order').replace('"orders"', '"users"')
+    forward = substitute_clone(DAO, DAO_OUTPUT, code, 'python', 'js')
+    assert substitute_clone(code, forward, DAO, 'python', 'js') == DAO_OUTPUT
+
+
+def test_identical_source_returns_reference_output():
+    assert substitute_clone(DAO, DAO_OUTPUT, DAO, 'python', 'js') == DAO_OUTPUT
+
+
+def test_clone_rejects_literal_changes():
+    # 转换结果中的 2 是模型添加的调用参数，与源代码中的 2 没有对应关系
+    output = 'def scale(v):\n    return v * 2\n\nprint(scale(2))\n'
+    assert substitute_clone('int scale(int v){return v*2;}', output, 'int scale(int v){return v*3;}',
+                            'c', 'python') is None
+    assert substitute_clone(DAO, DAO_OUTPUT, DAO.replace('"users"', '"accounts"'), 'python', 'js') is None
+
+
+def test_clone_rejects_comment_changes():
+    source = '# Copyright A\ndef f(a):\n    return a\n'
+    output = '// Copyright A\nfunction f(a) { return a; }\n'
+    assert substitute_clone(source, output, source.replace('A', 'B'), 'python', 'js') is None
+
+
+def test_clone_rejects_structure_and_ambiguous_mappings():
+    assert substitute_clone('f(a, b)', 'f(a, b)', 'f(a, b, c)', 'python', 'python') is None
+    # a 和 b 都改为 c，无法一一对应
+    assert substitute_clone('f(a, b)', 'f(a, b)', 'f(c, c)', 'python', 'python') is None
+
+
+def test_clone_rejects_names_missing_from_output():
+    # 转换结果改写了命名风格，找不到源代码中的名称
+    output = DAO_OUTPUT.replace('find_user', 'findUser')
+    code = rename(DAO, 'user', 'order').replace('"orders"', '"users"')
+    assert substitute_clone(DAO, output, code, 'python', 'js') is None
+
+
+def test_clone_rejects_rename_onto_existing_output_name():
+    # 转换结果中已有名称 row，把 user_id 改为 row 会合并两个不同的名称
+    assert substitute_clone('def f(user_id):\n    return user_id\n', 'function f(user_id) { const row = 1; return user_id; }',
+                            'def f(row):\n    return row\n', 'python', 'js') is None
+
+
+def test_align_reference_leaves_only_structural_diff():
+    code = rename(DAO, 'user', 'order') + '\n    def count(self):\n        return self.db.count(self.TABLE)\n'
+    source, output = align_reference(DAO, DAO_OUTPUT, code, 'python', 'js')
+    assert 'order_id' in source and 'find_order' in output and 'user' not in output.replace('users', '')
+    # 字面量不改名，其差异与新增的方法一起留在 diff 中
+    changed = [line for line in source_diff(source, code).splitlines()[2:] if line[:1] in '+-']
+    assert changed == ['-    TABLE = "users"', '+    TABLE = "orders"', '+', '+    def count(self):',
+                       '+        return self.db.count(self.TABLE)']
+    assert '"users"' in output
+
+
+def test_align_reference_without_renames_is_identity():
+    assert align_reference(DAO, DAO_OUTPUT, DAO + '\nx = 1\n', 'python', 'js') == (DAO, DAO_OUTPUT)
+
+
+def test_fingerprint_shape_and_similarity():
+    base = fingerprint_code(DAO, 'python')
+    renamed = fingerprint_code(rename(DAO, 'user', 'order'), 'python')
+    extended = fingerprint_code(DAO + '\n    def count(self):\n        return self.db.count(self.TABLE)\n', 'python')
+    unrelated = fingerprint_code('import os\nfor name in os.listdir("."):\n    print(name, len(name) * 3)\n', 'python')
+    assert base.shape == renamed.shape and base.signature == renamed.signature
+    assert base.shape != extended.shape
+    assert similarity(base.signature, extended.signature) >= 0.6
+    assert similarity(base.signature, unrelated.signature) < 0.2
+
+
+class FakeConverter:
+    def __init__(self):
+        self.calls = []
+
+    def fingerprint(self, *args):
+        return 'scope'
+
+    def convert(self, source_lang, target_lang, code, dependencies=''):
+        self.calls.append('full')
+        return DAO_OUTPUT if code == DAO else 'converted'
+
+    def convert_delta(self, source_lang, target_lang, code, reference_output, diff, dependencies=''):
+        self.calls.append('delta')
+        return 'delta'
+
+
+def run_reuser(files, store=None, project_key=''):
+    converter = FakeConverter()
+    reuser = SimilarityReuser(converter, 'python', 'js', store, project_key, threshold=0.6, min_tokens=10)
+    waves = [sorted(files)]
+    reuser.plan(waves, files.get)
+    for batch in reuser.split_wave(waves[0]):
+        for path in batch:
+            output = reuser.convert(path, files[path])
+            reuser.remember(path, files[path], output)
+    return reuser, converter
+
+
+def test_reuser_clusters_project_files():
+    files = {
+        'a_user.py': DAO,
+        'b_order.py': rename(DAO, 'user', 'order').replace('"orders"', '"users"'),
+        'c_item.py': rename(DAO, 'user', 'item'),
+        'd_extra.py': DAO + '\n    def count(self):\n        return self.db.count(self.TABLE)\n',
+    }
+    reuser, converter = run_reuser(files)
+    assert reuser.split_wave(sorted(files)) == [['a_user.py'], ['b_order.py', 'c_item.py', 'd_extra.py']]
+    assert [reuser.method(path) for path in sorted(files)] == [
+        SimilarityMethod.CONVERTED, SimilarityMethod.CLONE, SimilarityMethod.DELTA, SimilarityMethod.DELTA
+    ]
+    assert converter.calls == ['full', 'delta', 'delta']
+    assert reuser.stats == {'clusters': 1, 'clones': 1, 'deltas': 2, 'cross_job': 0}
+
+
+def test_store_is_scoped_by_project(tmp_path):
+    store = SimilarityStore(str(tmp_path / 'similarity.db'))
+    run_reuser({'a.py': DAO}, store, 'project-a')
+    clone = rename(DAO, 'user', 'order').replace('"orders"', '"users"')
+
+    reuser, converter = run_reuser({'b.py': clone}, store, 'project-a')
+    assert reuser.method('b.py') == SimilarityMethod.CLONE and converter.calls == []
+    assert reuser.stats['cross_job'] == 1
+
+    reuser, converter = run_reuser({'b.py': clone}, store, 'project-b')
+    assert reuser.method('b.py') == SimilarityMethod.CONVERTED and converter.calls == ['full']
@@ -0,0 +1,112 @@
+import io
+import zipfile
+
+import pytest
+from flask import Flask, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config.app_config import AppConfig
+from src.web.upload import UploadQuota, configure_upload_limits
+
+BOUNDARY = 'quota-test-boundary'
+
+
+class CountingStream(io.BytesIO):
+    """记录被读取字节数的请求体"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.consumed += len(data)
+        return data
+
+    def read1(self, size=-1):
+        data = super().read1(size)
+        self.consumed += len(data)
+        return data
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        self.consumed += count
+        return count
+
+    def readline(self, size=-1):
+        data = super().readline(size)
+        self.consumed += len(data)
+        return data
+
+
+def multipart(files):
+    parts = []
+    for name, content in files:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n')
+    return b''.join(parts) + f'--{BOUNDARY}--\r\n'.encode()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(AppConfig, 'UPLOAD_MAX_BYTES', 256 * 1024)
+    monkeypatch.setattr(AppConfig, 'UPLOAD_MAX_FILES', 3)
+    monkeypatch.setattr(AppConfig, 'UPLOAD_MAX_FILE_BYTES', 64 * 1024)
+    monkeypatch.setattr(AppConfig, 'UPLOAD_SPOOL_BYTES', 16 * 1024)
+    app = Flask(__name__)
+    configure_upload_limits(app)
+    # 请求体大小由上传配额检查，不依赖 MAX_CONTENT_LENGTH
+    app.config['MAX_CONTENT_LENGTH'] = None
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        files = request.files.getlist('files')
+        return jsonify({'files': len(files), 'bytes': request.upload_quota.total_bytes})
+
+    return app.test_client()
+
+
+def post(client, body):
+    stream = CountingStream(body)
+    response = client.post('/upload', input_stream=stream, content_length=len(body),
+                           content_type=f'multipart/form-data; boundary={BOUNDARY}')
+    return response, stream
+
+
+def test_upload_within_quota(client):
+    response, _ = post(client, multipart([('a.py', b'x' * 40000), ('b.py', b'y' * 1000)]))
+    assert response.status_code == 200
+    assert response.get_json() == {'files': 2, 'bytes': 41000}
+
+
+def test_oversized_file_is_rejected_mid_stream(client):
+    body = multipart([('big.py', b'x' * (4 * 1024 * 1024))])
+    response, stream = post(client, body)
+    assert response.status_code == 413
+    # 超出单个文件上限后立即停止读取，不会读完整个请求体
+    assert 64 * 1024 < stream.consumed < len(body) // 4
+
+
+def test_total_bytes_limit(client):
+    body = multipart([(f'{index}.py', b'x' * 60000) for index in range(3)] + [('tail.py', b'x' * 1024 * 1024)])
+    response, stream = post(client, body)
+    assert response.status_code == 413
+    assert stream.consumed < len(body)
+
+
+def test_file_count_limit(client):
+    response, _ = post(client, multipart([(f'{index}.py', b'x') for index in range(4)]))
+    assert response.status_code == 413
+
+
+def test_check_zip_counts_uncompressed_size(tmp_path):
+    path = str(tmp_path / 'bomb.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('dir/', '')
+        archive.writestr('dir/zeros.bin', b'\0' * 200000)
+    quota = UploadQuota(max_bytes=10 ** 6, max_files=10, max_file_bytes=100000)
+    with pytest.raises(RequestEntityTooLarge):
+        quota.check_zip(path)
+    quota = UploadQuota(max_bytes=10 ** 6, max_files=10, max_file_bytes=10 ** 6)
+    quota.check_zip(path)
+    assert (quota.files, quota.total_bytes) == (1, 200000)
@@ -0,0 +1,52 @@
+import threading
+
+from src.pipeline.worker_pool import ConversionPool
+
+
+def test_results_keep_input_order():
+    results = ConversionPool(4).run(range(10), lambda item: item * item)
+    assert [result.item for result in results] == list(range(10))
+    assert [result.result for result in results] == [item * item for item in range(10)]
+    assert all(result.ok for result in results)
+
+
+def test_fail_fast_skips_tasks_not_yet_started():
+    started = []
+
+    def convert(item):
+        started.append(item)
+        if item == 0:
+            raise ValueError('bad file')
+        return item
+
+    results = ConversionPool(1).run(range(5), convert, fail_fast=True)
+    assert started == [0]
+    assert len(results) == 1
+    assert isinstance(results[0].error, ValueError)
+
+
+def test_without_fail_fast_all_tasks_run():
+    def convert(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    finished = []
+    results = ConversionPool(2).run(range(6), convert, on_finish=finished.append, fail_fast=False)
+    assert len(results) == len(finished) == 6
+    assert [result.ok for result in results] == [True, False] * 3
+
+
+def test_should_stop_prevents_new_tasks():
+    stop = threading.Event()
+    started = []
+
+    def convert(item):
+        started.append(item)
+        if item == 1:
+            stop.set()
+        return item
+
+    results = ConversionPool(1).run(range(5), convert, on_start=lambda item: None, should_stop=stop.is_set)
+    assert started == [0, 1]
+    assert [result.item for result in results] == [0, 1]
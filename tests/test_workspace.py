@@ -0,0 +1,99 @@
+import os
+import time
+
+from src.pipeline.workspace import WorkspaceManager
+
+
+def make_manager(tmp_path, **kwargs):
+    removed = []
+    kwargs.setdefault('ttl', 0)
+    kwargs.setdefault('max_bytes', 0)
+    manager = WorkspaceManager(root=str(tmp_path), interval=60, on_remove=removed.append, **kwargs)
+    return manager, removed
+
+
+def add_workspace(manager, size=0, age=0.0):
+    workspace = manager.create()
+    with open(os.path.join(workspace.path, 'data.bin'), 'wb') as f:
+        f.write(b'x' * size)
+    manager.release(workspace.id)
+    workspace.last_used = time.time() - age
+    return workspace
+
+
+def test_reap_removes_expired_workspaces(tmp_path):
+    manager, removed = make_manager(tmp_path, ttl=60)
+    old = add_workspace(manager, age=120)
+    fresh = add_workspace(manager, age=10)
+    assert manager.reap() == [old.id]
+    assert not os.path.exists(old.path)
+    assert os.path.isdir(fresh.path)
+    assert removed == [old.id]
+    assert manager.get(old.id) is None
+
+
+def test_budget_evicts_least_recently_used_first(tmp_path):
+    manager, removed = make_manager(tmp_path, max_bytes=250)
+    oldest = add_workspace(manager, size=100, age=30)
+    middle = add_workspace(manager, size=100, age=20)
+    newest = add_workspace(manager, size=100, age=10)
+    assert manager.reap() == [oldest.id]
+    assert manager.usage() == 200
+    manager.max_bytes = 50
+    assert manager.reap() == [middle.id, newest.id]
+
+
+def test_in_use_and_held_workspaces_are_kept(tmp_path):
+    running = set()
+    manager, removed = make_manager(tmp_path, ttl=60, max_bytes=10, in_use=lambda workspace_id: workspace_id in running)
+    busy = add_workspace(manager, size=100, age=120)
+    running.add(busy.id)
+    held = manager.create()
+    held.last_used = time.time() - 120
+    assert manager.reap() == []
+    # 任务结束后才开始计算保留时间
+    running.clear()
+    assert manager.reap() == [busy.id]
+    assert os.path.isdir(held.path)
+
+
+def test_reaper_rechecks_before_removing(tmp_path):
+    state = {'calls': 0}
+
+    def in_use(workspace_id):
+        # 检查时任务已结束，删除前任务被续转
+        state['calls'] += 1
+        return state['calls'] > 1
+
+    manager, removed = make_manager(tmp_path, ttl=60, in_use=in_use)
+    workspace = add_workspace(manager, age=120)
+    assert manager.reap() == []
+    assert os.path.isdir(workspace.path)
+    assert removed == []
+
+
+def test_reaper_skips_workspace_touched_after_check(tmp_path):
+    manager, removed = make_manager(tmp_path, max_bytes=10)
+    state = {'touched': False}
+
+    def in_use(workspace_id):
+        if not state['touched']:
+            state['touched'] = True
+            manager.touch(workspace_id)
+        return False
+
+    manager.in_use = in_use
+    workspace = add_workspace(manager, size=100, age=120)
+    assert manager.reap() == []
+    assert manager.get(workspace.id) is workspace
+
+
+def test_hold_keeps_workspace_until_release(tmp_path):
+    manager, removed = make_manager(tmp_path, ttl=60)
+    workspace = add_workspace(manager, age=120)
+    assert manager.hold(workspace.id)
+    assert manager.reap() == []
+    manager.release(workspace.id)
+    workspace.last_used = time.time() - 120
+    assert manager.reap() == [workspace.id]
+    assert not manager.hold(workspace.id)